@@ -0,0 +1,81 @@
+""" jittered exponential backoff with a failure budget - used for the in-place wifi/mqtt reconnects """
+
+import random
+
+from . import config
+from . import time
+
+
+class Backoff:
+    """ After the n-th consecutive failure the next attempt is allowed after
+
+            min(max_s, base_s * 2**(n-1)) * (1 - jitter * rnd)       rnd in [0, 1)
+
+        so nodes failing at the same moment (e.g. broker restart) do not all come back at the same moment.
+
+        failed() returns True once more than failure_budget consecutive failures happened (0: unlimited) -
+        the caller escalates (i.e. resets the device) then.
+
+        Configured in the "reconnect" section of esp32config.json (shared by wifi and mqtt):
+
+            "reconnect": {"enabled": true, "base_s": 1, "max_s": 120, "jitter": 0.5, "failure_budget": 20}
+    """
+
+    def __init__(self, name: str, base_s: float = 1.0, max_s: float = 120.0, jitter: float = 0.5, failure_budget: int = 20) -> None:
+        self.name: str = name
+        self.base_s: float = base_s
+        self.max_s: float = max_s
+        self.jitter: float = jitter
+        self.failure_budget: int = failure_budget
+
+        self.failures: int = 0
+        self._next_attempt_ticks: int = 0
+        self._waiting: bool = False
+
+    @classmethod
+    def from_config(cls, name: str) -> "Backoff | None":
+        """ None if there is no (enabled) "reconnect" section """
+        if "reconnect" not in config.data:
+            return None
+
+        section: dict = config.get_config_data_dict(config.data, "reconnect")
+        if "enabled" in section and not config.get_config_data_bool(section, "enabled"):
+            return None
+
+        ret: Backoff = cls(name=name)
+        if "base_s" in section:
+            ret.base_s = config.get_config_data_float(section, "base_s")
+        if "max_s" in section:
+            ret.max_s = config.get_config_data_float(section, "max_s")
+        if "jitter" in section:
+            ret.jitter = config.get_config_data_float(section, "jitter")
+        if "failure_budget" in section:
+            ret.failure_budget = config.get_config_data_int(section, "failure_budget")
+        return ret
+
+    def delay_s(self) -> float:
+        """ backoff delay after the current number of failures (without jitter) """
+        if self.failures == 0:
+            return 0.0
+        d: float = self.base_s * (1 << min(self.failures - 1, 16))
+        return d if d < self.max_s else self.max_s
+
+    def ready(self) -> bool:
+        """ True if the next attempt may be made now """
+        if not self._waiting:
+            return True
+        return time.ticks_diff(time.ticks_ms(), self._next_attempt_ticks) >= 0  # type: ignore[attr-defined]
+
+    def failed(self) -> bool:
+        """ records a failed attempt - returns True if the failure budget is exhausted """
+        self.failures += 1
+        rnd: float = random.getrandbits(16) / 65536
+        wait_ms: int = int(self.delay_s() * (1 - self.jitter * rnd) * 1000)
+        self._next_attempt_ticks = time.ticks_add(time.ticks_ms(), wait_ms)  # type: ignore[attr-defined]
+        self._waiting = True
+
+        return 0 < self.failure_budget < self.failures
+
+    def succeeded(self) -> None:
+        self.failures = 0
+        self._waiting = False
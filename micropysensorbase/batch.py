@@ -0,0 +1,84 @@
+""" batched upload: readings are collected and sent as one message with delta-encoded timestamps """
+
+from array import array
+
+from . import config
+from .payload import EPOCH_OFFSET
+
+
+class Batch:
+    """ Collects the channel values (attrs) of up to max_readings readings of one sensor.
+
+        Timestamps and values are kept in preallocated arrays (no per-reading allocations). The batch is due
+        once max_readings were added or the oldest reading is max_age_s old. to_value() gives the "value" of
+        the message:
+
+            {"base": <unix epoch of the first reading>, "dt": [0, 10, 20, ...], "current": [...], "busvoltage": [...]}
+
+        Configured in the "batch" section of esp32config.json:
+
+            "batch": {"enabled": true, "max_readings": 6, "max_age_s": 60, "deflate": false}
+    """
+
+    def __init__(self, attrs: list[str], max_readings: int = 6, max_age_s: int = 60, compress: bool = False) -> None:
+        assert max_readings > 0
+        self.attrs: list[str] = attrs
+        self.max_readings: int = max_readings
+        self.max_age_s: int = max_age_s
+        self.compress: bool = compress
+
+        self._t: array = array("I", [0] * max_readings)
+        self._values: list[array] = [array("f", [0.0] * max_readings) for _ in attrs]
+        self.n: int = 0
+        self.dropped: int = 0
+
+    @classmethod
+    def from_config(cls, attrs: list[str]) -> "Batch | None":
+        """ None if there is no (enabled) "batch" section """
+        if "batch" not in config.data:
+            return None
+
+        section: dict = config.get_config_data_dict(config.data, "batch")
+        if "enabled" in section and not config.get_config_data_bool(section, "enabled"):
+            return None
+
+        return cls(
+            attrs=attrs,
+            max_readings=config.get_config_data_int(section, "max_readings") if "max_readings" in section else 6,
+            max_age_s=config.get_config_data_int(section, "max_age_s") if "max_age_s" in section else 60,
+            compress=config.get_config_data_bool(section, "deflate") if "deflate" in section else False,
+        )
+
+    def add(self, now: int, data: object) -> None:
+        """ now: device epoch seconds """
+        n: int = self.n
+        if n >= self.max_readings:
+            # not sent (e.g. offline without outqueue) - keep the older readings
+            self.dropped += 1
+            return
+
+        self._t[n] = now
+        for i in range(len(self.attrs)):
+            self._values[i][n] = getattr(data, self.attrs[i])
+        self.n = n + 1
+
+    def is_due(self, now: int) -> bool:
+        return self.n >= self.max_readings or (self.n > 0 and now - self._t[0] >= self.max_age_s)
+
+    def first_secs(self) -> int:
+        return self._t[0]
+
+    def to_value(self) -> dict:
+        n: int = self.n
+        t0: int = self._t[0]
+        ret: dict = {
+            "base": t0 + EPOCH_OFFSET,
+            "dt": [self._t[i] - t0 for i in range(n)],
+        }
+        for j in range(len(self.attrs)):
+            values: array = self._values[j]
+            ret[self.attrs[j]] = [values[i] for i in range(n)]
+        return ret
+
+    def reset(self) -> None:
+        self.n = 0
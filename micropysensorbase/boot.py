@@ -35,6 +35,9 @@ if __name__ in config.get_config_data_dict(config.data, "loglevel"):
     if melv is not None:
         logger.setLevel(melv)
 
+# timezone table generated by scripts/gen_tztable.py - without one the CET/CEST rule is used
+if "tz_table" in config.data and not time.load_tz_table(config.get_config_data_str(config.data, "tz_table")):
+    logger.info("no timezone table - using the CET/CEST rule")
 
 if "boot_ssd" in config.data and config.get_config_data_bool(config.data, "boot_ssd"):
     try:
@@ -61,36 +64,15 @@ if not config.DISABLE_INET:
     wifi.start_web_repl()
 
     try:
-        import ntptime
+        # all ntp hosts are queried in parallel - at most ntp.timeout_ms; after a warm reboot/deep sleep wake
+        # the RTC still has the time and the sync is left to the background refine (main.connection_tick)
+        from . import ntpclient
 
-        gwntp = None
-
-        if config.INTVERSION >= 124:
-            gwntp = wifi.wlan.ipconfig("gw4")
+        if not ntpclient.restore():
+            ntpclient.sync()
         else:
-            gwntp = wifi.wlan.ifconfig()[2]
-
-        poolntp = "pool.ntp.org"
-        ntptime.timeout = 2
-
-        for i in range(10):
-            for h in  [gwntp, poolntp]:
-                try:
-                    ntptime.host = h
-                    ntptime.settime()
-                    time.set_had_proper_time_set(True)
-                    logger.info(f"ntptime set by host {h}")
-                    break
-                except Exception as ex:
-                    _out = io.StringIO()
-                    sys.print_exception(ex)
-                    sys.print_exception(ex, _out)
-
-                    logger.error(_out.getvalue())
-                    time.sleep(2)  # type: ignore
-
-            if time.get_had_proper_time_set():
-                break
+            # the dns lookups for the background refine - tick() does not resolve
+            ntpclient.resolve_hosts()
     except Exception as imex:
         _out = io.StringIO()
         sys.print_exception(imex)
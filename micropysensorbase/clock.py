@@ -0,0 +1,156 @@
+""" monotonic high-resolution wall clock: ticks_us() anchored to the wall time at each (ntp) sync
+
+    now_us() / now_ms() / now_s() are (device epoch) wall time like time.time() - but with microsecond
+    resolution, never going backwards and not jumping when the clock is synced again:
+
+        - the first sync (and any sync off by more than STEP_US) steps the clock (only then it may go backwards)
+        - smaller errors are slewed: applied gradually at SLEW_PPM (500 ppm: 1 ms error takes 2 s)
+        - the rate difference between ticks_us() and the reference (crystal drift) is estimated from the
+          error at each sync and corrected from then on (drift_ppm)
+
+    Before the first sync the clock is anchored to the RTC.
+
+    ticks_us() wraps after ~17.9 minutes on the ESP32 (ticks_diff() is only valid for half of that) - the anchor
+    is moved forward every REANCHOR_US; if now_us() was not called for too long the gap is bridged with the RTC.
+
+    Note: the values do not fit into a small int - every call allocates a (small) long int.
+"""
+
+from . import logging, time
+
+logger = logging.get_logger(__name__)
+logger.setLevel(logging.INFO)
+
+STEP_US: int = 1_000_000
+SLEW_PPM: int = 500
+REANCHOR_US: int = 60_000_000
+MAX_DRIFT_PPM: float = 500.0
+MIN_DRIFT_INTERVAL_US: int = 60_000_000
+_RTC_GUARD_S: int = 300  # ticks_diff is valid for ~536s
+
+synced: bool = False
+syncs: int = 0
+drift_ppm: float = 0.0
+last_error_us: int = 0
+
+_anchored: bool = False
+_anchor_ticks: int = 0
+_anchor_us: int = 0  # wall time at _anchor_ticks
+_anchor_rtc_s: int = 0  # time.time() at _anchor_ticks - to detect a ticks_us() wrap
+_anchor_rtc_us: int = 0  # the RTC at _anchor_ticks - to bridge a ticks_us() wrap
+_slew_us: int = 0  # still to be applied (signed)
+_since_sync_us: int = 0  # ticks elapsed since the last sync, up to the current anchor
+_last_us: int = 0
+
+
+def rtc_us() -> int:
+    try:
+        return time.time_ns() // 1_000  # type: ignore[attr-defined]
+    except AttributeError:
+        return time.time() * 1_000_000  # type: ignore[attr-defined]
+
+
+def _set_anchor(ticks: int, wall_us: int) -> None:
+    global _anchored, _anchor_ticks, _anchor_us, _anchor_rtc_s, _anchor_rtc_us
+    _anchor_ticks = ticks
+    _anchor_us = wall_us
+    _anchor_rtc_us = rtc_us()
+    _anchor_rtc_s = _anchor_rtc_us // 1_000_000
+    _anchored = True
+
+
+def _at(elapsed: int) -> tuple[int, int]:
+    """ (wall time, applied slew) elapsed ticks after the anchor """
+    slew: int = elapsed * SLEW_PPM // 1_000_000
+    if slew > abs(_slew_us):
+        slew = abs(_slew_us)
+    if _slew_us < 0:
+        slew = -slew
+    return _anchor_us + elapsed + int(elapsed * drift_ppm / 1_000_000) + slew, slew
+
+
+def _reanchor(ticks: int, elapsed: int) -> int:
+    global _slew_us, _since_sync_us
+    wall, slew = _at(elapsed)
+    _slew_us -= slew
+    _since_sync_us += elapsed
+    _set_anchor(ticks, wall)
+    return wall
+
+
+def now_us() -> int:
+    global _last_us
+    if not _anchored:
+        _set_anchor(time.ticks_us(), rtc_us())  # type: ignore[attr-defined]
+    elif time.time() - _anchor_rtc_s > _RTC_GUARD_S:  # type: ignore[attr-defined]
+        # not called for so long that ticks_us() may have wrapped - bridge the gap with the RTC
+        _set_anchor(time.ticks_us(), _anchor_us + rtc_us() - _anchor_rtc_us)  # type: ignore[attr-defined]
+
+    ticks: int = time.ticks_us()  # type: ignore[attr-defined]
+    elapsed: int = time.ticks_diff(ticks, _anchor_ticks)  # type: ignore[attr-defined]
+    if elapsed > REANCHOR_US:
+        wall: int = _reanchor(ticks, elapsed)
+    else:
+        wall = _at(elapsed)[0]
+
+    if wall < _last_us:
+        wall = _last_us  # never backwards (gap bridged with the RTC)
+    _last_us = wall
+    return wall
+
+
+def now_ms() -> int:
+    return now_us() // 1_000
+
+
+def now_s() -> int:
+    return now_us() // 1_000_000
+
+
+def sync(wall_us: int | None = None) -> None:
+    """ to be called right after the reference time was obtained - wall_us: the reference (device epoch) time
+        now, default: the RTC (e.g. just set by ntptime.settime()) """
+    global synced, syncs, drift_ppm, last_error_us, _slew_us, _since_sync_us, _last_us
+
+    if wall_us is None:
+        wall_us = rtc_us()
+    if not _anchored:
+        _set_anchor(time.ticks_us(), wall_us)  # type: ignore[attr-defined]
+    now_us()  # re-anchors if ticks_us() may have wrapped
+
+    ticks: int = time.ticks_us()  # type: ignore[attr-defined]
+    current: int = _reanchor(ticks, time.ticks_diff(ticks, _anchor_ticks))  # type: ignore[attr-defined]
+    err: int = wall_us - current
+    last_error_us = err
+    syncs += 1
+
+    if not synced or abs(err) > STEP_US:
+        logger.info("clock: stepped by %d us", err)
+        _set_anchor(ticks, wall_us)
+        _slew_us = 0
+        _last_us = 0
+    else:
+        if _since_sync_us >= MIN_DRIFT_INTERVAL_US:
+            # err = not yet applied slew + what the rate difference added since the last sync
+            d: float = drift_ppm + 0.5 * (err - _slew_us) * 1_000_000 / _since_sync_us
+            drift_ppm = max(-MAX_DRIFT_PPM, min(MAX_DRIFT_PPM, d))
+        _slew_us = err
+        logger.info("clock: slewing %d us (drift %.2f ppm)", err, drift_ppm)
+
+    synced = True
+    _since_sync_us = 0
+
+
+def isotime(us: int) -> str:
+    """ time.getisotime() with milliseconds: 2025-01-01T12:34:56.789+01:00 """
+    s: str = time.getisotime(us // 1_000_000)
+    return s[:-6] + ".%03d" % (us // 1_000 % 1_000) + s[-6:]
+
+
+def stats() -> dict:
+    return {
+        "synced": synced,
+        "syncs": syncs,
+        "drift_ppm": drift_ppm,
+        "last_error_us": last_error_us,
+    }
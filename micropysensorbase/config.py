@@ -63,24 +63,24 @@ class DummyLock:
         self.logger = logging.get_logger(f"DummyLock::{name}")
         self.logger.setLevel(loglevel)
 
-        self.logger.debug(f"DummyLock::{self.name}.init")
+        self.logger.debug("DummyLock::%s.init", self.name)
 
     def __enter__(self) -> None:
-        self.logger.debug(f"DummyLock::{self.name}.enter")
+        self.logger.debug("DummyLock::%s.enter", self.name)
 
     def __exit__(self, type: object, value: object, traceback: BaseException) -> None:
-        self.logger.debug(f"DummyLock::{self.name}.exit::{type=} {value=} {traceback=}")
+        self.logger.debug("DummyLock::%s.exit::type=%r value=%r traceback=%r", self.name, type, value, traceback)
 
     def locked(self) -> bool:
-        self.logger.debug(f"DummyLock::{self.name}.locked()")
+        self.logger.debug("DummyLock::%s.locked()", self.name)
         return True
 
     def acquire(self, *args: object, **kwargs: object) -> bool:
-        self.logger.debug(f"DummyLock::{self.name}.acquire()")
+        self.logger.debug("DummyLock::%s.acquire()", self.name)
         return True
 
     def release(self, *args: object, **kwargs: object) -> None:
-        self.logger.debug(f"DummyLock::{self.name}.release()")
+        self.logger.debug("DummyLock::%s.release()", self.name)
         return
 
 def _pprint_format(mydata: dict) -> str:
@@ -203,7 +203,7 @@ if mac_no_colon in data:
 else:
     logger.info(f"{mac_no_colon=} not found in config-data")
 
-logger.debug("**************\n" + _pprint_format(data) + "\n**************")
+logger.debug(lambda: "**************\n" + _pprint_format(data) + "\n**************")
 
 
 if "disable_inet" in data and data["disable_inet"]:
@@ -220,35 +220,35 @@ logger.info(f"config.{ENABLE_LOCK=}")
 dlogger = logging.get_logger("config_get_config")
 dlogger.setLevel(logging.INFO)
 def get_config_data_str(_data: dict[str, str|float|int|bool]|dict[str, str|float|int|bool|dict[str, str|float|int|bool]], name: str) -> str:
-    dlogger.debug(f"config.py::get_config_data_str({name=}) from {_data}")
+    dlogger.debug("config.py::get_config_data_str(name=%r) from %s", name, _data)
     assert _data is not None and name in _data, f"FAIL::config.py::get_config_data_str({name=}) from {_data}"
     ret: object = _data[name]
     assert isinstance(ret, str)
     return ret
 
 def get_config_data_dict(_data: dict[str, str|float|int|bool|dict[str, str|float|int|bool]], name: str) -> dict[str, str|float|int|bool]:
-    dlogger.debug(f"config.py::get_config_data_dict({name=}) from {_data}")
+    dlogger.debug("config.py::get_config_data_dict(name=%r) from %s", name, _data)
     assert _data is not None and name in _data, f"FAIL::config.py::get_config_data_dict({name=}) from {_data}"
     ret: object = _data[name]
     assert isinstance(ret, dict)
     return ret
 
 def get_config_data_float(_data: dict[str, str|float|int|bool]|dict[str, str|float|int|bool|dict[str, str|float|int|bool]], name: str) -> float:
-    dlogger.debug(f"config.py::get_config_data_float({name=}) from {_data}")
+    dlogger.debug("config.py::get_config_data_float(name=%r) from %s", name, _data)
     assert _data is not None and name in _data, f"FAIL::config.py::get_config_data_float({name=}) from {_data}"
     ret: object = _data[name]
     assert isinstance(ret, float)
     return ret
 
 def get_config_data_int(_data: dict[str, str|float|int|bool]|dict[str, str|float|int|bool|dict[str, str|float|int|bool]], name: str) -> int:
-    dlogger.debug(f"config.py::get_config_data_int({name=}) from {_data}")
+    dlogger.debug("config.py::get_config_data_int(name=%r) from %s", name, _data)
     assert _data is not None and name in _data, f"FAIL::config.py::get_config_data_int({name=}) from {_data}"
     ret: object = _data[name]
     assert isinstance(ret, int)
     return ret
 
 def get_config_data_bool(_data: dict[str, str|float|int|bool]|dict[str, str|float|int|bool|dict[str, str|float|int|bool]], name: str) -> bool:
-    dlogger.debug(f"config.py::get_config_data_bool({name=}) from {_data}")
+    dlogger.debug("config.py::get_config_data_bool(name=%r) from %s", name, _data)
     assert _data is not None and name in _data, f"FAIL::config.py::get_config_data_bool({name=}) from {_data}"
     ret: object = _data[name]
     assert isinstance(ret, bool)
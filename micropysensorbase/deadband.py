@@ -0,0 +1,136 @@
+""" deadband/hysteresis engine deciding whether a (changed) channel value is worth sending """
+
+from . import config
+
+
+def _get_number(section: dict[str, str | float | int | bool], name: str, default: float | None) -> float | None:
+    if name not in section:
+        return default
+    ret: object = section[name]
+    assert isinstance(ret, (int, float)) and not isinstance(ret, bool), f"FAIL::deadband.py::{name=} not a number"
+    return ret
+
+
+class Deadband:
+    """ Send-on-delta decision for one channel (i.e. one feed like "mafeed").
+
+        A value is worth sending if it differs from the last sent value by more than the threshold.
+        The threshold is the smaller one of
+            abs                                 -- absolute threshold
+            min(|last| * rel, rel_cap)          -- relative threshold (optionally capped)
+
+        Further knobs:
+            hysteresis      -- added to the threshold if the value moves back into the opposite direction
+                               of the last reported change (stops flapping between two levels)
+            min_interval_s  -- changes are not reported more often than this
+            max_silence_s   -- the value is sent at the latest after this many seconds (0: never)
+
+        The numbers are configured per feed-name in the "deadband" section of esp32config.json, e.g.:
+
+            "deadband": {
+                "mafeed": {"rel": 0.1, "rel_cap": 1.0, "min_interval_s": 0, "max_silence_s": 60}
+            }
+    """
+
+    def __init__(
+            self,
+            name: str,
+            abs_threshold: float | None = None,
+            rel_threshold: float | None = None,
+            rel_cap: float | None = None,
+            hysteresis: float = 0.0,
+            min_interval_s: float = 0,
+            max_silence_s: float = 0,
+    ) -> None:
+        self.name: str = name
+        self.abs_threshold: float | None = abs_threshold
+        self.rel_threshold: float | None = rel_threshold
+        self.rel_cap: float | None = rel_cap
+        self.hysteresis: float = hysteresis
+        self.min_interval_s: float = min_interval_s
+        self.max_silence_s: float = max_silence_s
+
+        self.last_value: float | None = None
+        self.last_sent: float | None = None
+        self.last_direction: int = 0
+
+        # result of the last check() - True if this channel asked for sending
+        self.triggered: bool = False
+
+    @classmethod
+    def from_config(
+            cls,
+            name: str,
+            abs_threshold: float | None = None,
+            rel_threshold: float | None = None,
+            rel_cap: float | None = None,
+            hysteresis: float = 0.0,
+            min_interval_s: float = 0,
+            max_silence_s: float = 0,
+    ) -> "Deadband":
+        """ creates the deadband for feed `name` - the given values are the defaults if not configured """
+        section: dict[str, str | float | int | bool] = {}
+        if "deadband" in config.data:
+            deadbandc: dict[str, str | float | int | bool] = config.get_config_data_dict(config.data, "deadband")
+            if name in deadbandc:
+                section = config.get_config_data_dict(deadbandc, name)  # type: ignore
+
+        return cls(
+            name=name,
+            abs_threshold=_get_number(section, "abs", abs_threshold),
+            rel_threshold=_get_number(section, "rel", rel_threshold),
+            rel_cap=_get_number(section, "rel_cap", rel_cap),
+            hysteresis=_get_number(section, "hysteresis", hysteresis),  # type: ignore
+            min_interval_s=_get_number(section, "min_interval_s", min_interval_s),  # type: ignore
+            max_silence_s=_get_number(section, "max_silence_s", max_silence_s),  # type: ignore
+        )
+
+    def threshold(self, last: float, direction: int) -> float | None:
+        thr: float | None = self.abs_threshold
+
+        if self.rel_threshold is not None:
+            rel: float = abs(last * self.rel_threshold)
+            if self.rel_cap is not None and rel > self.rel_cap:
+                rel = self.rel_cap
+            if thr is None or rel < thr:
+                thr = rel
+
+        if thr is not None and self.hysteresis and self.last_direction != 0 and direction == -self.last_direction:
+            thr += self.hysteresis
+
+        return thr
+
+    def check(self, value: float, now: float, silence_enabled: bool = True) -> bool:
+        """ returns (and remembers in self.triggered) whether value should be sent now """
+        last: float | None = self.last_value
+        if last is None or self.last_sent is None:
+            # nothing sent so far - overdue
+            self.triggered = silence_enabled
+            return self.triggered
+
+        elapsed: float = now - self.last_sent
+
+        if silence_enabled and self.max_silence_s > 0 and elapsed > self.max_silence_s:
+            self.triggered = True
+            return True
+
+        if self.min_interval_s > 0 and elapsed < self.min_interval_s:
+            self.triggered = False
+            return False
+
+        diff: float = value - last
+        thr: float | None = self.threshold(last, 1 if diff > 0 else -1 if diff < 0 else 0)
+
+        self.triggered = thr is not None and abs(diff) > thr
+        return self.triggered
+
+    def commit(self, value: float, now: float) -> None:
+        """ to be called after value was sent """
+        if self.last_value is not None:
+            if value > self.last_value:
+                self.last_direction = 1
+            elif value < self.last_value:
+                self.last_direction = -1
+
+        self.last_value = value
+        self.last_sent = now
@@ -0,0 +1,77 @@
+""" caching resolver for the broker host - one lookup per ttl instead of two per (re)connect """
+
+import socket
+
+from . import config
+from . import logging, time
+from . import rtcstore
+
+logger = logging.get_logger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class DNSCache:
+    """ host -> ip, resolved at most once per ttl_s.
+
+        If the lookup fails (slow/unavailable DNS) the last known good address is used - even if its ttl
+        has run out. With persist=True the entries are kept in RTC memory (see rtcstore) so they survive
+        soft resets and deep sleep.
+
+        Configured in the "dnscache" section of esp32config.json:
+
+            "dnscache": {"enabled": true, "ttl_s": 3600, "persist": true}
+    """
+
+    def __init__(self, ttl_s: int = 3600, persist: bool = True) -> None:
+        self.ttl_s: int = ttl_s
+        self.persist: bool = persist
+
+        # host -> [ip, resolved at (time.time())]
+        self._entries: dict[str, list] = {}
+        if persist:
+            stored: object = rtcstore.get("dns")
+            if isinstance(stored, dict):
+                self._entries = stored
+
+    @classmethod
+    def from_config(cls) -> "DNSCache | None":
+        """ None if there is no (enabled) "dnscache" section """
+        if "dnscache" not in config.data:
+            return None
+
+        section: dict = config.get_config_data_dict(config.data, "dnscache")
+        if "enabled" in section and not config.get_config_data_bool(section, "enabled"):
+            return None
+
+        return cls(
+            ttl_s=config.get_config_data_int(section, "ttl_s") if "ttl_s" in section else 3600,
+            persist=config.get_config_data_bool(section, "persist") if "persist" in section else True,
+        )
+
+    def resolve(self, host: str, port: int) -> str:
+        """ ip of host - raises OSError only if the lookup fails and there is no previous address """
+        now: int = time.time()  # type: ignore[attr-defined]
+        entry: list | None = self._entries.get(host)
+        # a clock set backwards (ntp) makes the entry look like it is from the future - treat as expired
+        if entry is not None and 0 <= now - entry[1] < self.ttl_s:
+            return entry[0]
+
+        try:
+            ip: str = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][-1][0]
+        except OSError as ex:
+            if entry is None:
+                raise
+            logger.warning("DNSCache: resolving %s failed (%r) - using last known address %s", host, ex, entry[0])
+            return entry[0]
+
+        logger.debug("DNSCache: %s -> %s", host, ip)
+        self._entries[host] = [ip, now]
+        if self.persist:
+            rtcstore.put("dns", self._entries)
+        return ip
+
+    def expire(self, host: str) -> None:
+        """ e.g. after the connect to the cached address failed: the next resolve() asks the DNS again
+            (but still falls back to the address if the DNS does not answer) """
+        if host in self._entries:
+            self._entries[host][1] = -self.ttl_s
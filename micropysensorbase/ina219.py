@@ -9,6 +9,7 @@ MicroPython using the I2C bus.
 import machine
 
 from micropysensorbase import logging
+from .usmbus import SMBus
 
 import utime
 from math import trunc
@@ -113,7 +114,7 @@ class INA219:
     # to guarantee that current overflow can always be detected.
     __CURRENT_LSB_FACTOR = 32800
 
-    def __init__(self, shunt_ohms: float, i2c: machine.SoftI2C|machine.I2C, max_expected_amps: None|float = None,
+    def __init__(self, shunt_ohms: float, i2c: machine.SoftI2C|machine.I2C|SMBus, max_expected_amps: None|float = None,
                  address: int=__ADDRESS, log_level: int=logging.ERROR):
         """Construct the class.
 
@@ -123,7 +124,7 @@ class INA219:
         Arguments:
         shunt_ohms -- value of shunt resistor in Ohms (mandatory).
         i2c -- an instance of the I2C class from the *machine* module, either
-            I2C(1) or I2C(2) (mandatory).
+            I2C(1) or I2C(2) - or an usmbus.SMBus (mandatory).
         max_expected_amps -- the maximum expected current in Amps (optional).
         address -- the I2C address of the INA219, defaults to
             *0x40* (optional).
@@ -140,6 +141,7 @@ class INA219:
         self._min_device_current_lsb = self._calculate_min_current_lsb()
         self._gain: int|None = None
         self._auto_gain_enabled = False
+        self._buf: bytearray = bytearray(2)
 
     def configure(self, voltage_range: int=RANGE_32V, gain: int=GAIN_AUTO,
                   bus_adc: int=ADC_12BIT, shunt_adc: int=ADC_12BIT) -> None:
@@ -400,11 +402,15 @@ class INA219:
         self._i2c.writeto_mem(self._address, register, register_bytes)
 
     def __to_bytes(self, register_value: int) -> bytearray:
-        return bytearray([(register_value >> 8) & 0xFF, register_value & 0xFF])
+        # reuses the instance buffer - no allocation per register access
+        self._buf[0] = (register_value >> 8) & 0xFF
+        self._buf[1] = register_value & 0xFF
+        return self._buf
 
     def __read_register(self, register: int, negative_value_supported: bool=False) -> int:
-        register_bytes = self._i2c.readfrom_mem(self._address, register, 2)
-        register_value = int.from_bytes(register_bytes, 'big')
+        register_bytes = self._buf
+        self._i2c.readfrom_mem_into(self._address, register, register_bytes)
+        register_value = (register_bytes[0] << 8) | register_bytes[1]
         if negative_value_supported:
             # Two's compliment
             if register_value > 32767:
@@ -33,6 +33,50 @@ def max_expected_amps_to_string(max_expected_amps: float | None) -> str:
     return str(", max expected amps: %.3fA" % max_expected_amps)
 
 
+class INA226Snapshot:
+    """Raw register values of one INA226 reading.
+
+    The values are only converted when accessed, the supply voltage is
+    derived from bus and shunt voltage without another register read.
+    """
+
+    def __init__(self) -> None:
+        self.shunt_raw: int = 0
+        self.bus_raw: int = 0
+        self.power_raw: int = 0
+        self.current_raw: int = 0
+
+        self.current_lsb_ma: float = 0.0
+        self.power_lsb_mw: float = 0.0
+        self.shunt_lsb_mv: float = 0.0
+        self.bus_lsb_v: float = 0.0
+
+    @property
+    def current(self) -> float:
+        """Bus current in milliamps."""
+        return self.current_raw * self.current_lsb_ma
+
+    @property
+    def busvoltage(self) -> float:
+        """Bus voltage in volts."""
+        return self.bus_raw * self.bus_lsb_v
+
+    @property
+    def shuntvoltage(self) -> float:
+        """Shunt voltage in millivolts."""
+        return self.shunt_raw * self.shunt_lsb_mv
+
+    @property
+    def supplyvoltage(self) -> float:
+        """Bus supply voltage (bus + shunt voltage) in volts."""
+        return self.bus_raw * self.bus_lsb_v + self.shunt_raw * self.shunt_lsb_mv / 1000
+
+    @property
+    def power(self) -> float:
+        """Bus power consumption in milliwatts."""
+        return self.power_raw * self.power_lsb_mw
+
+
 class INA226:
     """Class containing the INA226 functionality."""
 
@@ -54,6 +98,13 @@ class INA226:
     VCT_4156us_BIT = 6
     VCT_8244us_BIT = 7
 
+    # microseconds per conversion (VCT_*_BIT) and samples averaged (AVG_*BIT)
+    CT_US = (140, 204, 332, 588, 1100, 2116, 4156, 8244)
+    AVG_SAMPLES = (1, 4, 16, 64, 128, 256, 512, 1024)
+
+    MODE_TRIG_SH_BUS = 3  # shunt and bus, triggered (single shot)
+    MODE_CONT_SH_BUS = 7  # shunt and bus, continuous
+
     __REG_CONFIG = 0x00
     __REG_SHUNTVOLTAGE = 0x01
     __REG_BUSVOLTAGE = 0x02
@@ -162,6 +213,9 @@ class INA226:
         self._shunt_ohms = shunt_ohms
         self._max_expected_amps = max_expected_amps
         self._min_device_current_lsb = self._calculate_min_current_lsb()
+        self._configuration: int = 0
+        self._conversion_time_us: int = 2 * 1100  # power-on default: no averaging, 1.1ms bus and shunt
+        self._snapshot: INA226Snapshot = INA226Snapshot()
 
 
     def configure(
@@ -170,15 +224,13 @@ class INA226:
         """Configure and calibrate how the INA226 will take measurements."""
 
         self.logger.debug(
-            self.__LOG_MSG_1
-            % (
-                self._shunt_ohms,
-                self.__BUS_RANGE,
-                self.__GAIN_VOLTS,
-                max_expected_amps_to_string(self._max_expected_amps),
-                bus_ct,
-                shunt_ct,
-            )
+            self.__LOG_MSG_1,
+            self._shunt_ohms,
+            self.__BUS_RANGE,
+            self.__GAIN_VOLTS,
+            max_expected_amps_to_string(self._max_expected_amps),
+            bus_ct,
+            shunt_ct,
         )
 
         self._calibrate(self.__BUS_RANGE, self.__GAIN_VOLTS, self._max_expected_amps)
@@ -190,6 +242,13 @@ class INA226:
             | 1 << 14
         )
         self._configuration_register(configuration)
+        self._conversion_time_us = (self.CT_US[bus_ct] + self.CT_US[shunt_ct]) * self.AVG_SAMPLES[avg_mode]
+
+
+    def conversion_time_us(self) -> int:
+        """Return the time of one (averaged) shunt and bus conversion in microseconds - i.e. the period
+        of the conversion ready alert in continuous mode."""
+        return self._conversion_time_us
 
 
     def voltage(self) -> float:
@@ -234,6 +293,60 @@ class INA226:
         return self._shunt_voltage_register() * self.__SHUNT_MILLIVOLTS_LSB
 
 
+    def snapshot(self, into: INA226Snapshot|None=None) -> INA226Snapshot:
+        """Read shunt, bus, power and current register once each.
+
+        Costs five register reads (including a single overflow check)
+        instead of the nine needed by calling current(), voltage(),
+        supply_voltage(), shunt_voltage() and power() one after another.
+
+        The returned record is reused by the next call unless `into` is
+        given. A DeviceRangeError exception is thrown if current overflow
+        occurs.
+        """
+        self._handle_current_overflow()
+
+        snap: INA226Snapshot = self._snapshot if into is None else into
+        snap.shunt_raw = self._shunt_voltage_register()
+        snap.bus_raw = self._voltage_register()
+        snap.power_raw = self._power_register()
+        snap.current_raw = self._current_register()
+
+        snap.current_lsb_ma = self._current_lsb * 1000
+        snap.power_lsb_mw = self._power_lsb * 1000
+        snap.shunt_lsb_mv = self.__SHUNT_MILLIVOLTS_LSB
+        snap.bus_lsb_v = self.__BUS_MILLIVOLTS_LSB / 1000
+
+        return snap
+
+
+    def current_raw(self) -> int:
+        """Return the raw (signed) current register value.
+
+        Multiply with current_lsb_milliamps() to get milliamps. No overflow
+        check is done - meant for high-rate sampling.
+        """
+        return self._current_register()
+
+
+    def voltage_raw(self) -> int:
+        """Return the raw bus voltage register value.
+
+        Multiply with voltage_lsb_volts() to get volts.
+        """
+        return self._voltage_register()
+
+
+    def current_lsb_milliamps(self) -> float:
+        """Return the milliamps per bit of the current register."""
+        return self._current_lsb * 1000
+
+
+    def voltage_lsb_volts(self) -> float:
+        """Return the volts per bit of the bus voltage register."""
+        return self.__BUS_MILLIVOLTS_LSB / 1000
+
+
     def sleep(self) -> None:
         """Put the INA226 into power down mode."""
         configuration = self._read_configuration()
@@ -294,27 +407,25 @@ class INA226:
 
     def _calibrate(self, bus_volts_max: float, shunt_volts_max: float, max_expected_amps: float|None=None) -> None:
         self.logger.info(
-            self.__LOG_MSG_2
-            % (
-                bus_volts_max,
-                shunt_volts_max,
-                max_expected_amps_to_string(max_expected_amps),
-            )
+            self.__LOG_MSG_2,
+            bus_volts_max,
+            shunt_volts_max,
+            max_expected_amps_to_string(max_expected_amps),
         )
         max_possible_amps = shunt_volts_max / self._shunt_ohms
 
-        self.logger.info("max possible current: %.2fA" % max_possible_amps)
+        self.logger.info("max possible current: %.2fA", max_possible_amps)
 
         self._current_lsb = self._determine_current_lsb(
             max_expected_amps, max_possible_amps
         )
-        self.logger.info("current LSB: %.3e A/bit" % self._current_lsb)
+        self.logger.info("current LSB: %.3e A/bit", self._current_lsb)
 
         self._power_lsb = self._current_lsb * 25.2
-        self.logger.info("power LSB: %.3e W/bit" % self._power_lsb)
+        self.logger.info("power LSB: %.3e W/bit", self._power_lsb)
 
         max_current = self._current_lsb * self.__MAX_CURRENT_VALUE
-        self.logger.info("max current before overflow: %.4fA" % max_current)
+        self.logger.info("max current before overflow: %.4fA", max_current)
 
         max_shunt_voltage = max_current * self._shunt_ohms
         self.logger.info(
@@ -324,7 +435,7 @@ class INA226:
         # trunc returned an int!
         calibration: int = trunc(self.__CALIBRATION_FACTOR / (self._current_lsb * self._shunt_ohms))  # type: ignore
 
-        self.logger.info("calibration: 0x%04x (%d)" % (calibration, calibration))
+        self.logger.info("calibration: 0x%04x (%d)", calibration, calibration)
         self._calibration_register(calibration)
 
     def _determine_current_lsb(self, max_expected_amps: float|None, max_possible_amps: float) -> float:
@@ -333,7 +444,7 @@ class INA226:
                 raise ValueError(
                     self.__AMP_ERR_MSG % (max_expected_amps, max_possible_amps)
                 )
-            self.logger.info("max expected current: %.3fA" % max_expected_amps)
+            self.logger.info("max expected current: %.3fA", max_expected_amps)
             if max_expected_amps < max_possible_amps:
                 current_lsb = max_expected_amps / self.__CURRENT_LSB_FACTOR
             else:
@@ -364,6 +475,26 @@ class INA226:
         cnvr = self._read_mask_register() >> self.__CVRF & 1
         return cnvr
 
+    def enable_conversion_ready_alert(self, latch: bool=True) -> None:
+        """Assert the ALERT pin (active low) when a conversion is ready.
+
+        With latch enabled the pin stays asserted until the Mask/Enable
+        register is read - which every overflow-checked read (current(),
+        power(), shunt_voltage()) and clear_alert() does.
+        """
+        self._mask_register(1 << self.__CNVR | (1 << self.__LEN if latch else 0))
+
+    def clear_alert(self) -> int:
+        """Read the Mask/Enable register - clears the conversion ready flag and a latched ALERT pin."""
+        return self._read_mask_register()
+
+    def trigger(self) -> None:
+        """Start a single shot conversion of shunt and bus voltage.
+
+        Only useful after switching into triggered mode via wake(mode=MODE_TRIG_SH_BUS).
+        """
+        self._configuration_register(self._configuration & 0xFFF8 | self.MODE_TRIG_SH_BUS)
+
     def is_low_battery(self) -> int:
         bul = self._read_mask_register() >> self.__BUL & 1
         return bul
@@ -373,8 +504,9 @@ class INA226:
             raise DeviceRangeError(self.__GAIN_VOLTS)
 
     def _configuration_register(self, register_value: int) -> None:
-        self.logger.debug("configuration: 0x%04x" % register_value)
+        self.logger.debug("configuration: 0x%04x", register_value)
         self.__write_register(self.__REG_CONFIG, register_value)
+        self._configuration = register_value
 
     def _read_configuration(self) -> int:
         return self.__read_register(self.__REG_CONFIG)
@@ -392,21 +524,21 @@ class INA226:
         return self.__read_register(self.__REG_POWER)
 
     def _calibration_register(self, register_value: int) -> None:
-        self.logger.debug("calibration: 0x%04x" % register_value)
+        self.logger.debug("calibration: 0x%04x", register_value)
         self.__write_register(self.__REG_CALI, register_value)
 
     def _read_mask_register(self) -> int:
         return self.__read_register(self.__REG_MASK)
 
     def _mask_register(self, register_value: int) -> None:
-        self.logger.debug("mask/enable: 0x%04x" % register_value)
+        self.logger.debug("mask/enable: 0x%04x", register_value)
         self.__write_register(self.__REG_MASK, register_value)
 
     def _read_limit_register(self) -> int:
         return self.__read_register(self.__REG_LIMIT)
 
     def _limit_register(self, register_value: int) -> None:
-        self.logger.debug("limit value: 0x%04x" % register_value)
+        self.logger.debug("limit value: 0x%04x", register_value)
         self.__write_register(self.__REG_LIMIT, register_value)
 
     def _manufacture_id(self) -> int:
@@ -416,13 +548,13 @@ class INA226:
         return self.__read_register(self.__REG_DIE_ID)
 
     def __write_register(self, register: int, register_value: int) -> None:
-        register_bytes = to_bytes(register_value)
-        self.logger.debug(
-            "write register 0x%02x: 0x%04x 0b%s"
-            % (register, register_value, binary_as_string(register_value))
-        )
-        self._i2c.write_i2c_block_data(self._address, register, register_bytes)
-        # self._i2c.write_word_data(self._address, register, register_value)
+        if self.logger.is_enabled_for(logging.DEBUG):
+            self.logger.debug(
+                "write register 0x%02x: 0x%04x 0b%s"
+                % (register, register_value, binary_as_string(register_value))
+            )
+        # SMBus words go LSB first, the INA226 wants MSB first
+        self._i2c.write_word_data(self._address, register, ((register_value & 0xFF) << 8) | (register_value >> 8))
 
     def __read_register(self, register: int, negative_value_supported: bool=False) -> int:
         result: int = self._i2c.read_word_data(self._address, register) & 0xFFFF
@@ -430,10 +562,11 @@ class INA226:
         if negative_value_supported:
             if register_value > 32767:
                 register_value -= 65536
-        self.logger.debug(
-            "read register 0x%02x: 0x%04x 0b%s"
-            % (register, register_value, binary_as_string(register_value))
-        )
+        if self.logger.is_enabled_for(logging.DEBUG):
+            self.logger.debug(
+                "read register 0x%02x: 0x%04x 0b%s"
+                % (register, register_value, binary_as_string(register_value))
+            )
         return register_value
 
 
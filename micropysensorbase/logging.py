@@ -4,7 +4,7 @@ import io
 import sys
 
 if sys.implementation.name != 'micropython':
-    from typing import TypeAlias
+    from typing import TypeAlias, Callable
     StrPath: TypeAlias = str | bytes
     MaybeNone: TypeAlias = None | object
     def const(indata: int) -> int:
@@ -33,6 +33,9 @@ _level_dict: dict[int, str] = {
 }
 
 _loggers: dict[str, "Logger"] = {}
+
+# bumped on every level change - loggers re-calculate their cached effective level if it differs
+_level_generation: int = 0
 _stream: io.TextIOBase = sys.stderr  #type: ignore
 _default_fmt = "%(levelname)s:%(name)s:%(message)s"
 _default_datefmt = "%Y-%m-%d %H:%M:%S"
@@ -100,77 +103,138 @@ class FileHandler(StreamHandler):
 
 
 class Formatter:
+    """ fmt is compiled once into a positional template and the list of record attributes it needs:
+
+            "%(levelname)s:%(name)s:%(message)s"  ->  "%s:%s:%s", ("levelname", "name", "message")
+
+        asctime is formatted at most once per second (of record.ct).
+    """
+
     def __init__(self, fmt: str|None=None, datefmt: str|None=None):
         super().__init__()
         self.fmt = _default_fmt if fmt is None else fmt
         self.datefmt = _default_datefmt if datefmt is None else datefmt
 
+        self._template, self._keys = self._compile(self.fmt)
+        self._uses_time: bool = "asctime" in self._keys
+        self._asctime_secs: int = -1
+        self._asctime: str|None = None
+
+    @staticmethod
+    def _compile(fmt: str) -> tuple[str, tuple[str, ...]]:
+        parts: list[str] = []
+        keys: list[str] = []
+        pos: int = 0
+        while True:
+            i: int = fmt.find("%", pos)
+            if i < 0 or i + 1 >= len(fmt):
+                parts.append(fmt[pos:])
+                break
+            if fmt[i + 1] == "(":
+                end: int = fmt.find(")", i + 2)
+                if end < 0:
+                    parts.append(fmt[pos:])
+                    break
+                parts.append(fmt[pos:i + 1])
+                keys.append(fmt[i + 2:end])
+                pos = end + 1
+            else:
+                # "%%" (or anything else): kept as is
+                parts.append(fmt[pos:i + 2])
+                pos = i + 2
+        return "".join(parts), tuple(keys)
+
     def uses_time(self) -> bool:
-        return "asctime" in self.fmt
+        return self._uses_time
 
     def format_time(self, datefmt: str, record: LogRecord) -> str|None:
         if hasattr(time, "strftime"):
-            return time.strftime(datefmt, time.localtime(record.ct)) # type: ignore
+            secs: int = int(record.ct)
+            if datefmt is not self.datefmt:
+                return time.strftime(datefmt, time.localtime(secs)) # type: ignore
+            if secs != self._asctime_secs:
+                self._asctime = time.strftime(datefmt, time.localtime(secs)) # type: ignore
+                self._asctime_secs = secs
+            return self._asctime
         return None
 
     def format(self, record: LogRecord) -> str:
-        if self.uses_time():
+        if self._uses_time:
             record.asctime = self.format_time(self.datefmt, record)
-        return self.fmt % {
-            "name": record.name,
-            "message": record.message,
-            "msecs": record.msecs,
-            "asctime": record.asctime,
-            "levelname": record.levelname,
-        }
+        return self._template % tuple([getattr(record, k) for k in self._keys])
 
 
 class Logger:
+    """ msg is only formatted if the level is enabled - so instead of
+
+            logger.debug(f"{value=} {data}")
+
+        prefer deferred formatting via %-style args (or a dict for %(name)s-style) or a callable:
+
+            logger.debug("value=%s %s", value, data)
+            logger.debug(lambda: "expensive: " + _pprint_format(data))
+    """
+
     def __init__(self, name: str, level: int=NOTSET):
         self.name: str = name
         self.level: int = level
         self.handlers: list[Handler] = []
         self.record: LogRecord = LogRecord()
+        self._effective_level: int = NOTSET
+        self._effective_generation: int = -1
 
     def setLevel(self, level: int) -> None:
+        global _level_generation
         self.level = level
+        _level_generation += 1
 
     def is_enabled_for(self, level: int) -> bool:
         return level >= self.get_effective_level()
 
     def get_effective_level(self) -> int:
-        return self.level or get_logger().level or _DEFAULT_LEVEL
-
-    def log(self, level: int, msg: str, *args: object|list[object]|None) -> None:
-        if self.is_enabled_for(level):
-            if args and isinstance(args, list):
-                if isinstance(args[0], dict):
-                    args = args[0]
+        if self._effective_generation != _level_generation:
+            self._effective_level = self.level or get_logger().level or _DEFAULT_LEVEL
+            self._effective_generation = _level_generation
+        return self._effective_level
+
+    def log(self, level: int, msg: "str|Callable[[], str]", *args: object) -> None:
+        if level < self.get_effective_level():
+            return
+
+        if callable(msg):
+            msg = msg()
+        elif args:
+            if len(args) == 1 and isinstance(args[0], dict):
+                msg = msg % args[0]
+            else:
                 msg = msg % args
-            self.record.set(self.name, level, msg)
-            handlers = self.handlers
-            if not handlers:
-                handlers = get_logger().handlers
-            for h in handlers:
-                if hasattr(h, "emit"):
-                    h.emit(self.record)
 
-    def debug(self, msg: str, *args: None|object|list[object]) -> None:
-        self.log(DEBUG, msg, *args)
+        self.record.set(self.name, level, msg)
+        handlers = self.handlers
+        if not handlers:
+            handlers = get_logger().handlers
+        for h in handlers:
+            if hasattr(h, "emit"):
+                h.emit(self.record)
+
+    def debug(self, msg: "str|Callable[[], str]", *args: object) -> None:
+        if DEBUG >= self.get_effective_level():
+            self.log(DEBUG, msg, *args)
 
-    def info(self, msg: str, *args: None|object|list[object]) -> None:
-        self.log(INFO, msg, *args)
+    def info(self, msg: "str|Callable[[], str]", *args: object) -> None:
+        if INFO >= self.get_effective_level():
+            self.log(INFO, msg, *args)
 
-    def warning(self, msg: str, *args: None|object|list[object]) -> None:
+    def warning(self, msg: "str|Callable[[], str]", *args: object) -> None:
         self.log(WARNING, msg, *args)
 
-    def error(self, msg: str, *args: None|object|list[object]) -> None:
+    def error(self, msg: "str|Callable[[], str]", *args: object) -> None:
         self.log(ERROR, msg, *args)
 
-    def critical(self, msg: str, *args: None|object|list[object]) -> None:
+    def critical(self, msg: "str|Callable[[], str]", *args: object) -> None:
         self.log(CRITICAL, msg, *args)
 
-    def exception(self, msg: str, *args: None|object|list[object], exc_info: BaseException|None=None) -> None:
+    def exception(self, msg: "str|Callable[[], str]", *args: object, exc_info: BaseException|None=None) -> None:
         self.log(ERROR, msg, *args)
         tb = None
         if isinstance(exc_info, BaseException):
@@ -192,38 +256,40 @@ class Logger:
 def get_logger(name: str|None = None) -> Logger:
     if name is None:
         name = "root"
+    global _level_generation
     if name not in _loggers:
         _loggers[name] = Logger(name)
         if name == "root":
+            _level_generation += 1
             basic_config()
     return _loggers[name]
 
 
-def log(level: int, msg: str, *args: None|list[object]) -> None:
+def log(level: int, msg: "str|Callable[[], str]", *args: object) -> None:
     get_logger().log(level, msg, *args)
 
 
-def debug(msg: str, *args: None|list[object]) -> None:
+def debug(msg: "str|Callable[[], str]", *args: object) -> None:
     get_logger().debug(msg, *args)
 
 
-def info(msg: str, *args: None|list[object]) -> None:
+def info(msg: "str|Callable[[], str]", *args: object) -> None:
     get_logger().info(msg, *args)
 
 
-def warning(msg: str, *args: None|list[object]) -> None:
+def warning(msg: "str|Callable[[], str]", *args: object) -> None:
     get_logger().warning(msg, *args)
 
 
-def error(msg: str, *args: None|list[object]) -> None:
+def error(msg: "str|Callable[[], str]", *args: object) -> None:
     get_logger().error(msg, *args)
 
 
-def critical(msg: str, *args: None|list[object]) -> None:
+def critical(msg: "str|Callable[[], str]", *args: object) -> None:
     get_logger().critical(msg, *args)
 
 
-def exception(msg: str, *args: None|list[object]) -> None:
+def exception(msg: "str|Callable[[], str]", *args: object) -> None:
     get_logger().exception(msg, *args)
 
 
@@ -12,6 +12,7 @@ import machine
 from . import mqttwrap
 from . import wifi
 from . import config
+from . import ntpclient
 
 import _thread
 
@@ -49,6 +50,7 @@ else:
 msgtimer: Timer = Timer(0)
 measuretimer: Timer = Timer(1)
 reboottimer: Timer = Timer(2)
+sampletimer: Timer = Timer(3)
 # esp32: four hardware-timers available
 
 lock: _thread.LockType | config.DummyLock = config.DummyLock(name="main", loglevel=logging.INFO)
@@ -63,7 +65,7 @@ def reboot_trigger(_: object=None) -> None:
     logger.info(f"{timestring}::rebooting...")
     if mqttwrap is not None:
         mqttwrap.publish_one(
-            topic=mqttwrap.get_feed("loggingfeed"),
+            topic=mqttwrap.topic("loggingfeed"),
             msg=f"rebooting at {timestring}",
             retain=True,
             qos=1,
@@ -72,6 +74,64 @@ def reboot_trigger(_: object=None) -> None:
     machine.reset()
 
 
+def handle_commands() -> None:
+    """ executes the commands received via the controlfeed """
+    ts_cmd_arg: tuple[int, str, str | None] | None
+
+    while True:
+        logger.debug("main.py()::handle_commands::while...")
+        ts_cmd_arg = mqttwrap.pop_cmd_received()
+        if ts_cmd_arg is None:
+            break
+
+        cmd: str = ts_cmd_arg[1]
+        if cmd == "reboot" or cmd == "reset":
+            logger.info("reboot command received...")
+            reboot_trigger()
+        elif cmd == "switchap":
+            logger.info("switchap command received...")
+        elif cmd == "rescanwifi":
+            logger.info("rescanwifi command received...")
+        else:
+            logger.warning("unknown command: %s arg=%s", cmd, ts_cmd_arg[2])
+
+
+def connection_tick() -> None:
+    """ (re)connects wifi+mqtt, receives messages, pings/sends status if due, drains the outqueue
+        and handles the received commands - to be called with lock held (the asyncio runtime has its own
+        tasks for this, see runtime_async) """
+    global WATCHDOG
+
+    # with outqueue: do not block (or reset) if offline - measurements are queued meanwhile
+    reset_on_failure: bool = mqttwrap.reset_on_failure()
+    wifi.ensure_wifi_catch_reset(reset_if_wifi_fails=reset_on_failure, watchdog=WATCHDOG, blocking=reset_on_failure)
+    if WATCHDOG:
+        WATCHDOG.feed()
+
+    logger.debug("main.py()::connection_tick::ensuring mqtt_connect...")
+    mqttwrap.ensure_mqtt_catch_reset(reset_if_mqtt_fails=reset_on_failure, watchdog=WATCHDOG)
+    if WATCHDOG:
+        WATCHDOG.feed()
+
+    if mqttwrap.is_connected():
+        logger.debug("main.py()::connection_tick::check_msgs called...")
+        mqttwrap.check_msgs(reset_if_mqtt_fails=True, watchdog=WATCHDOG)  # check for connect-error!
+        if WATCHDOG:
+            WATCHDOG.feed()
+
+        mqttwrap.drain_outqueue(watchdog=WATCHDOG)
+        if WATCHDOG:
+            WATCHDOG.feed()
+
+    # background ntp refine - never blocks
+    try:
+        ntpclient.tick()
+    except OSError as ex:
+        logger.warning("main.py()::connection_tick::ntpclient.tick failed: %r", ex)
+
+    handle_commands()
+
+
 def check_msgs(_: object=None) -> None:
     global lock, DISABLE_INET, WATCHDOG
 
@@ -105,39 +165,7 @@ def check_msgs(_: object=None) -> None:
         try:
             #with lock:
             logger.debug("main.py()::check:msgs::LOCK acquired...")
-            wifi.ensure_wifi_catch_reset(reset_if_wifi_fails=True, watchdog=WATCHDOG)
-            if WATCHDOG:
-                WATCHDOG.feed()
-
-            logger.debug("main.py()::check:msgs::ensuring mqtt_connect...")
-            mqttwrap.ensure_mqtt_catch_reset(reset_if_mqtt_fails=True, watchdog=WATCHDOG)
-            if WATCHDOG:
-                WATCHDOG.feed()
-
-            logger.debug("main.py()::check:msgs::check_msgs called...")
-            mqttwrap.check_msgs(reset_if_mqtt_fails=True, watchdog=WATCHDOG)  # check for connect-error!
-            if WATCHDOG:
-                WATCHDOG.feed()
-
-            ts_cmd_arg: tuple[int, str, str | None] | None
-
-            while True:
-                logger.debug("main.py()::check:msgs::while...")
-                ts_cmd_arg = mqttwrap.pop_cmd_received()
-                if ts_cmd_arg is None:
-                    break
-
-                cmd: str = ts_cmd_arg[1]
-                if cmd == "reboot" or cmd == "reset":
-                    logger.info("reboot command received...")
-                    reboot_trigger()
-                elif cmd == "switchap":
-                    logger.info("switchap command received...")
-                elif cmd == "rescanwifi":
-                    logger.info("rescanwifi command received...")
-                else:
-                    logger.warning(f"unknown command: {cmd} arg={ts_cmd_arg[2]}")
-
+            connection_tick()
         except Exception as ex:
             _out = io.StringIO()
             sys.print_exception(ex)
@@ -182,11 +210,21 @@ if "chckmsgs_period_ms" in config.data:
 if "measuretimer_period_ms" in config.data:
     MEASURETIMER_PERIOD_MS = config.get_config_data_int(config.data, "measuretimer_period_ms")
 
+# "timers" (default): hardware timers + micropython.schedule
+# "asyncio": cooperative tasks (see runtime_async.py) - no hardware timers: measuring, sampling, the connection
+#            handling and the forced reboot all run as tasks
+RUNTIME_TIMERS: str = "timers"
+RUNTIME_ASYNCIO: str = "asyncio"
+RUNTIME: str = RUNTIME_TIMERS
+if "runtime" in config.data:
+    RUNTIME = config.get_config_data_str(config.data, "runtime")
+    assert RUNTIME in (RUNTIME_TIMERS, RUNTIME_ASYNCIO), f"FAIL::main.py::{RUNTIME=} unknown"
+
 logger.debug(f"main.py::{mainc}::Before setup definition")
 mainc += 1
 
 def setup() -> None:
-    global msgtimer, measuretimer, MEASURETIMER_PERIOD_MS, CHCKMSGS_PERIOD_MS
+    global msgtimer, measuretimer, sampletimer, MEASURETIMER_PERIOD_MS, CHCKMSGS_PERIOD_MS
     global DISABLE_INET, WATCHDOG, lock
 
     if config.ENABLE_WATCHDOG:
@@ -197,14 +235,17 @@ def setup() -> None:
 
     logger.debug("main::setup()")
 
-    check_msgs()
+    # the asyncio runtime does the first connection tick from its task (the client is set up for it)
+    if RUNTIME == RUNTIME_TIMERS:
+        check_msgs()
 
     if WATCHDOG:
         WATCHDOG.feed()
 
-    msgtimer.init(
-        period=CHCKMSGS_PERIOD_MS, mode=machine.Timer.PERIODIC, callback=check_msgs_callback
-    )
+    if RUNTIME == RUNTIME_TIMERS:
+        msgtimer.init(
+            period=CHCKMSGS_PERIOD_MS, mode=machine.Timer.PERIODIC, callback=check_msgs_callback
+        )
 
     # better put that classes
     from . import measurements
@@ -213,6 +254,7 @@ def setup() -> None:
         measurements.lock = _thread.allocate_lock()
 
     measurements.DISABLE_INET = DISABLE_INET
+    measurements.MEASURE_TELE_PERIOD = MEASURE_TELE_PERIOD_S
 
     import micropython
 
@@ -226,14 +268,20 @@ def setup() -> None:
 
     # measurement will be executed each MEASURETIMER_PERIOD_MS; MEASURE_TELE_PERIOD will be checked if "overdue";
     # also if threshold since last sent measurement is exceeeded
-    # better put internals (ina etc. into method/class)
-    if measurements.ina is not None or measurements.dht11 is not None or measurements.dht22 is not None:
+    if RUNTIME == RUNTIME_TIMERS and len(measurements.SENSORS) > 0:
         measuretimer.init(
             period=MEASURETIMER_PERIOD_MS, mode=machine.Timer.PERIODIC, callback=measurements.measure_callback
         )
 
+    # the asyncio runtime samples from a task (see runtime_async)
+    sample_period_ms: int = measurements.get_sample_period_ms()
+    if RUNTIME == RUNTIME_TIMERS and sample_period_ms > 0:
+        sampletimer.init(
+            period=sample_period_ms, mode=machine.Timer.PERIODIC, callback=measurements.sample_callback
+        )
 
-    if config.get_config_data_int(config.data, "forcerestart_after_running_seconds") > 0:
+
+    if RUNTIME == RUNTIME_TIMERS and config.get_config_data_int(config.data, "forcerestart_after_running_seconds") > 0:
         reboottimer.init(
             period=config.get_config_data_int(config.data, "forcerestart_after_running_seconds") * 1_000,
             mode=machine.Timer.ONE_SHOT,
@@ -289,6 +337,12 @@ def main() -> None:
         setup()  # also calls setup_pins
         logger.debug("main.py::setup() done.")
 
+        if RUNTIME == RUNTIME_ASYNCIO:
+            # the first measurement is taken by the measure task right away
+            from . import runtime_async
+            logger.debug("main.py::calling runtime_async.run() - does not return")
+            runtime_async.run()
+
         logger.debug("main.py::calling import .measurements.main")
 
         from .measurements import main as measurements_main
@@ -2,11 +2,15 @@ import gc
 import io
 import sys
 from . import logging, time
+from . import clock
 import micropython
 from .time import sleep  # type: ignore[attr-defined]
 from machine import Timer, WDT
 import machine
 
+if sys.implementation.name != "micropython":
+    from typing import Callable
+
 from . import mqttwrap
 from . import wifi
 from . import config
@@ -43,6 +47,9 @@ measurec += 1
 import dht
 
 from . usmbus import SMBus
+from .ringbuffer import RingBuffer
+from .deadband import Deadband
+from .batch import Batch
 
 soft_i2cbus: machine.SoftI2C | None = None
 ssd: SH1106_I2C | SSD1306_I2C | None = None  # type: ignore
@@ -94,19 +101,15 @@ uart2: machine.UART | None = None
 pin_low: bool = False
 
 # MEASURE_TELE_PERIOD: int = 300
+# will be set by call from main (from config "measure_tele_period_s") before setup_pins()
 MEASURE_TELE_PERIOD: int = 60
 
-# TODO HT20251201 -> make it a map/any other container structure...
-last_ina_measure_sent_gmt: float | None = None
-last_dht11_measure_sent_gmt: float | None = None
-last_dht22_measure_sent_gmt: float | None = None
-
 
 def handle_pin_interrupt_falling_rising(arg_pin: machine.Pin) -> None:
     global pin_low
     v: float | bool | int = arg_pin.value()
     pin_low = 0 == v
-    logger.debug(f"handle_pin_value :: {v} {arg_pin=}")
+    logger.debug("handle_pin_value :: %s arg_pin=%r", v, arg_pin)
 
 
 logger.debug(f"measurements.py::{measurec}::Before setup_pins definition")
@@ -192,6 +195,8 @@ def setup_pins() -> None:
 
             # ina.configure(avg_mode=ina.AVG_1024BIT, bus_ct=ina.VCT_204us_BIT, shunt_ct=ina.VCT_8244us_BIT)  # make avg-mode configurable ?!
 
+            register_sensor(INA226Sensor(device=ina, config_section=ina226c))
+
     i2c: dict[str, str | float | int | bool] = config.get_config_data_dict(config.data, "i2c")
     if config.get_config_data_bool(i2c, "enabled"):
         if not sdapin:
@@ -268,6 +273,7 @@ def setup_pins() -> None:
         dht22_input_pin: machine.Pin = machine.Pin(dipin, machine.Pin.IN)
 
         dht22 = dht.DHT22(dht22_input_pin)
+        register_sensor(DHTSensor(name="dht22", device=dht22, config_section=dht22_c))
 
     dht11_c: dict[str, str | float | int | bool] = config.get_config_data_dict(config.data, "dht11")
     if config.get_config_data_bool(dht11_c, "enabled"):
@@ -277,6 +283,7 @@ def setup_pins() -> None:
         dht11_input_pin: machine.Pin = machine.Pin(d11ipin, machine.Pin.IN)
 
         dht11 = dht.DHT11(dht11_input_pin)
+        register_sensor(DHTSensor(name="dht11", device=dht11, config_section=dht11_c))
 
     adc: dict[str, str | float | int | bool] = config.get_config_data_dict(config.data, "adc")
     if config.get_config_data_bool(adc, "enabled"):
@@ -370,11 +377,14 @@ class DHTREADDATA:
             self,
             temperature: float,
             humidity: float,
-            measure_device_name: str
+            measure_device_name: str,
+            acquired_us: int | None = None,
     ):
         self.temperature = temperature
         self.humidity = humidity
         self.measure_device_name = measure_device_name
+        # when the reading was taken (clock.now_us()) - the created_at of the published messages
+        self.acquired_us: int = clock.now_us() if acquired_us is None else acquired_us
 
     def to_dict(self) -> dict:
         r: dict = {}
@@ -398,12 +408,17 @@ class INAREADDATA:
             supplyvoltage: float,
             shuntvoltage: float,
             power: float,
+            stats: dict | None = None,
+            acquired_us: int | None = None,
     ):
         self.current = current
         self.busvoltage = busvoltage
         self.supplyvoltage = supplyvoltage
         self.shuntvoltage = shuntvoltage
         self.power = power
+        self.stats = stats  # aggregates of the high-rate samples (if sampling is enabled)
+        # when the reading was taken (clock.now_us()) - the created_at of the published messages
+        self.acquired_us: int = clock.now_us() if acquired_us is None else acquired_us
 
     def to_dict(self) -> dict:
         r: dict = {}
@@ -414,127 +429,112 @@ class INAREADDATA:
         r["supplyvoltage"] = self.supplyvoltage
         r["power"] = self.power
 
-        return r
-
+        if self.stats is not None:
+            r["stats"] = self.stats
 
-last_ina_measure_sent_data: INAREADDATA | None = None
-last_dht11_measure_sent_data: DHTREADDATA | None = None
-last_dht22_measure_sent_data: DHTREADDATA | None = None
+        return r
 
 
 def ina226read(ina226: INA226) -> INAREADDATA:  # type: ignore
+    acquired_us: int = clock.now_us()
+    snap: INA226Snapshot = ina226.snapshot()  # type: ignore
+
     inadata: INAREADDATA = INAREADDATA(
-        current=ina226.current(),
-        busvoltage=ina226.voltage(),
-        supplyvoltage=ina226.supply_voltage(),
-        shuntvoltage=ina226.shunt_voltage(),
-        power=ina226.power(),
+        current=snap.current,
+        busvoltage=snap.busvoltage,
+        supplyvoltage=snap.supplyvoltage,
+        shuntvoltage=snap.shuntvoltage,
+        power=snap.power,
+        acquired_us=acquired_us,
     )
 
-    logger.info("Bus Voltage    : %.3f V" % inadata.busvoltage)
-    logger.info("Bus Current    : %.3f mA" % inadata.current)
-    logger.info("Supply Voltage : %.3f V" % inadata.supplyvoltage)
-    logger.info("Shunt voltage  : %.3f mV" % inadata.shuntvoltage)
-    logger.info("Power          : %.3f mW" % inadata.power)
+    logger.info("Bus Voltage    : %.3f V", inadata.busvoltage)
+    logger.info("Bus Current    : %.3f mA", inadata.current)
+    logger.info("Supply Voltage : %.3f V", inadata.supplyvoltage)
+    logger.info("Shunt voltage  : %.3f mV", inadata.shuntvoltage)
+    logger.info("Power          : %.3f mW", inadata.power)
 
     return inadata
 
 
-def send_data_to_mosquitto(data: INAREADDATA | DHTREADDATA) -> None:
-    global DISABLE_INET
-
-    if DISABLE_INET:
-        return
+def _publish_value(topicd: bytes, value: float | dict, timestring: str, timesecs: int) -> None:
+    msgd: bytes | memoryview = mqttwrap.value_to_mqtt_payload(topicd, value, timestring, timesecs)
 
-    wifi.ensure_wifi_catch_reset(reset_if_wifi_fails=True)
-    mqttwrap.ensure_mqtt_catch_reset(reset_if_mqtt_fails=True)
+    logger.info("send_data_to_mosquitto(%s): %d bytes", topicd, len(msgd))
+    logger.debug(lambda: "send_data_to_mosquitto(%r): %r" % (topicd, bytes(msgd)))
+    mqttwrap.publish_or_enqueue(
+        topic=topicd,
+        msg=msgd,
+        retain=True,
+        qos=1,
+    )
 
-    timestring: str = time.getisotimenow()
 
-    msgd: str|None = None
-    topicd: str|None = None
+def send_data_to_mosquitto(data: INAREADDATA | DHTREADDATA, feeds: list[tuple[str, bytes]], changed: list[tuple[str, bytes]] | None = None) -> None:
+    """ publishes data according to mqttwrap.publish_profile
 
-    if isinstance(data, INAREADDATA):
-        msgd = mqttwrap.value_to_mqtt_string(value=data.current, created_at=timestring)
-        topicd = mqttwrap.get_feed("mafeed")
+        feeds   -- (attribute, topic handle) of the per-value feeds (SensorDriver.channel_topics)
+        changed -- the subset of feeds whose values triggered sending - only used by the "bundle" profile
+                   with bundle_changed_feeds enabled
+    """
+    global DISABLE_INET
 
-        logger.info(f"send_data_to_mosquitto({topicd}): {msgd}")
+    if DISABLE_INET:
+        return
 
-        mqttwrap.publish_one(
-            topic=topicd,
-            msg=msgd,
-            retain=True,
-            qos=1,
-            reset_if_mqtt_fails=True
-        )
+    if mqttwrap.reset_on_failure():
+        wifi.ensure_wifi_catch_reset(reset_if_wifi_fails=True)
+        mqttwrap.ensure_mqtt_catch_reset(reset_if_mqtt_fails=True)
+    # else: (re)connecting is left to main.check_msgs - offline the messages are just queued
 
-        msgd = mqttwrap.value_to_mqtt_string(value=data.busvoltage, created_at=timestring)
-        topicd = mqttwrap.get_feed("busvoltagefeed")
+    # all messages of a reading carry the time it was taken (not the time of publishing)
+    timesecs: int = data.acquired_us // 1_000_000
+    timestring: str = clock.isotime(data.acquired_us)
 
-        logger.info(f"send_data_to_mosquitto({topicd}): {msgd}")
-        mqttwrap.publish_one(
-            topic=topicd,
-            msg=msgd,
-            retain=True,
-            qos=1,
-            reset_if_mqtt_fails=True
-        )
+    if mqttwrap.publish_profile == mqttwrap.PUBLISH_PROFILE_BUNDLE:
+        _publish_value(mqttwrap.topic(mqttwrap.bundle_feedname), data.to_dict(), timestring, timesecs)
 
-        msgd = mqttwrap.value_to_mqtt_string(value=data.to_dict(), created_at=timestring)
-        topicd = mqttwrap.get_feed("loggingfeed")
+        if mqttwrap.bundle_changed_feeds and changed:
+            for attr, topicd in changed:
+                _publish_value(topicd, getattr(data, attr), timestring, timesecs)
+    else:
+        for attr, topicd in feeds:
+            _publish_value(topicd, getattr(data, attr), timestring, timesecs)
+        _publish_value(mqttwrap.topic("loggingfeed"), data.to_dict(), timestring, timesecs)
 
-        logger.info(f"send_data_to_mosquitto({topicd}): {msgd}")
-        mqttwrap.publish_one(
-            topic=topicd,
-            msg=msgd,
-            retain=True,
-            qos=1,
-            reset_if_mqtt_fails=True
-        )
-    elif isinstance(data, DHTREADDATA):
-        msgd = mqttwrap.value_to_mqtt_string(value=data.temperature, created_at=timestring)
-        topicd = mqttwrap.get_feed(f"{data.measure_device_name}_temperaturefeed")
-
-        logger.info(f"send_data_to_mosquitto({topicd}): {msgd}")
-        mqttwrap.publish_one(
-            topic=topicd,
-            msg=msgd,
-            retain=True,
-            qos=1,
-            reset_if_mqtt_fails=True
-        )
+    gc.collect()
+    logger.debug("gc.mem_free()=%d", gc.mem_free())
 
-        msgd = mqttwrap.value_to_mqtt_string(value=data.humidity, created_at=timestring)
-        topicd = mqttwrap.get_feed(f"{data.measure_device_name}_humidityfeed")
 
-        logger.info(f"send_data_to_mosquitto({topicd}): {msgd}")
-        mqttwrap.publish_one(
-            topic=topicd,
-            msg=msgd,
-            retain=True,
-            qos=1,
-            reset_if_mqtt_fails=True
-        )
+def send_batch_to_mosquitto(sensor_name: str, batch: Batch) -> None:
+    """ publishes the collected readings of batch as one message on the batchfeed """
+    global DISABLE_INET
 
-        msgd = mqttwrap.value_to_mqtt_string(value=data.to_dict(), created_at=timestring)
-        topicd = mqttwrap.get_feed("loggingfeed")
+    if DISABLE_INET or batch.n == 0:
+        return
 
-        logger.info(f"send_data_to_mosquitto({topicd}): {msgd}")
-        mqttwrap.publish_one(
-            topic=topicd,
-            msg=msgd,
-            retain=True,
-            qos=1,
-            reset_if_mqtt_fails=True
-        )
+    if mqttwrap.reset_on_failure():
+        wifi.ensure_wifi_catch_reset(reset_if_wifi_fails=True)
+        mqttwrap.ensure_mqtt_catch_reset(reset_if_mqtt_fails=True)
+
+    value: dict = batch.to_value()
+    value["sensor"] = sensor_name
+    msgd: bytes | memoryview = mqttwrap.batch_to_mqtt_payload(value, time.getisotime(batch.first_secs()), batch.compress)
+    topicd: bytes = mqttwrap.batch_topic()
+
+    logger.info("send_batch_to_mosquitto(%s): %d readings, %d bytes", topicd, batch.n, len(msgd))
+    mqttwrap.publish_or_enqueue(
+        topic=topicd,
+        msg=msgd,
+        retain=True,
+        qos=1,
+    )
 
     gc.collect()
-    logger.debug(f"{gc.mem_free()=}")
 
 
 def measure_masked_arg(arg: int) -> None:
     global lock, WATCHDOG
-    global ina, dht11, dht22
 
     if WATCHDOG:
         WATCHDOG.feed()
@@ -545,7 +545,7 @@ def measure_masked_arg(arg: int) -> None:
     send_data_forced: bool = bool(arg & 0b10)
     send_data_enabled: bool = bool(arg & 0b01)
 
-    logger.debug(f"measurements.py::measure_masked_arg: {send_data_forced=} {send_data_enabled=} ")
+    logger.debug("measurements.py::measure_masked_arg: send_data_forced=%r send_data_enabled=%r", send_data_forced, send_data_enabled)
 
     gc.collect()
 
@@ -567,28 +567,9 @@ def measure_masked_arg(arg: int) -> None:
         logger.debug("measurements.py::measure_masked_arg()::FAILED TO ACQUIRE LOCK...")
         return
 
-    for measuredevice in ["ina", "dht11", "dht22"]:
-        if measuredevice is None:
-            continue
-
+    for sensor in SENSORS:
         try:
-            if measuredevice == "ina" and ina is not None:
-                ina226_measure(
-                    send_data_forced=send_data_forced, send_data_enabled=send_data_enabled
-                )
-            elif measuredevice == "dht11" and dht11 is not None:
-                dht_measure(
-                    dht_measuredevice=dht11,
-                    send_data_forced=send_data_forced,
-                    send_data_enabled=send_data_enabled
-                )
-            elif measuredevice == "dht22" and dht22 is not None:
-                dht_measure(
-                    dht_measuredevice=dht22,
-                    send_data_forced=send_data_forced,
-                    send_data_enabled=send_data_enabled
-                )
-
+            sensor.measure(send_data_forced=send_data_forced, send_data_enabled=send_data_enabled)
         except Exception as ex:
             _out = io.StringIO()
             sys.print_exception(ex)
@@ -603,191 +584,375 @@ def measure_masked_arg(arg: int) -> None:
     lock.release()
 
 
-logger.debug(f"measurements.py::{measurec}::Before dht_measure definition")
+logger.debug(f"measurements.py::{measurec}::Before SensorDriver definitions")
 measurec += 1
 
 
-def dht_measure(dht_measuredevice: dht.DHT11 | dht.DHT22, send_data_forced: bool = False,
-                send_data_enabled: bool = False) -> None:
-    global last_dht11_measure_sent_gmt, last_dht22_measure_sent_gmt, MEASURE_TELE_PERIOD, WATCHDOG
-    global last_dht11_measure_sent_data, last_dht22_measure_sent_data
+class SensorDriver:
+    """ one configured measurement device with its own measure-period, last-sent state and publish policy
 
-    if WATCHDOG:
-        WATCHDOG.feed()
+        drivers are created in setup_pins() and put into SENSORS via register_sensor() - the measure-tick
+        then only iterates over the active instances.
 
-    now: float = time.mktime(time.gmtime())  # type: ignore[attr-defined]
+        not used on its own: the concrete drivers (DHTSensor, INA226Sensor) implement read() - returning
+        the device's READDATA - and measure(); SENSORS is typed with them.
 
-    dhtdata_last: DHTREADDATA | None = None
-    send_data_overdue: bool = False
+        optional keys in the device's config section:
+            period_ms       -- measure this device only every period_ms (default: every measure tick)
+            tele_period_s   -- default max_silence_s of the device's channels (default: MEASURE_TELE_PERIOD)
 
-    n: str = "UNDEFINED"
-    if dht_measuredevice == dht11:
-        n = "dht11"
-        dhtdata_last = last_dht11_measure_sent_data
-        send_data_overdue = not last_dht11_measure_sent_gmt or now - last_dht11_measure_sent_gmt > MEASURE_TELE_PERIOD
-    elif dht_measuredevice == dht22:
-        n = "dht22"
-        dhtdata_last = last_dht22_measure_sent_data
-        send_data_overdue = not last_dht22_measure_sent_gmt or now - last_dht22_measure_sent_gmt > MEASURE_TELE_PERIOD
+        the send decision is made by the Deadband of each channel (attribute of the read data -> feed);
+        if any of them triggers, the whole reading is sent.
 
-    logger.debug(f"{send_data_overdue=} {send_data_forced=}")
+        drivers with sample_period_ms > 0 additionally get sample() called from the sample timer.
 
-    dht_measuredevice.measure()
+        with an enabled "batch" section every reading is collected in a Batch instead (no deadband decision)
+        and the batch is sent as one message once it is due (or send_data_forced).
+    """
 
-    dhtdata: DHTREADDATA = DHTREADDATA(
-        temperature=dht_measuredevice.temperature(),
-        humidity=dht_measuredevice.humidity(),
-        measure_device_name=n
-    )
+    sample_period_ms: int = 0
 
-    logger.info(f"dht_measure({n}): {dhtdata.measure_device_name=}")
-    logger.info(f"dht_measure({n}): {dhtdata.temperature=}")
-    logger.info(f"dht_measure({n}): {dhtdata.humidity=}")
+    def __init__(self, name: str, config_section: dict[str, str | float | int | bool]) -> None:
+        self.name: str = name
 
-    temperature_change_send_trigger: bool = False
-    humidity_change_send_trigger: bool = False
+        self.period_ms: int = 0
+        if "period_ms" in config_section:
+            self.period_ms = config.get_config_data_int(config_section, "period_ms")
 
-    if dhtdata_last:
-        temperature_diff: float = abs(
-            dhtdata.temperature - dhtdata_last.temperature
-        )
-        humidity_diff: float = abs(
-            dhtdata.humidity - dhtdata_last.humidity
-        )
+        self.tele_period_s: int = MEASURE_TELE_PERIOD
+        if "tele_period_s" in config_section:
+            self.tele_period_s = config.get_config_data_int(config_section, "tele_period_s")
 
-        humidity_diff_change_threshold: float = abs(
-            dhtdata_last.humidity * 0.1
-        )
-        temperature_diff_change_threshold: float = abs(
-            dhtdata_last.temperature * 0.1
-        )
+        self.last_measure_ticks: int | None = None
+        self.last_sent_gmt: float | None = None
+        self.last_sent_data: INAREADDATA | DHTREADDATA | None = None
 
-        humidity_diff_change_threshold = min(
-            humidity_diff_change_threshold, 1.0
-        )
-        temperature_diff_change_threshold = min(
-            temperature_diff_change_threshold, 0.1
-        )
+        # (attribute name in read data, deadband of the feed this attribute is sent to)
+        self.channels: list[tuple[str, Deadband]] = []
+        # (attr, topic handle) - same order as channels
+        self.channel_topics: list[tuple[str, bytes]] = []
+
+        # created with the first reading (once the channels are known) if batching is configured
+        self.batch: Batch | None = None
+        self._batch_checked: bool = False
 
-        logger.debug(f"{n}\t{temperature_diff=} {humidity_diff=}")
-        logger.debug(
-            f"{n}\t{temperature_diff_change_threshold=} {humidity_diff_change_threshold=}"
+    def add_channel(self, attr: str, feedname: str, rel_threshold: float | None = None, rel_cap: float | None = None) -> None:
+        """ rel_threshold and rel_cap are the defaults if nothing is configured for feedname """
+        self.channels.append(
+            (
+                attr,
+                Deadband.from_config(
+                    name=feedname,
+                    rel_threshold=rel_threshold,
+                    rel_cap=rel_cap,
+                    max_silence_s=self.tele_period_s
+                )
+            )
         )
+        self.channel_topics.append((attr, mqttwrap.topic(feedname)))
 
-        if temperature_diff > temperature_diff_change_threshold:
-            temperature_change_send_trigger = True
+    def sample(self) -> None:
+        """ takes one high-rate sample - called every sample_period_ms; must not allocate """
+        pass
 
-        if humidity_diff > humidity_diff_change_threshold:
-            humidity_change_send_trigger = True
-    else:
-        logger.debug("no previous sent data found...")
+    def on_sent(self) -> None:
+        """ called after the data returned by read() was sent """
+        pass
 
-    logger.debug(
-        f"{send_data_forced=} {send_data_enabled=} {send_data_overdue=}"
-    )
-    logger.debug(
-        f"{temperature_change_send_trigger=} {humidity_change_send_trigger=}"
-    )
+    def is_due(self) -> bool:
+        if self.period_ms <= 0 or self.last_measure_ticks is None:
+            return True
 
-    if (
-            send_data_forced
-            or (send_data_enabled and send_data_overdue)
-            or (temperature_change_send_trigger or humidity_change_send_trigger)
-    ):
-        logger.debug("sending data...")
+        return time.ticks_diff(time.ticks_ms(), self.last_measure_ticks) >= self.period_ms  # type: ignore[attr-defined]
 
-        send_data_to_mosquitto(dhtdata)
+    def start_measure(self) -> bool:
+        """ True if a measurement is due - the measure period then starts over """
+        if not self.is_due():
+            return False
 
-        if n == "dht11":
-            last_dht11_measure_sent_gmt = now
-            last_dht11_measure_sent_data = dhtdata
-        elif n == "dht22":
-            last_dht22_measure_sent_gmt = now
-            last_dht22_measure_sent_data = dhtdata
+        if WATCHDOG:
+            WATCHDOG.feed()
 
-        logger.debug("data sent")
+        self.last_measure_ticks = time.ticks_ms()  # type: ignore[attr-defined]
+        return True
+
+    def process(self, data: INAREADDATA | DHTREADDATA, send_data_forced: bool = False, send_data_enabled: bool = False) -> None:
+        """ makes the send decision for data (as returned by read()) and sends it """
+        now: int = data.acquired_us // 1_000_000
+
+        if not self._batch_checked:
+            self.batch = Batch.from_config([attr for attr, _ in self.channels])
+            self._batch_checked = True
+
+        if self.batch is not None:
+            self.batch.add(now, data)  # type: ignore[arg-type]
+            self.on_sent()  # the reading is consumed (i.e. restarts the INA226 sample window)
+
+            if send_data_forced or self.batch.is_due(now):  # type: ignore[arg-type]
+                send_batch_to_mosquitto(self.name, self.batch)
+                self.batch.reset()
+                self.last_sent_gmt = now
+                self.last_sent_data = data
+            return
+
+        send: bool = send_data_forced
+        stats: dict | None = data.stats if isinstance(data, INAREADDATA) else None
+        for attr, deadband in self.channels:
+            if deadband.check(getattr(data, attr), now, send_data_enabled):
+                send = True
+            elif stats is not None and attr in stats and (
+                    deadband.check(stats[attr]["max"], now, send_data_enabled)
+                    or deadband.check(stats[attr]["min"], now, send_data_enabled)):
+                # a short spike (or dip) within the sample window - which barely moves the mean
+                send = True
+
+        if send:
+            logger.debug("sending data...")
+
+            send_data_to_mosquitto(
+                data,
+                feeds=self.channel_topics,
+                changed=[self.channel_topics[i] for i in range(len(self.channels)) if self.channels[i][1].triggered]
+            )
+            for attr, deadband in self.channels:
+                deadband.commit(getattr(data, attr), now)
 
+            self.last_sent_gmt = now
+            self.last_sent_data = data
+            self.on_sent()
 
-def ina226_measure(send_data_forced: bool = False, send_data_enabled: bool = False) -> None:
-    global last_ina_measure_sent_gmt, last_ina_measure_sent_data, MEASURE_TELE_PERIOD, ina, WATCHDOG
+            logger.debug("data sent")
 
-    if WATCHDOG:
-        WATCHDOG.feed()
 
-    now: float = time.mktime(time.gmtime())  # type: ignore[attr-defined]
-    send_data_overdue: bool = (
-            not last_ina_measure_sent_gmt or now - last_ina_measure_sent_gmt > MEASURE_TELE_PERIOD
-    )
-    logger.debug(f"{send_data_overdue=} {send_data_forced=}")
+class DHTSensor(SensorDriver):
+    def __init__(self, name: str, device: dht.DHT11 | dht.DHT22, config_section: dict[str, str | float | int | bool]) -> None:
+        super().__init__(name=name, config_section=config_section)
+        self.device: dht.DHT11 | dht.DHT22 = device
 
-    assert ina is not None
+        self.add_channel("temperature", f"{name}_temperaturefeed", rel_threshold=0.1, rel_cap=0.1)
+        self.add_channel("humidity", f"{name}_humidityfeed", rel_threshold=0.1, rel_cap=1.0)
 
-    ct: int = 0
-    while 1:
-        ct += 1
-        if ina.is_conversion_ready():
-            sleep(0.2)
-            logger.info(f"=====> Conversion ready (after {ct} loops)")
-            inadata: INAREADDATA = ina226read(ina)
+    def measure(self, send_data_forced: bool = False, send_data_enabled: bool = False) -> None:
+        if self.start_measure():
+            self.process(self.read(), send_data_forced=send_data_forced, send_data_enabled=send_data_enabled)
 
-            current_change_send_trigger: bool = False
-            busvoltage_change_send_trigger: bool = False
+    def read(self) -> DHTREADDATA:
+        acquired_us: int = clock.now_us()
+        self.device.measure()
 
-            if last_ina_measure_sent_data:
-                current_diff: float = abs(
-                    inadata.current - last_ina_measure_sent_data.current
-                )
-                busvoltage_diff: float = abs(
-                    inadata.busvoltage - last_ina_measure_sent_data.busvoltage
-                )
+        dhtdata: DHTREADDATA = DHTREADDATA(
+            temperature=self.device.temperature(),
+            humidity=self.device.humidity(),
+            measure_device_name=self.name,
+            acquired_us=acquired_us,
+        )
 
-                current_diff_change_threshold: float = abs(
-                    last_ina_measure_sent_data.current * 0.1
-                )
-                busvoltage_diff_change_threshold: float = abs(
-                    last_ina_measure_sent_data.busvoltage * 0.1
-                )
+        logger.info("DHTSensor(%s): temperature=%r humidity=%r", self.name, dhtdata.temperature, dhtdata.humidity)
+
+        return dhtdata
+
+
+class INA226Sensor(SensorDriver):
+    """ INA226 driver - optionally samples current and bus voltage at a sub-second rate
+
+        optional keys in the ina226 config section (additionally to the SensorDriver ones):
+            sample_period_ms    -- raw-register sampling period (0: disabled, default)
+            samplebuffer_size   -- number of samples held per channel (default: tele_period_s worth of
+                                   samples - at the conversion rate with alert_pin - max. 600)
+            alert_pin           -- pin connected to the INA226 ALERT output (conversion ready, active low)
+
+        with sampling enabled the published current/busvoltage are the means over the buffered samples
+        and min/max/mean/stddev/count are added as "stats" to the logging feed. The deadband also checks
+        min and max - so a short spike is sent right away, not only with the next tele period.
+
+        with alert_pin set no I2C polling is done at all:
+            - without sampling the INA226 is put into triggered mode; the measure tick only starts a
+              conversion and the reading is collected (via micropython.schedule - or by the alert task of
+              the asyncio runtime, see alert_callback) once ALERT signals it
+            - with sampling every (continuous) conversion is sampled as soon as ALERT signals it
+              instead of using the sample timer
+    """
+
+    def __init__(self, device: INA226, config_section: dict[str, str | float | int | bool], name: str = "ina") -> None:  # type: ignore
+        super().__init__(name=name, config_section=config_section)
+        self.device: INA226 = device  # type: ignore
+
+        # ~ca. 2cm change bei 16ma für 100cm
+        self.add_channel("current", "mafeed", rel_threshold=0.1, rel_cap=1.0)
+        self.add_channel("busvoltage", "busvoltagefeed", rel_threshold=0.1, rel_cap=0.32)
+
+        self.current_samples: RingBuffer | None = None
+        self.voltage_samples: RingBuffer | None = None
+
+        if "sample_period_ms" in config_section:
+            self.sample_period_ms = config.get_config_data_int(config_section, "sample_period_ms")
+
+        if self.sample_period_ms > 0:
+            # with alert_pin every conversion is sampled - the rate is the INA226's conversion rate then
+            period_us: int = self.sample_period_ms * 1_000
+            if "alert_pin" in config_section:
+                period_us = self.device.conversion_time_us()
+            size: int = min(self.tele_period_s * 1_000_000 // period_us + 1, 600)
+            if "samplebuffer_size" in config_section:
+                size = config.get_config_data_int(config_section, "samplebuffer_size")
+
+            logger.info("INA226Sensor(%s): sampling every %dus into %d slots", self.name, period_us, size)
+            self.current_samples = RingBuffer(size=size, typecode="h")
+            self.voltage_samples = RingBuffer(size=size, typecode="h")
+
+        self.alert_pin: machine.Pin | None = None
+        self._pending: bool = False
+        self._pending_forced: bool = False
+        self._pending_enabled: bool = False
+        # bound once - creating the bound method in the irq handler would allocate
+        self._conversion_ready_ref = self.conversion_ready
+        # set by the asyncio runtime: called by the irq instead of scheduling conversion_ready() - the
+        # runtime's task calls it then (e.g. ThreadSafeFlag.set)
+        self.alert_callback: "Callable[[], None] | None" = None
+
+        if "alert_pin" in config_section:
+            apin: int = config.get_config_data_int(config_section, "alert_pin")
+            logger.info("INA226Sensor(%s): conversion ready alert on PIN %d", self.name, apin)
+
+            self.alert_pin = machine.Pin(apin, machine.Pin.IN, machine.Pin.PULL_UP)
+
+            if self.current_samples is None:
+                self.device.wake(mode=self.device.MODE_TRIG_SH_BUS)
+            else:
+                self.sample_period_ms = 0  # samples are taken on alert - no sample timer needed
 
-                current_diff_change_threshold = min(
-                    current_diff_change_threshold, 1.0
-                )  # ~ca. 2cm change bei 16ma für 100cm
-                busvoltage_diff_change_threshold = min(
-                    busvoltage_diff_change_threshold, 0.32
-                )
+            self.device.enable_conversion_ready_alert(latch=True)
+            self.alert_pin.irq(trigger=machine.Pin.IRQ_FALLING, handler=self._alert_irq)
+            self.device.clear_alert()
+
+    def _alert_irq(self, _: machine.Pin) -> None:
+        if self.alert_callback is not None:
+            self.alert_callback()
+            return
 
-                logger.debug(f"{current_diff=} {busvoltage_diff=}")
-                logger.debug(
-                    f"{current_diff_change_threshold=} {busvoltage_diff_change_threshold=}"
+        try:
+            micropython.schedule(self._conversion_ready_ref, None)
+        except RuntimeError:
+            # schedule queue full - alert stays latched; picked up by the next measure tick
+            pass
+
+    def conversion_ready(self, _: object = None) -> None:
+        """ collects the sample/reading once ALERT signalled a completed conversion """
+        if self.current_samples is not None:
+            self.sample()
+            self.device.clear_alert()  # re-arms the latched alert
+            return
+
+        if not self._pending:
+            self.device.clear_alert()
+            return
+
+        self._pending = False
+        try:
+            with lock:
+                self.process(
+                    ina226read(self.device),
+                    send_data_forced=self._pending_forced,
+                    send_data_enabled=self._pending_enabled
                 )
+        except Exception as ex:
+            _out = io.StringIO()
+            sys.print_exception(ex)
+            sys.print_exception(ex, _out)
 
-                if current_diff > current_diff_change_threshold:
-                    current_change_send_trigger = True
+            logger.error(_out.getvalue())
 
-                if busvoltage_diff > busvoltage_diff_change_threshold:
-                    busvoltage_change_send_trigger = True
-            else:
-                logger.debug("no previous sent data found...")
+    def measure(self, send_data_forced: bool = False, send_data_enabled: bool = False) -> None:
+        if self.alert_pin is None or self.current_samples is not None:
+            if self.start_measure():
+                self.process(self.read(), send_data_forced=send_data_forced, send_data_enabled=send_data_enabled)
+            return
 
-            logger.debug(
-                f"{send_data_forced=} {send_data_enabled=} {send_data_overdue=}"
+        if not self.is_due():
+            return
+
+        if self._pending:
+            logger.warning("INA226Sensor(%s): no conversion ready alert since last trigger - reading directly", self.name)
+            self._pending = False
+            self.start_measure()
+            self.process(self.read(), send_data_forced=send_data_forced, send_data_enabled=send_data_enabled)
+            return
+
+        self.last_measure_ticks = time.ticks_ms()  # type: ignore[attr-defined]
+
+        self._pending_forced = send_data_forced
+        self._pending_enabled = send_data_enabled
+        self._pending = True
+        self.device.trigger()
+
+    def sample(self) -> None:
+        if self.current_samples is None or self.voltage_samples is None:
+            return
+
+        self.current_samples.append(self.device.current_raw())
+        self.voltage_samples.append(self.device.voltage_raw())
+
+    def on_sent(self) -> None:
+        if self.current_samples is not None and self.voltage_samples is not None:
+            self.current_samples.reset()
+            self.voltage_samples.reset()
+
+    def read(self) -> INAREADDATA:
+        # continuous mode: the registers always hold the last completed conversion - no need to poll
+        inadata: INAREADDATA = ina226read(self.device)
+
+        if self.current_samples is not None and self.voltage_samples is not None:
+            current_stats: dict[str, float | int] | None = self.current_samples.stats(
+                scale=self.device.current_lsb_milliamps()
             )
-            logger.debug(
-                f"{current_change_send_trigger=} {busvoltage_change_send_trigger=}"
+            voltage_stats: dict[str, float | int] | None = self.voltage_samples.stats(
+                scale=self.device.voltage_lsb_volts()
             )
 
-            if (
-                    send_data_forced
-                    or (send_data_enabled and send_data_overdue)
-                    or (current_change_send_trigger or busvoltage_change_send_trigger)
-            ):
-                logger.debug("sending data...")
+            if current_stats is not None and voltage_stats is not None:
+                inadata.current = current_stats["mean"]
+                inadata.busvoltage = voltage_stats["mean"]
+                inadata.stats = {"current": current_stats, "busvoltage": voltage_stats}
+
+        return inadata
+
+
+SENSORS: list[DHTSensor | INA226Sensor] = []
 
-                send_data_to_mosquitto(inadata)
-                last_ina_measure_sent_gmt = now
-                last_ina_measure_sent_data = inadata
-                logger.debug("data sent")
 
-            break
+def register_sensor(sensor: DHTSensor | INA226Sensor) -> None:
+    """ adds sensor to the measured devices - replacing an already registered one with the same name """
+    for i in range(len(SENSORS)):
+        if SENSORS[i].name == sensor.name:
+            SENSORS[i] = sensor
+            return
+
+    SENSORS.append(sensor)
+    logger.info("registered sensor %s", sensor.name)
+
+
+def get_sample_period_ms() -> int:
+    """ returns the smallest sample period of all registered sensors (0 if none samples) """
+    ret: int = 0
+    for sensor in SENSORS:
+        if sensor.sample_period_ms > 0 and (ret == 0 or sensor.sample_period_ms < ret):
+            ret = sensor.sample_period_ms
+
+    return ret
+
+
+def sample_scheduled(_: object = None) -> None:
+    for sensor in SENSORS:
+        if sensor.sample_period_ms > 0:
+            sensor.sample()
+
+
+def sample_callback(_: object = None) -> None:
+    try:
+        micropython.schedule(sample_scheduled, None)
+    except RuntimeError:
+        # schedule queue full - just skip this sample
+        pass
 
 
 send_data_forced_always: bool = False
@@ -797,9 +962,7 @@ def measure_callback(trigger: Timer) -> None:
     global WATCHDOG
     global send_data_forced_always
 
-    global ina, dht11, dht22
-
-    logger.debug(f"{type(trigger)=} {trigger=}")
+    logger.debug("type(trigger)=%r trigger=%r", type(trigger), trigger)
     # ina219measureCB::type(trigger)=<class 'Timer'> trigger=Timer(3ffea620; alarm_en=1, auto_reload=1, counter_en=1)
 
     send_data_forced: bool = send_data_forced_always
@@ -811,7 +974,7 @@ def measure_callback(trigger: Timer) -> None:
     if WATCHDOG:
         WATCHDOG.feed()
 
-    if ina is not None or dht11 is not None or dht22 is not None:
+    if len(SENSORS) > 0:
         micropython.schedule(measure_masked_arg, arg)
 
         if WATCHDOG:
@@ -822,29 +985,17 @@ logger.debug(f"measurements.py::{measurec}::Before setup definition")
 measurec += 1
 
 def main() -> None:
-    global ina, dht11, dht22
-
     logger.debug("START::measurements.py::main()")
 
-    if ina is not None or dht11 is not None or dht22 is not None:
-        # ina226_measure(send_data_enabled=True)
+    if len(SENSORS) > 0:
         send_data_forced: bool = send_data_forced_always
         send_data_enabled: bool = True
 
         arg: int = (send_data_forced << 1) | send_data_enabled
         measure_masked_arg(arg)
 
-    for n in ["dht11", "dht22"]:
-        d = None
-        if n == "dht11":
-            d = dht11
-        elif n == "dht22":
-            d = dht22
-
-        if d is not None:
-            logger.debug(f"d={n} {d.measure()=}")
-            logger.debug(f"d={n} {d.temperature()=}")
-            logger.debug(f"d={n} {d.humidity()=}")
+    for sensor in SENSORS:
+        logger.debug("sensor=%s last_sent_data=%s", sensor.name, sensor.last_sent_data.to_dict() if sensor.last_sent_data else None)
 
     logger.debug("DONE::main::main()")
 
@@ -6,6 +6,7 @@ import sys
 import io
 
 from . import logging, time
+from . import clock
 
 logger = logging.get_logger(__name__)
 logger.setLevel(logging.INFO)
@@ -24,8 +25,478 @@ if __name__ in config.get_config_data_dict(config.data, "loglevel"):
 # taken from https://github.com/micropython/micropython-lib/blob/master/micropython/umqtt.simple/umqtt/simple.py
 # and adapted
 import struct
+import select
 import umqtt.simple
 class MQTTClientSimple(umqtt.simple.MQTTClient):
+    """ umqtt.simple client with the retain-bit passed to the callback
+
+        with nonblocking=True (after connect()) the socket stays non-blocking:
+            - incoming bytes are read into a preallocated rx buffer and complete packets are parsed from there -
+              a half-received packet just stays in the buffer until the rest arrives
+            - every outgoing packet is built in one reusable tx buffer and written with a single write
+              (partial writes are continued once the socket is writable again)
+        packets larger than the rx buffer are skipped; the tx buffer grows if needed.
+
+        in non-blocking mode QoS1 publishes are pipelined: up to inflight_window publishes may be
+        un-acknowledged at a time (publish() only waits if the window is full - inflight_window=1 waits
+        for each PUBACK like umqtt.simple). PUBACKs are matched by packet id whenever incoming data is
+        processed. Publishes still un-acknowledged when the connection is lost are re-sent with the
+        DUP flag after the next connect() (hand them over to a new client with adopt_inflight()).
+
+        incoming QoS1 publishes are acknowledged with PUBACK, QoS2 publishes with PUBREC/PUBCOMP. With a
+        persistent session (clean_session=False) the broker re-delivers unacknowledged messages after a
+        reconnect - re-deliveries are recognized by packet id and not passed to the callback a second time
+        (hand the state over to a new client with adopt_rx_state()).
+
+        for the asyncio runtime the non-blocking mode has awaitable counterparts: aread() awaits incoming data,
+        apublish()/aping()/aflush_acks() await the socket being writable (and apublish() the PUBACKs read by
+        aread() in another task) instead of polling/sleeping. With defer_acks the acknowledgements of incoming
+        publishes are not written by the reading code but collected for aflush_acks() - so the writers can be
+        serialized by the caller (one writer at a time, one reader).
+    """
+
+    RECENT_PIDS: int = 8
+    pid: int  # packet id of the last publish/subscribe (set by umqtt.simple)
+
+    def __init__(self, *args, nonblocking: bool = False, rx_size: int = 512, tx_size: int = 512, write_timeout_ms: int = 5_000, inflight_window: int = 1, defer_acks: bool = False, **kwargs) -> None:  # type: ignore
+        super().__init__(*args, **kwargs)
+        self.nonblocking: bool = nonblocking
+        self.defer_acks: bool = defer_acks
+        # (first byte << 16 | pid) of the PUBACK/PUBREC/PUBCOMP still to be written (defer_acks)
+        self._acks: list[int] = []
+        self._areader: "asyncio.StreamReader | None" = None
+        self._awriter: "asyncio.StreamWriter | None" = None
+        # set by the reading code whenever a PUBACK arrived (asyncio) - see _ainflight()
+        self._aacked: "asyncio.Event | None" = None
+        self.write_timeout_ms: int = write_timeout_ms
+        assert inflight_window >= 1
+        self.inflight_window: int = inflight_window
+        # pid -> (topic, msg, retain) of QoS1 publishes without PUBACK so far
+        self._inflight: dict[int, tuple[bytes | str, bytes | str, bool]] = {}
+
+        if nonblocking:
+            self._rx: bytearray = bytearray(rx_size)
+            self._rxmv: memoryview = memoryview(self._rx)
+            self._tx: bytearray = bytearray(tx_size)
+            self._txmv: memoryview = memoryview(self._tx)
+        self._rxlen: int = 0
+        self._discard: int = 0
+        self._suback_pids: list[int] = []
+        self._poll: "select.poll | None" = None
+
+        # inbound dedup: pids of the last QoS1 deliveries, QoS2 pids with PUBREC sent but no PUBREL yet
+        self._recent_pids: list[int] = []
+        self._qos2_pids: list[int] = []
+        self.session_present: bool = False
+
+    def connect(self, clean_session: bool = True, timeout: float | None = None) -> int:  # type: ignore[override]
+        ret: int = super().connect(clean_session=clean_session, timeout=timeout)
+        self.session_present = ret == 1
+        if not self.session_present:
+            # the broker has no state (anymore) which could be re-delivered
+            self._recent_pids = []
+            self._qos2_pids = []
+        if self.nonblocking:
+            self._rxlen = 0
+            self._discard = 0
+            self._suback_pids = []
+            self._acks = []
+            self._areader = None
+            self._awriter = None
+            self._aacked = None
+            self.sock.setblocking(False)  # type: ignore
+            self._poll = select.poll()
+            self._poll.register(self.sock, select.POLLOUT)
+            self._resend_inflight()
+        return ret
+
+    def adopt_inflight(self, inflight: dict[int, tuple[bytes | str, bytes | str, bool]]) -> None:
+        """ takes over the un-acknowledged publishes of a previous (lost) connection - call before connect() """
+        self._inflight = inflight
+        for pid in inflight:
+            if pid > self.pid:
+                self.pid = pid
+
+    def get_inflight(self) -> dict[int, tuple[bytes | str, bytes | str, bool]]:
+        return self._inflight
+
+    def adopt_rx_state(self, rx_state: tuple[list[int], list[int]]) -> None:
+        """ takes over the inbound dedup state (see get_rx_state()) of a previous connection - call before connect() """
+        self._recent_pids, self._qos2_pids = rx_state
+
+    def get_rx_state(self) -> tuple[list[int], list[int]]:
+        return self._recent_pids, self._qos2_pids
+
+    def _accept_publish(self, op: int, pid: int) -> bool:
+        """ False if the incoming publish (QoS > 0) is a re-delivery of one already passed to the callback """
+        if op & 6 == 4:
+            if pid in self._qos2_pids:
+                return False
+            self._qos2_pids.append(pid)
+            return True
+
+        if op & 0x08 and pid in self._recent_pids:
+            return False
+        self._recent_pids.append(pid)
+        if len(self._recent_pids) > self.RECENT_PIDS:
+            self._recent_pids.pop(0)
+        return True
+
+    def _resend_inflight(self) -> None:
+        if not self._inflight:
+            return
+        logger.info("MQTTClientSimple: re-sending %d un-acknowledged publishes", len(self._inflight))
+        for pid, (topic, msg, retain) in self._inflight.items():
+            n: int = self._build_publish(topic, msg, retain, 1, pid, dup=True)
+            self._write_all(self._txmv, n)
+
+    def _next_pid(self) -> int:
+        pid: int = self.pid % 65535 + 1
+        while pid in self._inflight:
+            pid = pid % 65535 + 1
+        self.pid = pid
+        return pid
+
+    def _wait_readable(self, start: int) -> None:
+        """ waits for incoming data - raises OSError once write_timeout_ms (since start) passed """
+        left: int = self.write_timeout_ms - time.ticks_diff(time.ticks_ms(), start)  # type: ignore[attr-defined]
+        if left <= 0:
+            raise OSError(-1)
+        assert self._poll is not None
+        self._poll.modify(self.sock, select.POLLIN)
+        try:
+            self._poll.poll(left)
+        finally:
+            self._poll.modify(self.sock, select.POLLOUT)
+
+    def _wait_inflight(self, limit: int) -> None:
+        """ pumps incoming packets until less than limit publishes are un-acknowledged """
+        start: int = time.ticks_ms()  # type: ignore[attr-defined]
+        while len(self._inflight) >= limit:
+            if self._pump() == 0:
+                self._wait_readable(start)
+
+    def flush(self) -> None:
+        """ waits until all QoS1 publishes are acknowledged """
+        if self.nonblocking:
+            self._wait_inflight(1)
+
+    # --- non-blocking mode: writing ---
+
+    def _write_all(self, buf: memoryview | bytes, n: int) -> None:
+        """ writes buf[:n] - continuing partial writes until all is written or write_timeout_ms passed """
+        assert self.sock is not None
+        off: int = 0
+        while off < n:
+            w: int | None = self.sock.write(buf[off:n])
+            if w is None or w == 0:
+                if not self._poll.poll(self.write_timeout_ms):  # type: ignore
+                    raise OSError(-1)
+                continue
+            off += w
+
+    def _tx_reserve(self, n: int) -> None:
+        if n > len(self._tx):
+            self._tx = bytearray(n)
+            self._txmv = memoryview(self._tx)
+
+    def _tx_put_header(self, first: int, sz: int) -> int:
+        """ fixed header into tx buffer - returns its length """
+        tx: bytearray = self._tx
+        tx[0] = first
+        i: int = 1
+        while sz > 0x7F:
+            tx[i] = (sz & 0x7F) | 0x80
+            sz >>= 7
+            i += 1
+        tx[i] = sz
+        return i + 1
+
+    def _tx_put_bytes(self, off: int, data: bytes | str | memoryview) -> int:
+        if isinstance(data, str):
+            data = data.encode()
+        n: int = len(data)
+        self._txmv[off:off + n] = data
+        return off + n
+
+    def _tx_put_str(self, off: int, data: bytes | str) -> int:
+        if isinstance(data, str):
+            data = data.encode()
+        struct.pack_into("!H", self._tx, off, len(data))
+        return self._tx_put_bytes(off + 2, data)
+
+    def _build_publish(self, topic: bytes | str, msg: bytes | str | memoryview, retain: bool, qos: int, pid: int, dup: bool = False) -> int:
+        """ PUBLISH packet into the tx buffer - returns its length """
+        tlen: int = len(topic.encode() if isinstance(topic, str) else topic)
+        mlen: int = len(msg.encode() if isinstance(msg, str) else msg)
+        sz: int = 2 + tlen + mlen + (2 if qos > 0 else 0)
+        assert sz < 2097152
+        self._tx_reserve(sz + 4)
+
+        off: int = self._tx_put_header(0x30 | dup << 3 | qos << 1 | retain, sz)
+        off = self._tx_put_str(off, topic)
+        if qos > 0:
+            struct.pack_into("!H", self._tx, off, pid)
+            off += 2
+        return self._tx_put_bytes(off, msg)
+
+    def publish(self, topic: bytes | str, msg: bytes | str | memoryview, retain: bool = False, qos: int = 0) -> None:  # type: ignore[override]
+        if not self.nonblocking:
+            super().publish(topic, msg, retain, qos)
+            return
+
+        assert qos in (0, 1)
+        if qos == 0:
+            self._write_all(self._txmv, self._build_publish(topic, msg, retain, 0, 0))
+            return
+
+        if self.inflight_window > 1:
+            self._wait_inflight(self.inflight_window)
+
+        pid: int = self._next_pid()
+        n: int = self._build_publish(topic, msg, retain, qos, pid)
+        self._write_all(self._txmv, n)
+        if isinstance(msg, memoryview) and self.inflight_window > 1:
+            # kept beyond this call (re-sent after a reconnect) - the view's buffer is reused by the caller
+            msg = bytes(msg)
+        self._inflight[pid] = (topic, msg, retain)  # type: ignore[assignment]
+
+        if self.inflight_window == 1:
+            try:
+                self._wait_inflight(1)
+            except OSError:
+                # the caller gets the exception (and e.g. queues msg) - so do not re-send it on reconnect
+                self._inflight.pop(pid, None)
+                raise
+
+    def subscribe(self, topic: bytes | str, qos: int = 0) -> None:  # type: ignore[override]
+        if not self.nonblocking:
+            super().subscribe(topic, qos)
+            return
+
+        assert self.cb is not None, "Subscribe callback is not set"
+        pid: int = self._next_pid()
+        tlen: int = len(topic.encode() if isinstance(topic, str) else topic)
+        sz: int = 2 + 2 + tlen + 1
+        self._tx_reserve(sz + 4)
+        off: int = self._tx_put_header(0x82, sz)
+        struct.pack_into("!H", self._tx, off, pid)
+        off = self._tx_put_str(off + 2, topic)
+        self._tx[off] = qos
+        self._write_all(self._txmv, off + 1)
+
+        self._wait_for(self._suback_pids, pid)
+
+    def ping(self) -> None:
+        if not self.nonblocking:
+            super().ping()
+            return
+        self._write_all(b"\xc0\0", 2)
+
+    def _wait_for(self, pids: list[int], pid: int) -> None:
+        """ pumps incoming packets until pid shows up in pids (PUBACK/SUBACK) """
+        start: int = time.ticks_ms()  # type: ignore[attr-defined]
+        while pid not in pids:
+            if self._pump() == 0:
+                self._wait_readable(start)
+        pids.remove(pid)
+
+    # --- non-blocking mode: reading ---
+
+    def _pump(self) -> int:
+        """ reads what is available and handles all complete packets - returns the number of bytes read """
+        assert self.sock is not None
+        return self._received(self.sock.readinto(self._rxmv[self._rxlen:]))
+
+    def _received(self, n: int | None) -> int:
+        """ handles n bytes just read into the rx buffer """
+        free: int = len(self._rx) - self._rxlen
+        if n is None:
+            return 0
+        if n == 0:
+            if free == 0:
+                return 0
+            raise OSError(-1)  # connection closed
+
+        got: int = n
+        if self._discard > 0:
+            skip: int = n if n < self._discard else self._discard
+            self._discard -= skip
+            if skip < n:
+                self._rxmv[self._rxlen:self._rxlen + n - skip] = self._rxmv[self._rxlen + skip:self._rxlen + n]
+            n -= skip
+
+        self._rxlen += n
+        self._parse()
+        return got
+
+    def _parse(self) -> None:
+        rx: bytearray = self._rx
+        pos: int = 0
+        while self._rxlen - pos >= 2:
+            # remaining length (variable length encoding)
+            sz: int = 0
+            sh: int = 0
+            i: int = pos + 1
+            complete: bool = False
+            while i < self._rxlen:
+                b: int = rx[i]
+                sz |= (b & 0x7F) << sh
+                i += 1
+                if not b & 0x80:
+                    complete = True
+                    break
+                sh += 7
+            if not complete:
+                break
+
+            end: int = i + sz
+            if end - pos > len(rx):
+                # larger than the rx buffer - skip it
+                logger.warning("MQTTClientSimple: skipping %d byte packet (rx buffer %d)", end - pos, len(rx))
+                self._discard = end - self._rxlen
+                pos = self._rxlen
+                break
+            if end > self._rxlen:
+                break  # body not complete yet
+
+            self._handle_packet(rx[pos], i, sz)
+            pos = end
+
+        if pos > 0:
+            rem: int = self._rxlen - pos
+            if rem > 0:
+                self._rxmv[0:rem] = bytes(self._rxmv[pos:self._rxlen])
+            self._rxlen = rem
+
+    def _handle_packet(self, op: int, off: int, sz: int) -> None:
+        rx: bytearray = self._rx
+        typ: int = op & 0xF0
+        if typ == 0x30:  # PUBLISH
+            topic_len: int = rx[off] << 8 | rx[off + 1]
+            topic: bytes = bytes(self._rxmv[off + 2:off + 2 + topic_len])
+            p: int = off + 2 + topic_len
+            pid: int = 0
+            if op & 6:
+                pid = rx[p] << 8 | rx[p + 1]
+                p += 2
+            msg: bytes = bytes(self._rxmv[p:off + sz])
+
+            if self.cb is not None and (not op & 6 or self._accept_publish(op, pid)):
+                self.cb(topic, msg, op & 0x01 == 1)
+            elif op & 6:
+                logger.info("MQTTClientSimple: ignoring re-delivered publish pid=%d", pid)
+
+            if op & 6:
+                # QoS1: PUBACK, QoS2: PUBREC
+                self._ack(0x40 if op & 6 == 2 else 0x50, pid)
+        elif typ == 0x60:  # PUBREL (QoS2) -> PUBCOMP
+            pid = rx[off] << 8 | rx[off + 1]
+            if pid in self._qos2_pids:
+                self._qos2_pids.remove(pid)
+            self._ack(0x70, pid)
+        elif typ == 0x40:  # PUBACK
+            self._inflight.pop(rx[off] << 8 | rx[off + 1], None)
+            if self._aacked is not None:
+                self._aacked.set()
+        elif typ == 0x90:  # SUBACK
+            if rx[off + 2] == 0x80:
+                raise umqtt.simple.MQTTException(rx[off + 2])
+            self._suback_pids.append(rx[off] << 8 | rx[off + 1])
+        # PINGRESP (0xD0) and anything else: nothing to do
+
+    def _ack(self, first: int, pid: int) -> None:
+        if self.defer_acks:
+            self._acks.append(first << 16 | pid)
+            return
+        self._tx[0] = first
+        self._tx[1] = 0x02
+        struct.pack_into("!H", self._tx, 2, pid)
+        self._write_all(self._txmv, 4)
+
+    # --- non-blocking mode: asyncio ---
+
+    def _astreams(self) -> "tuple[asyncio.StreamReader, asyncio.StreamWriter]":
+        if self._areader is None or self._awriter is None:
+            self._areader = asyncio.StreamReader(self.sock)
+            self._awriter = asyncio.StreamWriter(self.sock)
+            self._aacked = asyncio.Event()
+        return self._areader, self._awriter
+
+    async def aread(self) -> int:
+        """ awaits incoming data and handles all complete packets - returns the number of bytes read """
+        n: int | None = await self._astreams()[0].readinto(self._rxmv[self._rxlen:])
+        return self._received(n)
+
+    async def _awrite(self, buf: memoryview | bytes, n: int) -> None:
+        w: asyncio.StreamWriter = self._astreams()[1]
+        w.write(buf[:n])
+        try:
+            await asyncio.wait_for_ms(w.drain(), self.write_timeout_ms)  # type: ignore[attr-defined]
+        except asyncio.TimeoutError:
+            raise OSError(-1)
+
+    async def _ainflight(self, limit: int) -> None:
+        """ awaits less than limit publishes being un-acknowledged - the PUBACKs are handled by aread() """
+        start: int = time.ticks_ms()  # type: ignore[attr-defined]
+        while len(self._inflight) >= limit:
+            left: int = self.write_timeout_ms - time.ticks_diff(time.ticks_ms(), start)  # type: ignore[attr-defined]
+            if left <= 0:
+                raise OSError(-1)
+            self._astreams()
+            acked: "asyncio.Event | None" = self._aacked
+            assert acked is not None
+            acked.clear()
+            try:
+                await asyncio.wait_for_ms(acked.wait(), left)  # type: ignore[attr-defined]
+            except asyncio.TimeoutError:
+                raise OSError(-1)
+
+    async def aflush(self) -> None:
+        """ awaits all QoS1 publishes being acknowledged """
+        await self._ainflight(1)
+
+    async def apublish(self, topic: bytes | str, msg: bytes | str, retain: bool = False, qos: int = 0) -> None:
+        assert self.nonblocking and qos in (0, 1)
+        if qos == 0:
+            await self._awrite(self._txmv, self._build_publish(topic, msg, retain, 0, 0))
+            return
+
+        if self.inflight_window > 1:
+            await self._ainflight(self.inflight_window)
+
+        pid: int = self._next_pid()
+        await self._awrite(self._txmv, self._build_publish(topic, msg, retain, qos, pid))
+        self._inflight[pid] = (topic, msg, retain)
+
+        if self.inflight_window == 1:
+            try:
+                await self._ainflight(1)
+            except OSError:
+                self._inflight.pop(pid, None)
+                raise
+
+    async def aping(self) -> None:
+        await self._awrite(b"\xc0\0", 2)
+
+    def acks_pending(self) -> bool:
+        return len(self._acks) > 0
+
+    async def aflush_acks(self) -> None:
+        while self._acks:
+            a: int = self._acks.pop(0)
+            self._tx[0] = a >> 16
+            self._tx[1] = 0x02
+            struct.pack_into("!H", self._tx, 2, a & 0xFFFF)
+            await self._awrite(self._txmv, 4)
+
+    def check_msg(self) -> int | None:  # type: ignore[override]
+        if not self.nonblocking:
+            return super().check_msg()
+        while self._pump() > 0:
+            pass
+        return None
+
     # Wait for a single incoming MQTT message and process it.
     # Subscribed messages are delivered to a callback previously
     # set by .set_callback() method. Other (internal) MQTT
@@ -44,6 +515,16 @@ class MQTTClientSimple(umqtt.simple.MQTTClient):
             assert sz == 0
             return None  # type: ignore
         op = res[0]
+        if op == 0x62:  # PUBREL (QoS2) -> PUBCOMP
+            self.sock.read(1)
+            pid = self.sock.read(2)
+            pid = pid[0] << 8 | pid[1]
+            if pid in self._qos2_pids:
+                self._qos2_pids.remove(pid)
+            pkt = bytearray(b"\x70\x02\0\0")
+            struct.pack_into("!H", pkt, 2, pid)
+            self.sock.write(pkt)
+            return None  # type: ignore
         if op & 0xF0 != 0x30:
             return op
         sz = self._recv_len()
@@ -51,6 +532,7 @@ class MQTTClientSimple(umqtt.simple.MQTTClient):
         topic_len = (topic_len[0] << 8) | topic_len[1]
         topic = self.sock.read(topic_len)
         sz -= topic_len + 2
+        pid = 0
         if op & 6:
             pid = self.sock.read(2)
             pid = pid[0] << 8 | pid[1]
@@ -60,15 +542,16 @@ class MQTTClientSimple(umqtt.simple.MQTTClient):
         # do not ignore retained
         retained = op & 0x01
 
-        if self.cb is not None:
+        if self.cb is not None and (not op & 6 or self._accept_publish(op, pid)):
             self.cb(topic, msg, retained == 1)
+        elif op & 6:
+            logger.info("MQTTClientSimple: ignoring re-delivered publish pid=%d", pid)
 
-        if op & 6 == 2:
-            pkt = bytearray(b"\x40\x02\0\0")
+        if op & 6:
+            # QoS1: PUBACK, QoS2: PUBREC
+            pkt = bytearray(b"\x40\x02\0\0" if op & 6 == 2 else b"\x50\x02\0\0")
             struct.pack_into("!H", pkt, 2, pid)
             self.sock.write(pkt)
-        elif op & 6 == 4:
-            assert 0
         return op
 
 
@@ -83,7 +566,6 @@ TELE_PERIOD: int = 60
 
 last_status_gmt: float | None = None
 
-import json
 import socket
 
 
@@ -98,8 +580,14 @@ _controlfeed: str | None = None
 _received_commands: list[tuple[int, str, str | None]] = []
 
 
+_client_id: str | None = None
+
+
 def get_client_id() -> str:
-    return f"esp32_{wifi.mac_no_colon}"
+    global _client_id
+    if _client_id is None:
+        _client_id = f"esp32_{wifi.mac_no_colon}"
+    return _client_id
     # import machine
     # return hexlify(machine.unique_id())
 
@@ -114,12 +602,205 @@ def get_feed(feedname: str) -> str:
     return format_with_clientid(fn)
 
 
+# feedname -> topic with the clientid filled in, already encoded - the "topic handle" to pass to
+# publish_one()/publish_or_enqueue() instead of formatting (and encoding) the topic for every message
+TOPICS: dict[str, bytes] = {}
+
+
+# topic handles of the feeds listed in "packed_feeds" (mosquitto section) - their measurement payloads are
+# sent as compact binary records (see payload.pack / payload_decode.py) instead of json
+PACKED_TOPICS: list[bytes] = []
+
+# topic handle -> decimals of the floats in its json payloads, from "payload_float_precision" (mosquitto section):
+# {"<feedname>": decimals, ...} - feeds not listed keep the full float repr (like json.dumps)
+PRECISION_TOPICS: dict[bytes, int] = {}
+
+
+def build_topic_table() -> None:
+    """ resolves all "...feed" entries of the mosquitto section into TOPICS (and PACKED_TOPICS,
+        PRECISION_TOPICS) - rebuilds them from scratch, so calling it again is fine """
+    TOPICS.clear()
+    PACKED_TOPICS.clear()
+    PRECISION_TOPICS.clear()
+
+    mos: dict = config.get_config_data_dict(config.data, "mosquitto")
+    for k in mos:
+        v = mos[k]
+        if k.endswith("feed") and isinstance(v, str):
+            TOPICS[k] = format_with_clientid(v).encode()
+
+    if "packed_feeds" in mos:
+        packed: object = mos["packed_feeds"]
+        assert isinstance(packed, list), "FAIL::mqttwrap.py::packed_feeds is not a list"
+        for feedname in packed:
+            PACKED_TOPICS.append(TOPICS[feedname])
+
+    if "payload_float_precision" in mos:
+        precision: dict = config.get_config_data_dict(mos, "payload_float_precision")
+        for feedname in precision:
+            PRECISION_TOPICS[TOPICS[feedname]] = config.get_config_data_int(precision, feedname)
+
+
+def topic(feedname: str) -> bytes:
+    """ topic handle of feedname (see TOPICS) """
+    if not TOPICS:
+        build_topic_table()
+    return TOPICS[feedname]
+
+
 mosquitto_to_send_base_data: dict = {
     "lat": config.data["mosquitto"]["lat_loc2"],  # type: ignore
     "lon": config.data["mosquitto"]["lon_loc2"],  # type: ignore
     "ele": config.data["mosquitto"]["ele_loc2"],  # type: ignore
 }
 
+from . import payload
+from .payload import PayloadEncoder
+_payload_encoder: PayloadEncoder = PayloadEncoder(base=mosquitto_to_send_base_data)
+
+
+# "feeds" (default): every value is published on its own feed plus the full reading on the loggingfeed
+# "bundle": one document per reading on the bundlefeed (default: loggingfeed) - with "bundle_changed_feeds"
+#           the per-value feeds are additionally published, but only for the values that changed
+PUBLISH_PROFILE_FEEDS: str = "feeds"
+PUBLISH_PROFILE_BUNDLE: str = "bundle"
+
+publish_profile: str = PUBLISH_PROFILE_FEEDS
+bundle_feedname: str = "loggingfeed"
+bundle_changed_feeds: bool = False
+
+_mosquittoc: dict = config.get_config_data_dict(config.data, "mosquitto")
+if "publish_profile" in _mosquittoc:
+    publish_profile = config.get_config_data_str(_mosquittoc, "publish_profile")
+    assert publish_profile in (PUBLISH_PROFILE_FEEDS, PUBLISH_PROFILE_BUNDLE), f"FAIL::mqttwrap.py::{publish_profile=} unknown"
+if "bundlefeed" in _mosquittoc:
+    bundle_feedname = "bundlefeed"
+if "bundle_changed_feeds" in _mosquittoc:
+    bundle_changed_feeds = config.get_config_data_bool(_mosquittoc, "bundle_changed_feeds")
+# non-blocking client mode (see MQTTClientSimple)
+mqtt_nonblocking: bool = False
+mqtt_rx_buffer_size: int = 512
+mqtt_tx_buffer_size: int = 512
+if "nonblocking" in _mosquittoc:
+    mqtt_nonblocking = config.get_config_data_bool(_mosquittoc, "nonblocking")
+if "rx_buffer_size" in _mosquittoc:
+    mqtt_rx_buffer_size = config.get_config_data_int(_mosquittoc, "rx_buffer_size")
+if "tx_buffer_size" in _mosquittoc:
+    mqtt_tx_buffer_size = config.get_config_data_int(_mosquittoc, "tx_buffer_size")
+
+# asyncio runtime (see runtime_async): always the non-blocking client - its tasks await the socket via the
+# a...() methods of MQTTClientSimple instead of blocking in it
+mqtt_async: bool = "runtime" in config.data and config.get_config_data_str(config.data, "runtime") == "asyncio"
+if mqtt_async:
+    mqtt_nonblocking = True
+    try:
+        import asyncio
+    except ImportError:
+        import uasyncio as asyncio  # type: ignore
+
+# max. number of un-acknowledged QoS1 publishes (non-blocking mode only; 1: wait for each PUBACK)
+mqtt_inflight_window: int = 1
+if "inflight_window" in _mosquittoc:
+    mqtt_inflight_window = config.get_config_data_int(_mosquittoc, "inflight_window")
+
+# un-acknowledged publishes of a lost connection - re-sent (DUP) by the next client
+_inflight_carry: dict[int, tuple[bytes | str, bytes | str, bool]] = {}
+
+# persistent session: with "clean_session": false the broker keeps the subscription and queues (QoS1)
+# control commands while the node is offline - they are delivered after the reconnect
+mqtt_clean_session: bool = True
+if "clean_session" in _mosquittoc:
+    mqtt_clean_session = config.get_config_data_bool(_mosquittoc, "clean_session")
+
+# inbound dedup state of a lost connection (see MQTTClientSimple.get_rx_state)
+_rx_state_carry: tuple[list[int], list[int]] = ([], [])
+
+# TLS: with a "tls" subsection (and "enabled": true) the connection is encrypted (usually MOSQUITTO_PORT 8883);
+# the SSLContext (CA bundle, client certificate) is set up once and reused by every reconnect (see tls.TLSContext)
+mqtt_tls: "TLSContext | None" = None
+if "tls" in _mosquittoc:
+    _tlsc: dict = config.get_config_data_dict(_mosquittoc, "tls")
+    if "enabled" not in _tlsc or config.get_config_data_bool(_tlsc, "enabled"):
+        from .tls import TLSContext
+        mqtt_tls = TLSContext(
+            cafile=config.get_config_data_str(_tlsc, "cafile") if "cafile" in _tlsc else None,
+            certfile=config.get_config_data_str(_tlsc, "certfile") if "certfile" in _tlsc else None,
+            keyfile=config.get_config_data_str(_tlsc, "keyfile") if "keyfile" in _tlsc else None,
+            server_hostname=config.get_config_data_str(_tlsc, "server_hostname") if "server_hostname" in _tlsc else None,
+        )
+    del _tlsc
+del _mosquittoc
+
+# store-and-forward: with an "outqueue" section (and "enabled": true) failed publishes are queued
+# (and sent once the connection is back) instead of resetting the device
+outqueue: "OutQueue | None" = None
+OUTQUEUE_DRAIN_MAX: int = 16
+
+if "outqueue" in config.data:
+    _outqueuec: dict = config.get_config_data_dict(config.data, "outqueue")
+    if "enabled" not in _outqueuec or config.get_config_data_bool(_outqueuec, "enabled"):
+        from .outqueue import OutQueue
+        outqueue = OutQueue(
+            ram_entries=config.get_config_data_int(_outqueuec, "ram_entries") if "ram_entries" in _outqueuec else 32,
+            path=config.get_config_data_str(_outqueuec, "file") if "file" in _outqueuec else "/outqueue.seg",
+            max_file_bytes=config.get_config_data_int(_outqueuec, "max_file_bytes") if "max_file_bytes" in _outqueuec else 65_536,
+        )
+        if "drain_max" in _outqueuec:
+            OUTQUEUE_DRAIN_MAX = config.get_config_data_int(_outqueuec, "drain_max")
+    del _outqueuec
+
+if mqtt_async and outqueue is None:
+    # the measurement task only queues - the connection task sends (see publish_or_enqueue)
+    from .outqueue import OutQueue
+    outqueue = OutQueue()
+
+
+# cached resolution of the broker host (see dnscache.DNSCache) - None: umqtt resolves on every connect
+from .dnscache import DNSCache
+dns_cache: DNSCache | None = DNSCache.from_config()
+
+if mqtt_tls is not None and mqtt_tls.server_hostname is None and dns_cache is not None:
+    # the client gets the ip as server - sni/certificate check still need the name
+    mqtt_tls.server_hostname = config.get_config_data_str(config.get_config_data_dict(config.data, "mosquitto"), "MOSQUITTO_HOST")
+
+
+# in-place reconnect: with a "reconnect" section failures drop the connection and the reconnects are spread
+# by a jittered exponential backoff - the device is only reset once the failure budget is exhausted
+from .backoff import Backoff
+reconnect_backoff: Backoff | None = Backoff.from_config("mqtt")
+
+
+def reset_on_failure() -> bool:
+    """ without outqueue and in-place reconnect a failing connection is "handled" by resetting the device """
+    return outqueue is None and reconnect_backoff is None
+
+
+def is_connected() -> bool:
+    return _mqttclient is not None
+
+
+def drop_connection() -> None:
+    """ forgets the (broken) client after a failure - the next ensure_mqtt_connect() connects anew """
+    global _mqttclient, _inflight_carry, _rx_state_carry
+    if _mqttclient is not None:
+        if _mqttclient.nonblocking:
+            _inflight_carry = _mqttclient.get_inflight()
+        _rx_state_carry = _mqttclient.get_rx_state()
+        try:
+            _mqttclient.sock.close()  # type: ignore
+        except Exception:
+            pass
+        _mqttclient = None
+
+        _count_failure()
+
+
+def _count_failure() -> None:
+    if reconnect_backoff is not None and reconnect_backoff.failed():
+        logger.error("mqtt: %d failures in a row - failure budget exhausted - RESETTING", reconnect_backoff.failures)
+        time.sleep(1)  # type: ignore[attr-defined]
+        machine.reset()
+
 
 def pop_cmd_received() -> tuple[int, str, str | None] | None:
     if len(_received_commands) > 0:
@@ -132,13 +813,13 @@ def pop_cmd_received() -> tuple[int, str, str | None] | None:
 def sub_cb(_topic: bytes, _msg: bytes, retained: bool|None = None) -> None:
     global _lastping
 
-    logger.debug(f"mqttwrap::sub_cb:called {_topic=} {_msg=} {retained=}")
+    logger.debug("mqttwrap::sub_cb:called _topic=%r _msg=%r retained=%r", _topic, _msg, retained)
 
     _lastping = time.time()  # type: ignore
 
     msg: str = _msg.decode("utf-8")
     topic = _topic.decode("utf-8")
-    logger.info(f"{topic=} {msg=} {retained=}")
+    logger.info("topic=%r msg=%r retained=%r", topic, msg, retained)
 
     if topic == _controlfeed:
         cmd_arg = msg.split(None, 1)
@@ -148,7 +829,7 @@ def sub_cb(_topic: bytes, _msg: bytes, retained: bool|None = None) -> None:
         if len(cmd_arg) > 1:
             arg = cmd_arg[1]
 
-        logger.info(f"received {cmd=} {arg=} {retained=}")
+        logger.info("received cmd=%r arg=%r retained=%r", cmd, arg, retained)
         if not retained:
             _received_commands.append((_lastping, cmd, arg))
 
@@ -163,9 +844,9 @@ def get_ip(host: str, port: int = 80) -> str:
 
 
 def ensure_mqtt_connect(watchdog: machine.WDT|None = None, timeout_s: float|None=None) -> None:
-    global _mqttclient, _keepalive, _controlfeed, _lastping, lock
+    global _mqttclient, _keepalive, _controlfeed, _lastping, lock, _inflight_carry, _rx_state_carry
 
-    logger.debug(f"mqttwrap.py::ensure_mqtt_connect::called {watchdog=} {timeout_s=}")
+    logger.debug("mqttwrap.py::ensure_mqtt_connect::called watchdog=%r timeout_s=%r", watchdog, timeout_s)
 
     if watchdog:
         watchdog.feed()
@@ -178,25 +859,37 @@ def ensure_mqtt_connect(watchdog: machine.WDT|None = None, timeout_s: float|None
             watchdog.feed()
 
         if _mqttclient is None:
-            _mqttclient = MQTTClientSimple(
+            server: str = config.data["mosquitto"]["MOSQUITTO_HOST"]  # type: ignore
+            if dns_cache is not None:
+                server = dns_cache.resolve(server, config.data["mosquitto"]["MOSQUITTO_PORT"])  # type: ignore
+
+            client: MQTTClientSimple = MQTTClientSimple(
                 client_id=get_client_id(),
-                server=config.data["mosquitto"]["MOSQUITTO_HOST"],  # type: ignore
+                server=server,
                 port=config.data["mosquitto"]["MOSQUITTO_PORT"],  # type: ignore
-                ssl=None,
+                ssl=mqtt_tls,
                 keepalive=_keepalive,
                 password=config.data["mosquitto"]["MOSQUITTO_PASSWORD"],  # type: ignore
                 user=config.data["mosquitto"]["MOSQUITTO_USERNAME"],  # type: ignore
+                nonblocking=mqtt_nonblocking,
+                rx_size=mqtt_rx_buffer_size,
+                tx_size=mqtt_tx_buffer_size,
+                inflight_window=mqtt_inflight_window,
+                defer_acks=mqtt_async,
             )
+            client.adopt_inflight(_inflight_carry)
+            client.adopt_rx_state(_rx_state_carry)
             if watchdog:
                 watchdog.feed()
 
-            _mqttclient.set_callback(sub_cb)
+            client.set_callback(sub_cb)
 
-            lwtf: str = config.get_config_data_str(config.get_config_data_dict(config.data, "mosquitto"), "lwtfeed")
-            lwtfeed: str = format_with_clientid(lwtf)
+            if not TOPICS:
+                build_topic_table()
+            lwtfeed: bytes = TOPICS["lwtfeed"]
 
-            logger.debug(f"mqttwrap.py::ensure_mqtt_connect::lwt_feed: {lwtfeed}")
-            _mqttclient.set_last_will(
+            logger.debug("mqttwrap.py::ensure_mqtt_connect::lwt_feed: %r", lwtfeed)
+            client.set_last_will(
                 topic=lwtfeed,  # type: ignore
                 msg="OFFLINE",
                 qos=0,
@@ -206,29 +899,39 @@ def ensure_mqtt_connect(watchdog: machine.WDT|None = None, timeout_s: float|None
             logger.debug("mqttwrap.py::ensure_mqtt_connect::before call to .connect()")
 
 
-            logger.debug(f"mqttwrap.py::ensure_mqtt_connect::before trying to connect to {_mqttclient.server=}:{_mqttclient.port=}")
-
-            addr = socket.getaddrinfo(_mqttclient.server, _mqttclient.port, 0, socket.SOCK_STREAM)[0][-1]
-            logger.debug(f"mqttwrap.py::ensure_mqtt_connect::before trying to connect to {addr=}")
+            logger.debug(f"mqttwrap.py::ensure_mqtt_connect::before trying to connect to {client.server=}:{client.port=}")
 
-            logger.debug(f"mqttwrap.py::ensure_mqtt_connect::before trying to connect with {_mqttclient.user=} {_mqttclient.pswd=}")
-            _mqttclient.connect(clean_session=True, timeout=timeout_s)
+            logger.debug(f"mqttwrap.py::ensure_mqtt_connect::before trying to connect with {client.user=} {client.pswd=}")
+            client.connect(clean_session=mqtt_clean_session, timeout=timeout_s)
             logger.debug("mqttwrap.py::ensure_mqtt_connect::after call to .connect()")
 
+            if mqtt_tls is not None:
+                logger.info("mqttwrap.py::ensure_mqtt_connect::TLS handshake %d ms (handshakes=%d)",
+                            mqtt_tls.last_handshake_ms, mqtt_tls.handshakes)
+
             if watchdog:
                 watchdog.feed()
 
-            _mqttclient.publish(
-                format_with_clientid(config.data["mosquitto"]["lwtfeed"]),  # type: ignore
+            client.publish(
+                lwtfeed,
                 "ONLINE",
                 qos=0,
                 retain=True,
             )
 
             _controlfeed = format_with_clientid(config.data["mosquitto"]["controlfeed"])  # type: ignore
-            _mqttclient.subscribe(
-                topic=_controlfeed
-            )
+            if mqtt_clean_session or not client.session_present:
+                # QoS1 subscription - otherwise the broker does not queue commands for the persistent session
+                client.subscribe(
+                    topic=_controlfeed,
+                    qos=0 if mqtt_clean_session else 1,
+                )
+            else:
+                logger.info("mqttwrap.py::ensure_mqtt_connect::session present - not re-subscribing %s", _controlfeed)
+
+            _mqttclient = client
+            _inflight_carry = {}
+            _rx_state_carry = ([], [])
 
     if watchdog:
         watchdog.feed()
@@ -241,8 +944,17 @@ def ensure_mqtt_connect(watchdog: machine.WDT|None = None, timeout_s: float|None
 
 
 def ensure_mqtt_catch_reset(reset_if_mqtt_fails: bool = True, watchdog: machine.WDT|None = None, mqtt_connect_timeout_s: float|None = None) -> None:
+    """ with in-place reconnect (see reconnect_backoff) reset_if_mqtt_fails is ignored: a failed connect is
+        retried once the backoff delay passed and the device is only reset if the failure budget is exhausted """
+    if reconnect_backoff is not None and _mqttclient is None and not reconnect_backoff.ready():
+        logger.debug("mqttwrap.py::ensure_mqtt_catch_reset::backing off (failures=%d)", reconnect_backoff.failures)
+        return
+
     try:
         ensure_mqtt_connect(watchdog=watchdog, timeout_s=mqtt_connect_timeout_s)
+        if reconnect_backoff is not None and reconnect_backoff.failures > 0:
+            logger.info("mqtt: reconnected after %d failures", reconnect_backoff.failures)
+            reconnect_backoff.succeeded()
     except Exception as ex:
         _timestring = time.getisotimenow()
 
@@ -252,7 +964,14 @@ def ensure_mqtt_catch_reset(reset_if_mqtt_fails: bool = True, watchdog: machine.
 
         logger.error(_out.getvalue())
 
-        if reset_if_mqtt_fails:
+        if dns_cache is not None:
+            # maybe the broker moved - ask the DNS again next time
+            dns_cache.expire(config.data["mosquitto"]["MOSQUITTO_HOST"])  # type: ignore
+
+        if reconnect_backoff is not None:
+            _count_failure()
+            logger.info("mqtt: next connect attempt in <= %.1fs", reconnect_backoff.delay_s())
+        elif reset_if_mqtt_fails:
             logger.debug("RESETTING...in 60s")
             if watchdog:
                 logger.debug("\tor if watchdog kicks in")
@@ -263,17 +982,63 @@ def ensure_mqtt_catch_reset(reset_if_mqtt_fails: bool = True, watchdog: machine.
 def value_to_mqtt_string(
         value: str | float | int | dict, created_at: str | None = None
 ) -> str:
-    d: dict = mosquitto_to_send_base_data.copy()  # ggf. aus performancegründen einfach gar kein copy...
-    d["created_at"] = time.getisotimenow() if created_at is None else created_at
-    d["value"] = value
-
-    return json.dumps(d)
+    return _payload_encoder.encode_str(value, time.getisotimenow() if created_at is None else created_at)
+
+
+def value_to_mqtt_payload(topic_handle: bytes, value: str | float | int | dict, created_at: str, created_at_secs: int) -> bytes | memoryview:
+    """ packed record if topic_handle is in PACKED_TOPICS (and a schema fits value) - json otherwise (with the
+        precision of PRECISION_TOPICS): a view into the reused buffer of the encoder, only valid until the next
+        payload is encoded - publish it right away (publish_or_enqueue copies it if it has to keep it) """
+    if topic_handle in PACKED_TOPICS:
+        # created_at ends with the utc offset "+HH:MM"
+        offset_minutes: int = int(created_at[-5:-3]) * 60 + int(created_at[-2:])
+        if created_at[-6] == "-":
+            offset_minutes = -offset_minutes
+        packed: bytes | None = payload.pack(value, created_at_secs, offset_minutes, mosquitto_to_send_base_data)
+        if packed is not None:
+            return packed
+
+    return _payload_encoder.encode(value, created_at, PRECISION_TOPICS.get(topic_handle))
+
+
+def batch_to_mqtt_payload(value: dict, created_at: str, compress: bool = False) -> bytes | memoryview:
+    """ json of a batch (see batch.Batch.to_value) - zlib compressed if compress (and supported); the json
+        is a view as returned by value_to_mqtt_payload """
+    msg: memoryview = _payload_encoder.encode(value, created_at)
+    if compress:
+        compressed: bytes | None = payload.deflate_compress(bytes(msg))
+        if compressed is not None:
+            return compressed
+        logger.warning("batch_to_mqtt_payload: compression not supported by this build - sending plain json")
+    return msg
+
+
+def batch_topic() -> bytes:
+    """ "batchfeed" - or the loggingfeed if there is none """
+    if not TOPICS:
+        build_topic_table()
+    return TOPICS["batchfeed"] if "batchfeed" in TOPICS else TOPICS["loggingfeed"]
+
+
+def _kept(msg: str | bytes | memoryview) -> str | bytes:
+    """ msg to keep (queue) - a view into the encoder buffer (json) is copied into a str """
+    if isinstance(msg, memoryview):
+        return str(msg, "utf-8")
+    return msg
+
+
+def _queue_or_drop(topic: bytes | str, msg: str | bytes | memoryview, qos: int, retain: bool) -> None:
+    if outqueue is not None:
+        logger.info("publish failed - queueing message for %s", topic)
+        outqueue.put(topic, _kept(msg), qos, retain)
+    else:
+        logger.warning("publish failed - message for %s dropped", topic)
 
 
-def publish_one(topic: str, msg: str, qos: int = 1, retain: bool = True, reset_if_mqtt_fails: bool = True, watchdog: machine.WDT|None = None) -> None:
+def publish_one(topic: bytes | str, msg: str | bytes | memoryview, qos: int = 1, retain: bool = True, reset_if_mqtt_fails: bool = True, watchdog: machine.WDT|None = None) -> None:
     global _lastping, _mqttclient, lock
 
-    logger.debug(f"publish_one {topic=} {len(msg)=} {qos=}")
+    logger.debug("publish_one topic=%r len(msg)=%d qos=%d", topic, len(msg), qos)
     if watchdog:
         watchdog.feed()
 
@@ -281,7 +1046,13 @@ def publish_one(topic: str, msg: str, qos: int = 1, retain: bool = True, reset_i
         if watchdog:
             watchdog.feed()
 
-        # assert _mqttclient is not None
+        if _mqttclient is None:
+            # dropped by an earlier failure (e.g. within the same status cycle)
+            if reset_if_mqtt_fails and not reset_on_failure():
+                _queue_or_drop(topic, msg, qos, retain)
+                return
+            raise OSError("mqtt: not connected")
+
         if reset_if_mqtt_fails:
             try:
                 _mqttclient.publish(topic=topic, msg=msg, retain=retain, qos=qos)  #type: ignore
@@ -294,6 +1065,11 @@ def publish_one(topic: str, msg: str, qos: int = 1, retain: bool = True, reset_i
 
                 logger.error(_out.getvalue())
 
+                if not reset_on_failure():
+                    _queue_or_drop(topic, msg, qos, retain)
+                    drop_connection()
+                    return
+
                 logger.debug("RESETTING...in 30s")
                 if watchdog:
                     logger.debug("\tor if watchdog kicks in")
@@ -302,13 +1078,90 @@ def publish_one(topic: str, msg: str, qos: int = 1, retain: bool = True, reset_i
         else:
             _mqttclient.publish(topic=topic, msg=msg, retain=retain, qos=qos)  #type: ignore
 
-    logger.debug(f"published {topic=}")
+    logger.debug("published topic=%r", topic)
     _lastping = time.time()  # type: ignore[attr-defined]
 
     if watchdog:
         watchdog.feed()
 
 
+def publish_or_enqueue(topic: bytes | str, msg: str | bytes | memoryview, qos: int = 1, retain: bool = True, watchdog: machine.WDT|None = None) -> None:
+    """ publishes msg - or (with outqueue) queues it if not connected or older messages are still waiting
+
+        in the asyncio runtime msg is always queued - the connection task sends it (adrain_outqueue) """
+    if mqtt_async:
+        outqueue.put(topic, _kept(msg), qos, retain)  # type: ignore[union-attr]
+        outqueue_event.set()
+        return
+
+    if outqueue is None:
+        if not is_connected() and not reset_on_failure():
+            logger.warning("not connected - message for %s dropped", topic)
+            return
+        publish_one(topic=topic, msg=msg, qos=qos, retain=retain, reset_if_mqtt_fails=True, watchdog=watchdog)
+        return
+
+    if not is_connected() or len(outqueue) > 0:
+        logger.debug("queueing message for %s (queued=%d)", topic, len(outqueue))
+        outqueue.put(topic, _kept(msg), qos, retain)
+        return
+
+    publish_one(topic=topic, msg=msg, qos=qos, retain=retain, reset_if_mqtt_fails=True, watchdog=watchdog)
+
+
+def drain_outqueue(max_entries: int | None = None, watchdog: machine.WDT|None = None) -> int:
+    """ publishes up to max_entries queued messages (oldest first) - returns the number of messages sent """
+    if outqueue is None or not is_connected():
+        return 0
+
+    if max_entries is None:
+        max_entries = OUTQUEUE_DRAIN_MAX
+
+    sent: int = 0
+    while sent < max_entries:
+        entry: tuple[bytes | str, str | bytes, int, bool] | None = outqueue.peek()
+        if entry is None:
+            break
+
+        try:
+            publish_one(topic=entry[0], msg=entry[1], qos=entry[2], retain=entry[3], reset_if_mqtt_fails=False, watchdog=watchdog)
+        except Exception as ex:
+            _out = io.StringIO()
+            sys.print_exception(ex)
+            sys.print_exception(ex, _out)
+
+            logger.error(_out.getvalue())
+            drop_connection()
+            break
+
+        outqueue.pop()
+        sent += 1
+
+    if sent > 0:
+        # with inflight_window > 1 the last publishes may not be acknowledged yet - the drained messages are
+        # only committed (removed from flash) once they are. until then a lost connection re-sends them from
+        # the inflight of the client, a reset from the segment file
+        with lock:
+            client: MQTTClientSimple | None = _mqttclient
+            if client is None:
+                return sent
+            try:
+                client.flush()
+            except Exception as ex:
+                _out = io.StringIO()
+                sys.print_exception(ex)
+                sys.print_exception(ex, _out)
+
+                logger.error(_out.getvalue())
+                drop_connection()
+                return sent
+
+        outqueue.commit()
+        logger.info("drained %d queued messages (%d left)", sent, len(outqueue))
+
+    return sent
+
+
 def check_msg(watchdog: machine.WDT|None = None) -> None:
     global _mqttclient
     if watchdog:
@@ -318,8 +1171,11 @@ def check_msg(watchdog: machine.WDT|None = None) -> None:
         if watchdog:
             watchdog.feed()
 
-        # assert _mqttclient is not None
-        _mqttclient.check_msg()  # type: ignore
+        if _mqttclient is None:
+            logger.debug("mqttwrap::check_msg()::not connected")
+            return
+
+        _mqttclient.check_msg()
 
     if watchdog:
         watchdog.feed()
@@ -334,10 +1190,13 @@ def ping(reset_if_mqtt_fails: bool = True, watchdog: machine.WDT|None = None) ->
         if watchdog:
             watchdog.feed()
 
-        # assert _mqttclient is not None
+        if _mqttclient is None:
+            logger.debug("mqttwrap::ping()::not connected")
+            return
+
         if reset_if_mqtt_fails:
             try:
-                _mqttclient.ping()  # type: ignore
+                _mqttclient.ping()
             except Exception as ex:
                 _timestring = time.getisotimenow()
 
@@ -347,6 +1206,10 @@ def ping(reset_if_mqtt_fails: bool = True, watchdog: machine.WDT|None = None) ->
 
                 logger.error(_out.getvalue())
 
+                if not reset_on_failure():
+                    drop_connection()
+                    return
+
                 logger.debug("RESETTING...in 30s")
                 if watchdog:
                     logger.debug("\tor if watchdog kicks in...")
@@ -354,18 +1217,21 @@ def ping(reset_if_mqtt_fails: bool = True, watchdog: machine.WDT|None = None) ->
                 time.sleep(30)  # type: ignore[attr-defined]
                 machine.reset()
         else:
-            _mqttclient.ping()  # type: ignore
+            _mqttclient.ping()
 
         _lastping = now
 
         if watchdog:
             watchdog.feed()
 
+def ping_due(threshhold: int = 10) -> bool:
+    return time.time() - _lastping > _keepalive - threshhold  # type: ignore[attr-defined]
+
+
 def ping_if_needed(threshhold: int = 10, reset_if_mqtt_fails: bool = True, watchdog: machine.WDT|None = None) -> None:
     global _keepalive
     global _lastping
-    now: int = time.time()  # type: ignore[attr-defined]
-    if now - _lastping > _keepalive - threshhold:
+    if ping_due(threshhold):
         # acquires own lock
         ping(reset_if_mqtt_fails=reset_if_mqtt_fails, watchdog=watchdog)
 
@@ -374,9 +1240,42 @@ def ping_if_needed(threshhold: int = 10, reset_if_mqtt_fails: bool = True, watch
 def send_status_to_mosquitto(include_wifi_scan: bool = True, watchdog: machine.WDT|None = None, also_send_LWT: bool = True) -> None:
     global boottime_local_str, boottime_gmt, last_status_gmt
 
-    ifconfig: tuple = wifi.ensure_wifi_catch_reset(reset_if_wifi_fails=True, watchdog=watchdog)
-    ensure_mqtt_catch_reset(reset_if_mqtt_fails=True, watchdog=watchdog)
+    ifconfig: tuple|None = wifi.ensure_wifi_catch_reset(reset_if_wifi_fails=reset_on_failure(), watchdog=watchdog, blocking=reset_on_failure())
+    if ifconfig is None:
+        return  # wifi not (yet) connected
+    ensure_mqtt_catch_reset(reset_if_mqtt_fails=reset_on_failure(), watchdog=watchdog)
+    if not is_connected():
+        return
+
+    msg: str = status_message(ifconfig, include_wifi_scan=include_wifi_scan)
+
+    publish_one(
+        topic=topic("statusfeed"),
+        msg=msg,
+        qos=1,
+        retain=True,
+        reset_if_mqtt_fails=True,
+        watchdog=watchdog
+    )
+    if not is_connected():
+        return  # the publish failed (message queued) and the connection was dropped
+
+    # mqttwrap.loop()
+    last_status_gmt = time.mktime(time.gmtime())  # type: ignore
 
+    if also_send_LWT:
+        publish_one(
+            topic=topic("lwtfeed"),
+            msg="ONLINE",
+            qos=1,
+            retain=True,
+            reset_if_mqtt_fails=True,
+            watchdog=watchdog
+        )
+
+
+def status_message(ifconfig: tuple, include_wifi_scan: bool = True) -> str:
+    """ the statusfeed message - ifconfig as returned by wifi.ensure_wifi_catch_reset() """
     statusdata: dict = {
         "wifi": {
             "ip": ifconfig[0],
@@ -397,6 +1296,14 @@ def send_status_to_mosquitto(include_wifi_scan: bool = True, watchdog: machine.W
     statusdata["runtime_seconds"] = rtseconds
     statusdata["running_since"] = boottime_local_str
 
+    statusdata["clock"] = clock.stats()
+
+    if mqtt_tls is not None:
+        statusdata["tls"] = {
+            "handshakes": mqtt_tls.handshakes,
+            "last_handshake_ms": mqtt_tls.last_handshake_ms,
+        }
+
     statusdata["reboot_pending_in"] = -1
     if config.data["forcerestart_after_running_seconds"] > 0:  # type: ignore
         statusdata["reboot_pending_in"] = (
@@ -406,27 +1313,11 @@ def send_status_to_mosquitto(include_wifi_scan: bool = True, watchdog: machine.W
     msg: str = value_to_mqtt_string(value=statusdata)
 
     logger.debug(msg)
+    return msg
 
-    publish_one(
-        topic=get_feed("statusfeed"),
-        msg=msg,
-        qos=1,
-        retain=True,
-        reset_if_mqtt_fails=True,
-        watchdog=watchdog
-    )
-    # mqttwrap.loop()
-    last_status_gmt = time.mktime(time.gmtime())  # type: ignore
 
-    if also_send_LWT:
-        publish_one(
-            topic=get_feed("lwtfeed"),
-            msg="ONLINE",
-            qos=1,
-            retain=True,
-            reset_if_mqtt_fails=True,
-            watchdog=watchdog
-        )
+def status_due() -> bool:
+    return not last_status_gmt or time.mktime(time.gmtime()) - last_status_gmt > TELE_PERIOD  # type: ignore[attr-defined]
 
 
 def check_msgs(reset_if_mqtt_fails: bool = True, watchdog: machine.WDT|None = None) -> None:
@@ -449,12 +1340,21 @@ def check_msgs(reset_if_mqtt_fails: bool = True, watchdog: machine.WDT|None = No
 
     # logger.debug("check_msgs")
 
+    if not is_connected():
+        return  # dropped (e.g. while sending the status) - reconnected by the next ensure_mqtt_connect()
+
     if reset_if_mqtt_fails:
         try:
             check_msg(watchdog=watchdog)
             ping_if_needed(threshhold=10, reset_if_mqtt_fails=True, watchdog=watchdog)
         except OSError as ex:
-            if ex.errno == -1:
+            if not reset_on_failure():
+                _out = io.StringIO()
+                sys.print_exception(ex, _out)
+                logger.error(_out.getvalue())
+
+                drop_connection()
+            elif ex.errno == -1:
                 _out = io.StringIO()
                 sys.print_exception(ex)
                 sys.print_exception(ex, _out)
@@ -473,6 +1373,145 @@ def check_msgs(reset_if_mqtt_fails: bool = True, watchdog: machine.WDT|None = No
         ping_if_needed(threshhold=10, reset_if_mqtt_fails=False, watchdog=watchdog)
 
 
+# --- asyncio runtime (see runtime_async) ---
+# the receive task is the only reader of the connection (areceive); all writes are serialized by _awlock, so a
+# publish waiting for the socket (or its PUBACK) only suspends its own task. A failure drops the connection -
+# unless another task has already replaced it meanwhile.
+if mqtt_async:
+    _awlock: "asyncio.Lock" = asyncio.Lock()
+    # set whenever a message is queued - the runtime's send task waits for it
+    outqueue_event: "asyncio.Event" = asyncio.Event()
+
+
+def _log_exception(ex: BaseException) -> None:
+    _out = io.StringIO()
+    sys.print_exception(ex)
+    sys.print_exception(ex, _out)
+
+    logger.error(_out.getvalue())
+
+
+def _drop_if_current(client: MQTTClientSimple) -> None:
+    if client is _mqttclient:
+        drop_connection()
+
+
+async def apublish_one(topic: bytes | str, msg: str | bytes, qos: int = 1, retain: bool = True) -> bool:
+    """ publish_one() awaiting the socket - if it fails msg is queued (see _queue_or_drop) and False returned """
+    global _lastping
+    client: MQTTClientSimple | None = _mqttclient
+    if client is None:
+        _queue_or_drop(topic, msg, qos, retain)
+        return False
+
+    try:
+        async with _awlock:
+            await client.apublish(topic, msg, retain=retain, qos=qos)
+    except OSError as ex:
+        _log_exception(ex)
+        _queue_or_drop(topic, msg, qos, retain)
+        _drop_if_current(client)
+        return False
+
+    _lastping = time.time()  # type: ignore[attr-defined]
+    return True
+
+
+async def adrain_outqueue(max_entries: int | None = None) -> int:
+    """ drain_outqueue() awaiting the socket """
+    global _lastping
+    if outqueue is None:
+        return 0
+
+    if max_entries is None:
+        max_entries = OUTQUEUE_DRAIN_MAX
+
+    sent: int = 0
+    while sent < max_entries:
+        client: MQTTClientSimple | None = _mqttclient
+        entry: tuple[bytes | str, str | bytes, int, bool] | None = outqueue.peek()
+        if client is None or entry is None:
+            break
+
+        try:
+            async with _awlock:
+                await client.apublish(entry[0], entry[1], retain=entry[3], qos=entry[2])
+        except OSError as ex:
+            _log_exception(ex)
+            _drop_if_current(client)
+            break
+
+        outqueue.pop()
+        sent += 1
+
+    if sent > 0:
+        # committed only once acknowledged - see drain_outqueue()
+        client = _mqttclient
+        if client is None:
+            return sent
+        try:
+            await client.aflush()
+        except OSError as ex:
+            _log_exception(ex)
+            _drop_if_current(client)
+            return sent
+
+        outqueue.commit()
+        _lastping = time.time()  # type: ignore[attr-defined]
+        logger.debug("drained %d queued messages (%d left)", sent, len(outqueue))
+
+    return sent
+
+
+async def asend_status(ifconfig: tuple, include_wifi_scan: bool = False) -> None:
+    """ send_status_to_mosquitto() awaiting the socket - (re)connecting is left to the caller """
+    global last_status_gmt
+    if not await apublish_one(topic("statusfeed"), status_message(ifconfig, include_wifi_scan=include_wifi_scan)):
+        return
+
+    last_status_gmt = time.mktime(time.gmtime())  # type: ignore[attr-defined]
+    await apublish_one(topic("lwtfeed"), "ONLINE")
+
+
+async def aping_if_needed(threshhold: int = 10) -> None:
+    global _lastping
+    client: MQTTClientSimple | None = _mqttclient
+    if client is None or not ping_due(threshhold):
+        return
+
+    try:
+        async with _awlock:
+            await client.aping()
+    except OSError as ex:
+        _log_exception(ex)
+        _drop_if_current(client)
+        return
+
+    _lastping = time.time()  # type: ignore[attr-defined]
+
+
+async def areceive(timeout_ms: int = 1_000) -> bool:
+    """ awaits incoming data (at most timeout_ms) and handles it - False if not connected (anymore) """
+    client: MQTTClientSimple | None = _mqttclient
+    if client is None:
+        return False
+
+    try:
+        await asyncio.wait_for_ms(client.aread(), timeout_ms)  # type: ignore[attr-defined]
+        if client.acks_pending():
+            async with _awlock:
+                await client.aflush_acks()
+    except asyncio.TimeoutError:
+        pass
+    except OSError as ex:
+        if client is _mqttclient:
+            _log_exception(ex)
+            drop_connection()
+        return False
+
+    return True
+
+
 # def loop():
 #     # logger.debug("loop")
 #     ifdata: str | None = wifi.ensure_wifi()
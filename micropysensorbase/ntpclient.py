@@ -0,0 +1,261 @@
+""" non-blocking multi-source ntp client - replaces the blocking ntptime loop in boot.py
+
+    - all hosts (e.g. the wifi gateway and pool.ntp.org) are queried at the same time over non-blocking UDP;
+      the first valid answer wins. The time is RTT compensated: server transmit time + (RTT - server delay) / 2
+    - the result sets the RTC and syncs the clock module (which slews small corrections)
+    - the last good time and the drift of the clock are kept in RTC memory (see rtcstore): after a warm reboot
+      or deep sleep wake the node starts with approximate time right away - and refines it in the background
+      via tick() (called from main.connection_tick)
+
+    configured in the "ntp" section of esp32config.json:
+
+        "ntp": {"hosts": ["gateway", "pool.ntp.org"], "timeout_ms": 1500, "refine_period_s": 3600, "retry_period_s": 60}
+
+    "gateway" stands for the wifi gateway. The other hosts are resolved by resolve_hosts() (at boot and by sync()) -
+    tick() never does a dns lookup and skips hosts without an address.
+"""
+
+import select
+import socket
+import struct
+
+import machine
+
+from . import config
+from . import logging, time
+from . import clock
+from . import rtcstore
+from .dnscache import DNSCache
+
+logger = logging.get_logger(__name__)
+logger.setLevel(logging.INFO)
+
+if __name__ in config.get_config_data_dict(config.data, "loglevel"):
+    melv: int|None = logging.get_log_level_by_name(
+        config.get_config_data_str(config.get_config_data_dict(config.data, "loglevel"), "ntpclient"))
+    if melv is not None:
+        logger.setLevel(melv)
+
+HOSTS: list[str] = ["gateway", "pool.ntp.org"]
+TIMEOUT_MS: int = 1_500
+REFINE_PERIOD_S: int = 3_600
+RETRY_PERIOD_S: int = 60
+
+if "ntp" in config.data:
+    _ntpc: dict = config.get_config_data_dict(config.data, "ntp")
+    if "hosts" in _ntpc:
+        HOSTS = _ntpc["hosts"]  # type: ignore
+    if "timeout_ms" in _ntpc:
+        TIMEOUT_MS = config.get_config_data_int(_ntpc, "timeout_ms")
+    if "refine_period_s" in _ntpc:
+        REFINE_PERIOD_S = config.get_config_data_int(_ntpc, "refine_period_s")
+    if "retry_period_s" in _ntpc:
+        RETRY_PERIOD_S = config.get_config_data_int(_ntpc, "retry_period_s")
+    del _ntpc
+
+# ntp epoch (1900) -> device epoch (2000 on most ports)
+NTP_DELTA: int = 3155673600 if time.gmtime(0)[0] == 2000 else 2208988800  # type: ignore[attr-defined]
+# the RTC is considered set if it is past this (device epoch) time - 2024-01-01
+_VALID_AFTER_S: int = 1704067200 - (2208988800 - NTP_DELTA)
+
+# a query in flight: [(socket, host, request ticks_us)], started at ticks_ms
+_inflight: list[tuple[socket.socket, str, int]] = []
+_inflight_ticks: int = 0
+_poll: "select.poll | None" = None
+_next_attempt_ticks: int | None = None  # None: due now
+_request: bytearray = bytearray(48)
+_request[0] = 0x1B  # LI 0, version 3, mode 3 (client)
+
+# with a "dnscache" section the pool address is kept in RTC memory too - no dns lookup after a warm reboot
+_dns: DNSCache | None = DNSCache.from_config()
+
+# host -> ip as resolved by resolve_hosts()
+_addrs: dict[str, str] = {}
+
+
+def resolve_hosts(hosts: list[str] | None = None) -> None:
+    """ resolves the hosts (but "gateway") - blocking dns lookups, so not to be called from the tick path """
+    for host in HOSTS if hosts is None else hosts:
+        if host == "gateway":
+            continue
+        try:
+            if _dns is not None:
+                _addrs[host] = _dns.resolve(host, 123)
+            else:
+                _addrs[host] = socket.getaddrinfo(host, 123)[0][-1][0]  # type: ignore
+        except OSError as ex:
+            logger.warning("ntpclient: resolving %s failed: %r", host, ex)
+
+
+def _resolve(host: str) -> str | None:
+    if host == "gateway":
+        from . import wifi
+        try:
+            if config.INTVERSION >= 124:
+                return wifi.wlan.ipconfig("gw4")
+            return wifi.wlan.ifconfig()[2]
+        except Exception:
+            return None
+    ip: str | None = _addrs.get(host)
+    if ip is None:
+        logger.debug("ntpclient: no address for %s - skipped", host)
+    return ip
+
+
+def _close() -> None:
+    global _poll
+    for s, _, _ in _inflight:
+        try:
+            s.close()
+        except OSError:
+            pass
+    _inflight.clear()
+    _poll = None
+
+
+def _send(hosts: list[str]) -> None:
+    global _inflight_ticks, _poll
+    _close()
+    _poll = select.poll()
+    for host in hosts:
+        ip: str | None = _resolve(host)
+        if ip is None:
+            continue
+        s: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.setblocking(False)
+        try:
+            s.sendto(_request, (ip, 123))
+        except OSError as ex:
+            logger.warning("ntpclient: sending to %s failed: %r", host, ex)
+            s.close()
+            continue
+        _inflight.append((s, host, time.ticks_us()))  # type: ignore[attr-defined]
+        _poll.register(s, select.POLLIN)
+    _inflight_ticks = time.ticks_ms()  # type: ignore[attr-defined]
+
+
+def _parse(msg: bytes, t1: int, t4: int) -> int | None:
+    """ reference (device epoch) time in us at t4 - None if msg is no valid server answer """
+    if len(msg) < 48:
+        return None
+    li_vn_mode: int = msg[0]
+    stratum: int = msg[1]
+    if li_vn_mode & 0x07 != 4 or li_vn_mode >> 6 == 3 or not 0 < stratum < 16:
+        return None
+
+    rx_s, rx_f, tx_s, tx_f = struct.unpack("!IIII", msg[32:48])
+    if tx_s == 0:
+        return None
+
+    # rtt without the time the server held the request
+    server_us: int = (tx_s - rx_s) * 1_000_000 + ((tx_f - rx_f) * 1_000_000 >> 32)
+    rtt_us: int = time.ticks_diff(t4, t1) - server_us  # type: ignore[attr-defined]
+    if rtt_us < 0:
+        rtt_us = 0
+
+    return (tx_s - NTP_DELTA) * 1_000_000 + (tx_f * 1_000_000 >> 32) + rtt_us // 2
+
+
+def _receive(timeout_ms: int) -> tuple[str, int] | None:
+    """ (host, reference time at now) of the first valid answer """
+    assert _poll is not None
+    for ev in _poll.poll(timeout_ms):  # type: ignore
+        s = ev[0]
+        try:
+            msg: bytes = s.recv(64)  # type: ignore
+        except OSError:
+            continue
+        t4: int = time.ticks_us()  # type: ignore[attr-defined]
+        for sock, host, t1 in _inflight:
+            if sock is s:
+                ref: int | None = _parse(msg, t1, t4)
+                if ref is not None:
+                    return host, ref + time.ticks_diff(time.ticks_us(), t4)  # type: ignore[attr-defined]
+    return None
+
+
+def _set_rtc(ref_us: int) -> None:
+    secs: int = ref_us // 1_000_000
+    tm = time.gmtime(secs)  # type: ignore[attr-defined]
+    machine.RTC().datetime((tm[0], tm[1], tm[2], tm[6] + 1, tm[3], tm[4], tm[5], ref_us % 1_000_000))
+
+
+def _apply(host: str, ref_us: int) -> None:
+    global _next_attempt_ticks
+    err_ms: int = (ref_us - clock.now_us()) // 1_000
+    if abs(ref_us - clock.rtc_us()) > 100_000:
+        _set_rtc(ref_us)
+    time.set_had_proper_time_set(True)
+    clock.sync(ref_us)
+
+    rtcstore.put("ntp", {"t": ref_us // 1_000_000, "drift_ppm": clock.drift_ppm})
+    _next_attempt_ticks = time.ticks_add(time.ticks_ms(), REFINE_PERIOD_S * 1_000)  # type: ignore[attr-defined]
+    logger.info("ntpclient: time from %s (clock was off by %d ms)", host, err_ms)
+
+
+def restore() -> bool:
+    """ time right after boot from the RTC (kept over soft reset/deep sleep) - True if it looks valid.
+        if the RTC lost its time it is set to the last synced time in RTC memory (better than 2000-01-01 if
+        the sync fails too) - but False is returned: that time is hours or days old, the caller syncs """
+    stored: object = rtcstore.get("ntp")
+    if isinstance(stored, dict) and "drift_ppm" in stored:
+        clock.drift_ppm = stored["drift_ppm"]
+
+    now: int = time.time()  # type: ignore[attr-defined]
+    if now < _VALID_AFTER_S:
+        if not isinstance(stored, dict) or "t" not in stored:
+            return False
+        # RTC lost its time - the last synced time is better than 2000-01-01, but not proper time
+        _set_rtc(stored["t"] * 1_000_000)
+        logger.info("ntpclient: RTC lost its time - set to the last synced time until the sync")
+        return False
+
+    logger.info("ntpclient: RTC time kept over the reset")
+    time.set_had_proper_time_set(True)
+    return True
+
+
+def sync(hosts: list[str] | None = None, timeout_ms: int = TIMEOUT_MS) -> bool:
+    """ queries all hosts at the same time and waits up to timeout_ms for the first valid answer """
+    global _next_attempt_ticks
+    resolve_hosts(hosts)
+    _send(HOSTS if hosts is None else hosts)
+    try:
+        if not _inflight:
+            return False
+        deadline: int = time.ticks_add(time.ticks_ms(), timeout_ms)  # type: ignore[attr-defined]
+        while True:
+            left: int = time.ticks_diff(deadline, time.ticks_ms())  # type: ignore[attr-defined]
+            if left <= 0:
+                break
+            r: tuple[str, int] | None = _receive(left)
+            if r is not None:
+                _apply(r[0], r[1])
+                return True
+    finally:
+        _close()
+
+    logger.warning("ntpclient: no answer from %s within %d ms", hosts if hosts is not None else HOSTS, timeout_ms)
+    _next_attempt_ticks = time.ticks_add(time.ticks_ms(), RETRY_PERIOD_S * 1_000)  # type: ignore[attr-defined]
+    return False
+
+
+def tick() -> None:
+    """ background refine - never blocks: sends the queries when due, checks for answers on the next calls """
+    global _next_attempt_ticks
+    now: int = time.ticks_ms()  # type: ignore[attr-defined]
+
+    if _inflight:
+        r: tuple[str, int] | None = _receive(0)
+        if r is not None:
+            _close()
+            _apply(r[0], r[1])
+        elif time.ticks_diff(now, _inflight_ticks) > TIMEOUT_MS:  # type: ignore[attr-defined]
+            _close()
+            logger.info("ntpclient: no answer - retrying in %ds", RETRY_PERIOD_S)
+            _next_attempt_ticks = time.ticks_add(now, RETRY_PERIOD_S * 1_000)  # type: ignore[attr-defined]
+        return
+
+    if _next_attempt_ticks is None or time.ticks_diff(now, _next_attempt_ticks) >= 0:  # type: ignore[attr-defined]
+        _next_attempt_ticks = time.ticks_add(now, RETRY_PERIOD_S * 1_000)  # type: ignore[attr-defined]
+        _send(HOSTS)
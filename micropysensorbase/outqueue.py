@@ -0,0 +1,163 @@
+""" bounded store-and-forward queue for outgoing mqtt messages - RAM first, spilling to flash """
+
+import binascii
+import json
+import os
+
+from . import logging
+
+logger = logging.get_logger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class OutQueue:
+    """ FIFO of (topic, msg, qos, retain) which could not be published (yet).
+
+        The newest `ram_entries` messages are held in RAM. If RAM is full the oldest RAM entry is appended
+        to a segment file on flash (one json line per message - binary msgs base64 encoded). Every message in the file is older than every
+        message in RAM - so draining the file first and RAM afterward keeps the original order.
+
+        The read position in the file is kept in `<path>.off` - messages spilled to flash survive a reboot and
+        are sent after the next successful connect. Once the file is drained completely it is removed (by commit()).
+
+        pop() only moves the read position in RAM - until commit() a reset sends the popped messages again.
+
+        If the file would grow beyond `max_file_bytes` the message is dropped (and counted in `dropped`).
+
+        msg is stored as-is - so the created_at timestamp in it is the one of the original measurement.
+    """
+
+    def __init__(self, ram_entries: int = 32, path: str = "/outqueue.seg", max_file_bytes: int = 65_536) -> None:
+        assert ram_entries > 0
+        self.ram_entries: int = ram_entries
+        self.path: str = path
+        self.max_file_bytes: int = max_file_bytes
+
+        self._ram: list[tuple[bytes | str, str | bytes, int, bool]] = []
+
+        self._file_size: int = 0
+        self._file_offset: int = 0
+        self._file_entries: int = 0
+        self._head: tuple[bytes | str, str | bytes, int, bool] | None = None
+        self._head_len: int = 0
+
+        self.dropped: int = 0
+
+        self._open_existing()
+
+    def _open_existing(self) -> None:
+        try:
+            self._file_size = os.stat(self.path)[6]
+        except OSError:
+            self._file_size = 0
+            return
+
+        try:
+            with open(self.path + ".off", "r") as f:
+                self._file_offset = int(f.read())
+        except (OSError, ValueError):
+            self._file_offset = 0
+
+        if self._file_offset >= self._file_size:
+            self._remove_file()
+            return
+
+        torn: bool = False
+        with open(self.path, "rb") as f:
+            f.seek(self._file_offset)
+            for line in f:
+                self._file_entries += 1
+                torn = not line.endswith(b"\n")
+
+        if torn:
+            # reset while spilling - terminate the partial line, peek() skips it
+            with open(self.path, "ab") as f:
+                f.write(b"\n")
+            self._file_size += 1
+
+        logger.info("OutQueue: %d entries left on flash from before the reboot", self._file_entries)
+
+    def _remove_file(self) -> None:
+        for p in (self.path, self.path + ".off"):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        self._file_size = 0
+        self._file_offset = 0
+        self._file_entries = 0
+        self._head = None
+        self._head_len = 0
+
+    def _spill(self, entry: tuple[bytes | str, str | bytes, int, bool]) -> None:
+        topic: bytes | str = entry[0]
+        msg: str | bytes = entry[1]
+        rec: list = [topic.decode() if isinstance(topic, bytes) else topic, msg, entry[2], entry[3]]
+        if isinstance(msg, bytes):
+            rec[1] = binascii.b2a_base64(msg).decode().strip()
+            rec.append(True)
+        line: bytes = (json.dumps(rec) + "\n").encode()
+        if self._file_size + len(line) > self.max_file_bytes:
+            self.dropped += 1
+            logger.warning("OutQueue: segment file full - dropping message for %s (dropped=%d)", entry[0], self.dropped)
+            return
+
+        with open(self.path, "ab") as f:
+            f.write(line)
+        self._file_size += len(line)
+        self._file_entries += 1
+
+    def __len__(self) -> int:
+        return self._file_entries + len(self._ram)
+
+    def put(self, topic: bytes | str, msg: str | bytes, qos: int = 1, retain: bool = True) -> None:
+        if len(self._ram) >= self.ram_entries:
+            self._spill(self._ram.pop(0))
+        self._ram.append((topic, msg, qos, retain))
+
+    def peek(self) -> tuple[bytes | str, str | bytes, int, bool] | None:
+        """ returns the oldest message without removing it (None if empty) """
+        while self._file_entries > 0 and self._head is None:
+            with open(self.path, "rb") as f:
+                f.seek(self._file_offset)
+                line: bytes = f.readline()
+            try:
+                t: list = json.loads(line)
+                self._head = (t[0], binascii.a2b_base64(t[1]) if len(t) > 4 and t[4] else t[1], t[2], t[3])
+                self._head_len = len(line)
+            except (ValueError, IndexError):
+                logger.warning("OutQueue: skipping broken line at offset %d", self._file_offset)
+                self._head_len = len(line)
+                self._head = None
+                self._advance()
+
+        if self._head is not None:
+            return self._head
+
+        if len(self._ram) > 0:
+            return self._ram[0]
+
+        return None
+
+    def pop(self) -> None:
+        """ removes the oldest message - to be called after it was published successfully (see commit()) """
+        if self._file_entries > 0:
+            if self.peek() is not None and self._head is not None:
+                self._advance()
+                return
+        if len(self._ram) > 0:
+            self._ram.pop(0)
+
+    def _advance(self) -> None:
+        self._file_offset += self._head_len
+        self._file_entries -= 1
+        self._head = None
+
+    def commit(self) -> None:
+        """ persists the read position in the segment file - call it once the drained messages are acknowledged """
+        if self._file_entries == 0:
+            if self._file_size > 0:
+                self._remove_file()
+        else:
+            with open(self.path + ".off", "w") as f:
+                f.write(str(self._file_offset))
@@ -0,0 +1,189 @@
+""" json payload encoder: static prefix serialized once, optional fixed float precision, reusable output buffer """
+
+import json
+
+_INF: float = float("inf")
+
+
+class PayloadEncoder:
+    """ Encodes {**base, "created_at": ..., "value": ...} the same way mqttwrap.value_to_mqtt_string did with
+        json.dumps - but:
+            - base (lat/lon/ele) is serialized once in __init__
+            - the output is written into a bytearray which is reused for every message (and only grows) -
+              encode() returns a view into it, which can be passed to publish as it is (no str/bytes copy)
+            - with precision floats are written with a fixed number of decimals (no long reprs like
+              12.340000000000001) and NaN/inf as null (json.dumps would write the invalid NaN/Infinity)
+
+        Without precision the value is serialized by json.dumps (fastest - especially for dicts), floats keep
+        their full repr.
+
+            enc = PayloadEncoder(base={"lat": 1.0, "lon": 2.0, "ele": 3.0})
+            enc.encode(12.3456, "2025-01-01T00:00:00+01:00", precision=2)
+            -> b'{"lat": 1.0, "lon": 2.0, "ele": 3.0, "created_at": "2025-01-01T00:00:00+01:00", "value": 12.35}'
+    """
+
+    def __init__(self, base: dict, size: int = 256) -> None:
+        self._ffmts: dict[int, str] = {}
+
+        self._buf: bytearray = bytearray(size)
+        self._mv: memoryview = memoryview(self._buf)
+        self._n: int = 0
+
+        prefix: str = json.dumps(base)
+        self._prefix: bytes = (prefix[:-1] + (", " if len(base) > 0 else "") + "\"created_at\": \"").encode()
+        self._mid: bytes = b"\", \"value\": "
+
+    def _put(self, b: bytes) -> None:
+        n: int = self._n
+        end: int = n + len(b)
+        if end > len(self._buf):
+            grown: bytearray = bytearray(max(end, 2 * len(self._buf)))
+            grown[:n] = self._mv[:n]
+            self._buf = grown
+            self._mv = memoryview(grown)
+        self._mv[n:end] = b
+        self._n = end
+
+    def _value_str(self, v: object, ffmt: str) -> str:
+        if isinstance(v, float):
+            if v != v or v == _INF or v == -_INF:
+                return "null"
+            return ffmt % v
+        if isinstance(v, dict):
+            parts: list[str] = []
+            for k in v:
+                parts.append(json.dumps(str(k)) + ": " + self._value_str(v[k], ffmt))
+            return "{" + ", ".join(parts) + "}"
+        if isinstance(v, (list, tuple)):
+            return "[" + ", ".join([self._value_str(x, ffmt) for x in v]) + "]"
+        # str, int, bool, None
+        return json.dumps(v)
+
+    def encode(self, value: object, created_at: str, precision: int | None = None) -> memoryview:
+        """ returns a view into the internal buffer - only valid until the next encode() """
+        if precision is None:
+            vs: str = json.dumps(value)
+        else:
+            ffmt: str | None = self._ffmts.get(precision)
+            if ffmt is None:
+                ffmt = "%." + str(precision) + "f"
+                self._ffmts[precision] = ffmt
+            vs = self._value_str(value, ffmt)
+
+        self._n = 0
+        self._put(self._prefix)
+        self._put(created_at.encode())
+        self._put(self._mid)
+        self._put(vs.encode())
+        self._put(b"}")
+        return self._mv[:self._n]
+
+    def encode_str(self, value: object, created_at: str, precision: int | None = None) -> str:
+        """ encode() as a str (a copy) - for messages which are kept (e.g. queued) """
+        return str(self.encode(value, created_at, precision), "utf-8")
+
+
+# --- compact binary ("packed") payloads ---
+#
+# record (little endian):
+#   B   PACKED_VERSION
+#   B   schema id (see SCHEMAS)
+#   I   created_at as unix epoch seconds (UTC)
+#   h   utc offset of created_at in minutes
+#   fff lat, lon, ele
+#   f.. the schema's float fields (in order)
+#   ... the schema's string field (utf-8, rest of the record) - if the schema has one
+#
+# payload_decode.py (CPython) turns a record back into the json shape of value_to_mqtt_string.
+
+PACKED_VERSION: int = 0xB1
+PACKED_HEADER: str = "<BBIhfff"
+PACKED_HEADER_SIZE: int = 20
+
+# schema id -> (float fields, string field or None) - None as float fields: the value itself is one float
+SCHEMAS: dict[int, tuple[tuple[str, ...] | None, str | None]] = {
+    1: (None, None),
+    2: (("current", "busvoltage", "shuntvoltage", "supplyvoltage", "power"), None),
+    3: (("temperature", "humidity"), "measure_device_name"),
+}
+
+# device epoch (2000-01-01 on most ports) -> unix epoch
+try:
+    import time as _time
+    EPOCH_OFFSET: int = 946684800 if _time.gmtime(0)[0] == 2000 else 0
+except Exception:
+    EPOCH_OFFSET = 0
+
+
+def find_schema(value: object) -> int:
+    """ id of the schema which can hold value exactly - 0 if there is none (the caller falls back to json) """
+    if isinstance(value, float) or (isinstance(value, int) and not isinstance(value, bool)):
+        return 1
+    if not isinstance(value, dict):
+        return 0
+    for sid in SCHEMAS:
+        fields, strfield = SCHEMAS[sid]
+        if fields is None or len(value) != len(fields) + (1 if strfield else 0):
+            continue
+        ok: bool = True
+        for f in fields:
+            if f not in value or not isinstance(value[f], (int, float)):
+                ok = False
+                break
+        if ok and (strfield is None or isinstance(value.get(strfield), str)):
+            return sid
+    return 0
+
+
+def pack(value: object, created_at_secs: int, utc_offset_minutes: int, base: dict) -> bytes | None:
+    """ packed record of value (see above) - None if no schema fits """
+    import struct
+
+    sid: int = find_schema(value)
+    if sid == 0:
+        return None
+
+    fields, strfield = SCHEMAS[sid]
+    nfloats: int = 1 if fields is None else len(fields)
+    tail: bytes = b""
+    if strfield is not None:
+        tail = value[strfield].encode()  # type: ignore
+
+    buf: bytearray = bytearray(PACKED_HEADER_SIZE + 4 * nfloats + len(tail))
+    struct.pack_into(
+        PACKED_HEADER, buf, 0,
+        PACKED_VERSION, sid, created_at_secs + EPOCH_OFFSET, utc_offset_minutes,
+        base["lat"], base["lon"], base["ele"],
+    )
+    off: int = PACKED_HEADER_SIZE
+    if fields is None:
+        struct.pack_into("<f", buf, off, value)
+    else:
+        for f in fields:
+            struct.pack_into("<f", buf, off, value[f])  # type: ignore
+            off += 4
+    if tail:
+        buf[PACKED_HEADER_SIZE + 4 * nfloats:] = tail
+
+    return bytes(buf)
+
+
+def deflate_compress(data: bytes) -> bytes | None:
+    """ zlib stream of data - None if this build can not compress """
+    try:
+        import deflate  # micropython >= 1.21 (compression needs MICROPY_PY_DEFLATE_COMPRESS)
+        import io
+        buf = io.BytesIO()
+        with deflate.DeflateIO(buf, deflate.ZLIB) as d:
+            d.write(data)
+        return buf.getvalue()
+    except ImportError:
+        pass
+    except Exception:
+        return None
+
+    try:
+        import zlib
+        return zlib.compress(data)
+    except ImportError:
+        return None
@@ -0,0 +1,95 @@
+# this is NOT to be run in micropython - this is for the ingest side (via "normal" python)
+""" decodes packed payloads (see payload.pack) back into the json shape of mqttwrap.value_to_mqtt_string
+
+    python -m micropysensorbase.payload_decode <hex-payload>
+
+    also expands batch messages (see batch.Batch - plain json or zlib compressed) into single readings.
+"""
+
+import datetime
+import json
+import struct
+import sys
+import zlib
+
+from .payload import PACKED_HEADER, PACKED_HEADER_SIZE, PACKED_VERSION, SCHEMAS
+
+
+def is_packed(payload: bytes) -> bool:
+    return len(payload) >= PACKED_HEADER_SIZE and payload[0] == PACKED_VERSION
+
+
+def _f32(v: float, digits: int) -> float:
+    # float32 -> shortest decimal that survives the round trip (well enough)
+    return float(f"{v:.{digits}g}")
+
+
+def decode(payload: bytes) -> dict:
+    """ payload -> {"lat", "lon", "ele", "created_at", "value"} """
+    if not is_packed(payload):
+        raise ValueError("not a packed payload")
+
+    _, sid, epoch, offset_min, lat, lon, ele = struct.unpack_from(PACKED_HEADER, payload, 0)
+    if sid not in SCHEMAS:
+        raise ValueError(f"unknown schema id {sid}")
+
+    fields, strfield = SCHEMAS[sid]
+    nfloats: int = 1 if fields is None else len(fields)
+    floats = struct.unpack_from(f"<{nfloats}f", payload, PACKED_HEADER_SIZE)
+
+    value: float | dict
+    if fields is None:
+        value = _f32(floats[0], 7)
+    else:
+        value = {f: _f32(v, 7) for f, v in zip(fields, floats)}
+        if strfield is not None:
+            value[strfield] = payload[PACKED_HEADER_SIZE + 4 * nfloats:].decode()
+
+    tz: datetime.timezone = datetime.timezone(datetime.timedelta(minutes=offset_min))
+    created_at: str = datetime.datetime.fromtimestamp(epoch, tz).isoformat()
+
+    return {
+        "lat": _f32(lat, 8),
+        "lon": _f32(lon, 8),
+        "ele": _f32(ele, 7),
+        "created_at": created_at,
+        "value": value,
+    }
+
+
+def decode_to_json(payload: bytes) -> str:
+    """ json text of payload - payloads which are not packed are passed through """
+    if not is_packed(payload):
+        return payload.decode()
+    return json.dumps(decode(payload))
+
+
+def decode_batch(payload: bytes) -> list[dict]:
+    """ batch message -> one {"lat", "lon", "ele", "created_at", "value"} per reading """
+    if payload[:1] == b"\x78":  # zlib header
+        payload = zlib.decompress(payload)
+    msg: dict = json.loads(payload)
+
+    batch: dict = msg["value"]
+    base: int = batch["base"]
+    tz: datetime.tzinfo | None = datetime.datetime.fromisoformat(msg["created_at"]).tzinfo
+    attrs: list[str] = [k for k in batch if k not in ("base", "dt", "sensor")]
+
+    ret: list[dict] = []
+    for i, dt in enumerate(batch["dt"]):
+        value: dict = {a: batch[a][i] for a in attrs}
+        if "sensor" in batch:
+            value["sensor"] = batch["sensor"]
+        ret.append({
+            "lat": msg.get("lat"),
+            "lon": msg.get("lon"),
+            "ele": msg.get("ele"),
+            "created_at": datetime.datetime.fromtimestamp(base + dt, tz).isoformat(),
+            "value": value,
+        })
+    return ret
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:]:
+        print(decode_to_json(bytes.fromhex(arg)))
@@ -0,0 +1,85 @@
+""" fixed-size ring buffer on top of a preallocated array for high-rate sampling """
+
+from array import array
+
+
+class RingBuffer:
+    """ Preallocated ring buffer of raw (integer) samples.
+
+        append() only writes into the preallocated array and updates some small-int counters, so
+        filling the buffer does not allocate on the heap (and thus does not trigger the GC).
+
+        mean/stddev are calculated over the samples currently held in the buffer (the last `size`
+        samples), min/max/count cover all samples appended since the last reset().
+
+        Use it like:
+
+            rb = RingBuffer(size=600, typecode="h")
+            rb.append(ina.current_raw())
+            ...
+            stats = rb.stats(scale=ina.current_lsb_milliamps())
+            rb.reset()
+    """
+
+    def __init__(self, size: int, typecode: str = "h") -> None:
+        assert size > 0
+        self.size: int = size
+        self._buf: array = array(typecode, [0] * size)
+        self._idx: int = 0
+        self._filled: int = 0
+        self.count: int = 0
+        self.min_value: int = 0
+        self.max_value: int = 0
+
+    def reset(self) -> None:
+        self._idx = 0
+        self._filled = 0
+        self.count = 0
+        self.min_value = 0
+        self.max_value = 0
+
+    def __len__(self) -> int:
+        return self._filled
+
+    def append(self, value: int) -> None:
+        self._buf[self._idx] = value
+        self._idx += 1
+        if self._idx == self.size:
+            self._idx = 0
+
+        if self._filled < self.size:
+            self._filled += 1
+
+        if self.count == 0:
+            self.min_value = value
+            self.max_value = value
+        elif value < self.min_value:
+            self.min_value = value
+        elif value > self.max_value:
+            self.max_value = value
+
+        self.count += 1
+
+    def stats(self, scale: float = 1.0) -> dict[str, float | int] | None:
+        """ returns min/max/mean/stddev (multiplied by scale) and count - None if no samples were appended """
+        n: int = self._filled
+        if n == 0:
+            return None
+
+        # integer sums keep the calculation exact - only converted to float at the very end
+        s: int = 0
+        ss: int = 0
+        for i in range(n):
+            v: int = self._buf[i]
+            s += v
+            ss += v * v
+
+        var_num: int = n * ss - s * s
+
+        return {
+            "min": self.min_value * scale,
+            "max": self.max_value * scale,
+            "mean": s / n * scale,
+            "stddev": (var_num ** 0.5) / n * abs(scale),
+            "count": self.count,
+        }
@@ -0,0 +1,50 @@
+""" small json key/value store in RTC memory - survives soft resets and deep sleep (but not a power loss) """
+
+import json
+
+import machine
+
+from . import logging
+
+logger = logging.get_logger(__name__)
+logger.setLevel(logging.INFO)
+
+_MAGIC: bytes = b"MSB1"
+RTC_MEMORY_SIZE: int = 2048  # ESP32 default (MICROPY_HW_RTC_USER_MEM_MAX)
+
+_data: dict | None = None
+
+
+def _load() -> dict:
+    global _data
+    if _data is None:
+        _data = {}
+        try:
+            mem: bytes = machine.RTC().memory()
+            if mem[:4] == _MAGIC:
+                _data = json.loads(mem[4:])
+        except (ValueError, AttributeError, OSError):
+            # empty/foreign content or a port without RTC memory
+            pass
+    return _data  # type: ignore
+
+
+def get(key: str, default: object = None) -> object:
+    d: dict = _load()
+    return d[key] if key in d else default
+
+
+def put(key: str, value: object) -> bool:
+    """ stores value under key - False if it does not fit (the RTC memory keeps the previous content then) """
+    d: dict = _load()
+    d[key] = value
+    mem: bytes = _MAGIC + json.dumps(d).encode()
+    if len(mem) > RTC_MEMORY_SIZE:
+        logger.warning("rtcstore: %d bytes do not fit into RTC memory - %r not persisted", len(mem), key)
+        return False
+
+    try:
+        machine.RTC().memory(mem)
+    except (AttributeError, OSError):
+        return False
+    return True
@@ -0,0 +1,234 @@
+""" asyncio runtime - cooperative tasks instead of hardware timers + micropython.schedule + lock skipping
+
+    enabled by "runtime": "asyncio" in esp32config.json - main.main() then calls run() which does not return.
+
+    tasks:
+        measure     -- every measuretimer_period_ms: measures all sensors - readings to send are only queued
+        sample      -- every sample_period_ms (if a sensor samples): takes the high-rate samples
+        alert       -- per INA226 with alert_pin: collects the conversion once the ALERT irq set its flag
+        receive     -- awaits incoming mqtt data and handles it and the received commands
+        send        -- sends the queued readings as soon as they are queued (and the connection is up)
+        connection  -- every chckmsgs_period_ms: (re)connects, sends the status, pings, refines the ntp time
+        display     -- every display_period_ms: shows the last readings on the ssd1306/sh1106 (if there is one)
+        reboot      -- after forcerestart_after_running_seconds: reboots
+
+    Nothing is run via micropython.schedule (the irqs only set flags) - so no code runs in the middle of a
+    measurement, an I2C transfer or a write to the mqtt socket, and no tick is skipped because of a held lock.
+
+    The mqtt client runs in non-blocking mode (mqttwrap.mqtt_async): the receive task awaits the socket being
+    readable, publishes and pings await it being writable - and the PUBACKs (see mqttwrap.apublish_one). The
+    measurement itself never touches the socket (mqttwrap.publish_or_enqueue only queues).
+
+    Still blocking (bounded) in the connection task: the mqtt (re)connect - socket connect, TLS handshake and
+    CONNACK up to the connect timeout. The wifi (re)connect does not block (see wifi.connect_step).
+"""
+
+import gc
+import io
+import sys
+
+import machine
+
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio  # type: ignore
+
+from . import logging, time
+from . import config
+from . import main
+from . import measurements
+from . import mqttwrap
+from . import ntpclient
+from . import wifi
+
+logger = logging.get_logger(__name__)
+logger.setLevel(logging.INFO)
+
+if __name__ in config.get_config_data_dict(config.data, "loglevel"):
+    melv: int|None = logging.get_log_level_by_name(
+        config.get_config_data_str(config.get_config_data_dict(config.data, "loglevel"), "runtime_async"))
+    if melv is not None:
+        logger.setLevel(melv)
+
+# while not connected: how often the receive task checks for the connection
+RECEIVE_PERIOD_MS: int = 250
+DISPLAY_PERIOD_MS: int = 5_000
+
+if "receive_period_ms" in config.data:
+    RECEIVE_PERIOD_MS = config.get_config_data_int(config.data, "receive_period_ms")
+if "display_period_ms" in config.data:
+    DISPLAY_PERIOD_MS = config.get_config_data_int(config.data, "display_period_ms")
+
+
+def _log_exception(ex: BaseException) -> None:
+    _out = io.StringIO()
+    sys.print_exception(ex)
+    sys.print_exception(ex, _out)
+
+    logger.error(_out.getvalue())
+
+
+async def _every(period_ms: int, fn, *args) -> None:  # type: ignore
+    """ awaits fn(*args) every period_ms - the period is measured from start to start (no drift) """
+    nxt: int = time.ticks_ms()  # type: ignore[attr-defined]
+    while True:
+        if main.WATCHDOG:
+            main.WATCHDOG.feed()
+
+        try:
+            await fn(*args)
+        except Exception as ex:
+            _log_exception(ex)
+
+        nxt = time.ticks_add(nxt, period_ms)  # type: ignore[attr-defined]
+        wait: int = time.ticks_diff(nxt, time.ticks_ms())  # type: ignore[attr-defined]
+        if wait < 0:
+            # overran the period - do not try to catch up
+            nxt = time.ticks_ms()  # type: ignore[attr-defined]
+            wait = 0
+        await asyncio.sleep_ms(wait)  # type: ignore[attr-defined]
+
+
+async def measure_tick() -> None:
+    send_data_forced: bool = measurements.send_data_forced_always
+    send_data_enabled: bool = True
+    measurements.measure_masked_arg((send_data_forced << 1) | send_data_enabled)
+
+
+async def sample_tick() -> None:
+    measurements.sample_scheduled()
+
+
+async def alert_task(sensor: measurements.INA226Sensor) -> None:
+    flag: asyncio.ThreadSafeFlag = asyncio.ThreadSafeFlag()
+    sensor.alert_callback = flag.set
+    while True:
+        await flag.wait()
+        try:
+            sensor.conversion_ready()
+        except Exception as ex:
+            _log_exception(ex)
+
+
+async def receive_task() -> None:
+    while True:
+        if main.WATCHDOG:
+            main.WATCHDOG.feed()
+
+        if not await mqttwrap.areceive():
+            # not connected - reconnecting is up to the connection task
+            await asyncio.sleep_ms(RECEIVE_PERIOD_MS)  # type: ignore[attr-defined]
+
+        try:
+            main.handle_commands()
+        except Exception as ex:
+            _log_exception(ex)
+
+
+async def send_task() -> None:
+    while True:
+        mqttwrap.outqueue_event.clear()
+        if mqttwrap.is_connected():
+            try:
+                await mqttwrap.adrain_outqueue()
+            except Exception as ex:
+                _log_exception(ex)
+
+        if mqttwrap.is_connected() and mqttwrap.outqueue is not None and len(mqttwrap.outqueue) > 0:
+            continue
+
+        try:
+            # woken by the next queued message - or after a (re)connect by the timeout
+            await asyncio.wait_for_ms(mqttwrap.outqueue_event.wait(), main.CHCKMSGS_PERIOD_MS)  # type: ignore[attr-defined]
+        except asyncio.TimeoutError:
+            pass
+
+
+async def connection_tick() -> None:
+    ifconfig: tuple | None = wifi.ensure_wifi_catch_reset(reset_if_wifi_fails=False, watchdog=main.WATCHDOG, blocking=False)
+    if main.WATCHDOG:
+        main.WATCHDOG.feed()
+
+    mqttwrap.ensure_mqtt_catch_reset(reset_if_mqtt_fails=False, watchdog=main.WATCHDOG)
+    if main.WATCHDOG:
+        main.WATCHDOG.feed()
+
+    if ifconfig is not None and mqttwrap.is_connected() and mqttwrap.status_due():
+        await mqttwrap.asend_status(ifconfig)
+    await mqttwrap.aping_if_needed(threshhold=10)
+
+    # background ntp refine - never blocks
+    try:
+        ntpclient.tick()
+    except OSError as ex:
+        logger.warning("runtime_async::connection_tick::ntpclient.tick failed: %r", ex)
+
+    gc.collect()
+
+
+async def display_tick() -> None:
+    ssd = measurements.ssd
+    if ssd is None:
+        return
+
+    ssd.fill(0)
+    y: int = 0
+    for sensor in measurements.SENSORS:
+        data = sensor.last_sent_data
+        if data is None:
+            continue
+
+        if isinstance(data, measurements.INAREADDATA):
+            ssd.text("%.1fmA %.2fV" % (data.current, data.busvoltage), 0, y, 1)
+        elif isinstance(data, measurements.DHTREADDATA):
+            ssd.text("%s %.1fC %.0f%%" % (sensor.name, data.temperature, data.humidity), 0, y, 1)
+        y += 9
+
+    ssd.text("MQTT ok" if mqttwrap.is_connected() else "MQTT offline", 0, y, 1)
+    ssd.show()
+
+
+async def reboot_after(seconds: int) -> None:
+    await asyncio.sleep(seconds)
+
+    timestring: str = time.getisotimenow()
+    logger.info("%s::rebooting...", timestring)
+    if not main.DISABLE_INET:
+        await mqttwrap.apublish_one(mqttwrap.topic("loggingfeed"), "rebooting at " + timestring)
+    machine.reset()
+
+
+async def _main() -> None:
+    tasks: list = []
+
+    if len(measurements.SENSORS) > 0:
+        tasks.append(asyncio.create_task(_every(main.MEASURETIMER_PERIOD_MS, measure_tick)))
+
+    sample_period_ms: int = measurements.get_sample_period_ms()
+    if sample_period_ms > 0:
+        tasks.append(asyncio.create_task(_every(sample_period_ms, sample_tick)))
+
+    for sensor in measurements.SENSORS:
+        if isinstance(sensor, measurements.INA226Sensor) and sensor.alert_pin is not None:
+            tasks.append(asyncio.create_task(alert_task(sensor)))
+
+    if not main.DISABLE_INET:
+        tasks.append(asyncio.create_task(receive_task()))
+        tasks.append(asyncio.create_task(send_task()))
+        tasks.append(asyncio.create_task(_every(main.CHCKMSGS_PERIOD_MS, connection_tick)))
+
+    if measurements.ssd is not None:
+        tasks.append(asyncio.create_task(_every(DISPLAY_PERIOD_MS, display_tick)))
+
+    forcerestart_s: int = config.get_config_data_int(config.data, "forcerestart_after_running_seconds")
+    if forcerestart_s > 0:
+        tasks.append(asyncio.create_task(reboot_after(forcerestart_s)))
+
+    logger.info("runtime_async: %d tasks started", len(tasks))
+
+    await asyncio.gather(*tasks)
+
+
+def run() -> None:
+    asyncio.run(_main())
@@ -15,6 +15,10 @@ finally:
     sys.path = _path
     del _path
 
+if sys.implementation.name != 'micropython':
+    # for the annotations of the timezone table only - load_tz_table() imports it itself
+    from array import array
+
 HAD_PROPER_TIME_SET: bool = False
 CETTIMEOFFSETHOURS: int | None = None
 
@@ -58,56 +62,61 @@ _MDAY = const(
 )
 
 
-def strftime(datefmt: str, ts: tuple) -> str:
-    import io
-
+# strftime: the format is compiled once into a "plan" - a %-template and, per directive, the index into the time
+# tuple (or a function of it for the derived fields) - instead of walking the format character by character
+_DIRECTIVES: dict = {
+    "a": ("%s", lambda ts: _WDAY[ts[_TS_WDAY]][0:3]),
+    "A": ("%s", lambda ts: _WDAY[ts[_TS_WDAY]]),
+    "b": ("%s", lambda ts: _MDAY[ts[_TS_MON] - 1][0:3]),
+    "B": ("%s", lambda ts: _MDAY[ts[_TS_MON] - 1]),
+    "d": ("%02d", _TS_MDAY),
+    "H": ("%02d", _TS_HOUR),
+    "I": ("%02d", lambda ts: ts[_TS_HOUR] % 12),
+    "j": ("%03d", _TS_YDAY),
+    "m": ("%02d", _TS_MON),
+    "M": ("%02d", _TS_MIN),
+    "P": ("%s", lambda ts: "AM" if ts[_TS_HOUR] < 12 else "PM"),
+    "S": ("%02d", _TS_SEC),
+    "w": ("%d", _TS_WDAY),
+    "y": ("%02d", lambda ts: ts[_TS_YEAR] % 100),
+    "Y": ("%d", _TS_YEAR),
+}
+
+_STRFTIME_PLANS: dict[str, tuple[str, tuple]] = {}
+
+
+def compile_strftime(datefmt: str) -> tuple[str, tuple]:
+    """ plan of datefmt for strftime() - unknown directives are written as the directive character:
+
+            "%Y-%m-%d %H:%M"  ->  ("%d-%02d-%02d %02d:%02d", (0, 1, 2, 3, 4))
+    """
+    template: list[str] = []
+    ops: list = []
     fmtsp: bool = False
-    ftime: io.StringIO = io.StringIO()
-
-    # assert hasattr(ftime, "write")
-
     for k in datefmt:
         if fmtsp:
-            if k == "a":
-                ftime.write(_WDAY[ts[_TS_WDAY]][0:3])
-            elif k == "A":
-                ftime.write(_WDAY[ts[_TS_WDAY]])
-            elif k == "b":
-                ftime.write(_MDAY[ts[_TS_MON] - 1][0:3])
-            elif k == "B":
-                ftime.write(_MDAY[ts[_TS_MON] - 1])
-            elif k == "d":
-                ftime.write("%02d" % ts[_TS_MDAY])
-            elif k == "H":
-                ftime.write("%02d" % ts[_TS_HOUR])
-            elif k == "I":
-                ftime.write("%02d" % (ts[_TS_HOUR] % 12))
-            elif k == "j":
-                ftime.write("%03d" % ts[_TS_YDAY])
-            elif k == "m":
-                ftime.write("%02d" % ts[_TS_MON])
-            elif k == "M":
-                ftime.write("%02d" % ts[_TS_MIN])
-            elif k == "P":
-                ftime.write("AM" if ts[_TS_HOUR] < 12 else "PM")
-            elif k == "S":
-                ftime.write("%02d" % ts[_TS_SEC])
-            elif k == "w":
-                ftime.write(str(ts[_TS_WDAY]))
-            elif k == "y":
-                ftime.write("%02d" % (ts[_TS_YEAR] % 100))
-            elif k == "Y":
-                ftime.write(str(ts[_TS_YEAR]))
+            if k in _DIRECTIVES:
+                spec, op = _DIRECTIVES[k]
+                template.append(spec)
+                ops.append(op)
             else:
-                ftime.write(k)
+                template.append("%%" if k == "%" else k)
             fmtsp = False
         elif k == "%":
             fmtsp = True
         else:
-            ftime.write(k)
-    val = ftime.getvalue()
-    ftime.close()
-    return val
+            template.append(k)
+    return "".join(template), tuple(ops)
+
+
+def strftime(datefmt: str, ts: tuple) -> str:
+    plan: tuple[str, tuple] | None = _STRFTIME_PLANS.get(datefmt)
+    if plan is None:
+        plan = compile_strftime(datefmt)
+        _STRFTIME_PLANS[datefmt] = plan
+
+    template, ops = plan
+    return template % tuple([ts[op] if isinstance(op, int) else op(ts) for op in ops])
 
 
 _LAST_SUNDAY_CACHE: dict[tuple[int, int], int] = {}
@@ -162,39 +171,196 @@ def get_offsethours(year: int, utc_secs: int) -> int:
 
     return mycettimeoffsethours
 
+# utc offset cache: the offset is valid for utc seconds in [_offset_from, _offset_until) - i.e. until the next
+# DST transition - so the lookup only runs again when a transition is crossed
+_offset_minutes: int = 60
+_offset_from: int = 0
+_offset_until: int = -1
+
+# timezone table (see load_tz_table) - without one the CET/CEST rule of get_offsethours() is used
+TZ_TABLE_PATH: str = "/tz.bin"
+_tz_tried: bool = False
+_tz_t: "array | None" = None  # transitions (utc, device epoch), ascending
+_tz_off: "array | None" = None  # utc offset in minutes from the transition on
+_tz_before: int = 0  # utc offset in minutes before the first transition
+_FOREVER: int = 0x7FFFFFFF
+
+
+def load_tz_table(path: str = TZ_TABLE_PATH) -> bool:
+    """ loads a timezone table generated by scripts/gen_tztable.py - False if there is none (or it is broken) """
+    global _tz_tried, _tz_t, _tz_off, _tz_before, _offset_until
+    from array import array
+    import struct
+
+    _tz_tried = True
+    try:
+        with open(path, "rb") as f:
+            magic, n, before = struct.unpack("<4sHh", f.read(8))
+            if magic != b"TZT1":
+                return False
+            t: array = array("I", bytes(4 * n))
+            off: array = array("h", bytes(2 * n))
+            if f.readinto(t) != 4 * n or f.readinto(off) != 2 * n:  # type: ignore
+                return False
+    except (OSError, ValueError):
+        return False
+
+    # the table has unix epoch seconds
+    epoch_offset: int = 946684800 if gmtime(0)[0] == 2000 else 0  # type: ignore
+    if epoch_offset:
+        for i in range(n):
+            t[i] -= epoch_offset
+
+    _tz_t, _tz_off, _tz_before = t, off, before
+    _offset_until = -1  # invalidate the cached offset
+    return True
+
+
+def _tz_lookup(utc_secs: int) -> None:
+    """ binary search for the last transition <= utc_secs """
+    global _offset_minutes, _offset_from, _offset_until
+    t = _tz_t
+    n: int = len(t)  # type: ignore
+    lo: int = 0
+    hi: int = n
+    while lo < hi:
+        mid: int = (lo + hi) >> 1
+        if t[mid] <= utc_secs:  # type: ignore
+            lo = mid + 1
+        else:
+            hi = mid
+
+    if lo == 0:
+        _offset_minutes = _tz_before
+        _offset_from, _offset_until = -_FOREVER, t[0] if n > 0 else _FOREVER  # type: ignore
+    else:
+        _offset_minutes = _tz_off[lo - 1]  # type: ignore
+        _offset_from, _offset_until = t[lo - 1], t[lo] if lo < n else _FOREVER  # type: ignore
+
+
+def _rule_lookup(utc_secs: int) -> None:
+    """ the CET/CEST rule of get_offsethours() """
+    global _offset_minutes, _offset_from, _offset_until
+
+    year: int = gmtime(utc_secs)[0]  # type: ignore
+    start_secs: int = last_sunday(year=year, month=3, hour=1, minute=0)
+    stop_secs: int = last_sunday(year=year, month=10, hour=1, minute=0)
+
+    if utc_secs < start_secs:
+        _offset_minutes = 60
+        _offset_from, _offset_until = last_sunday(year=year - 1, month=10, hour=1, minute=0), start_secs
+    elif utc_secs < stop_secs:
+        _offset_minutes = 120
+        _offset_from, _offset_until = start_secs, stop_secs
+    else:
+        _offset_minutes = 60
+        _offset_from, _offset_until = stop_secs, last_sunday(year=year + 1, month=3, hour=1, minute=0)
+
+
+def utc_offset_minutes(utc_secs: int) -> int:
+    """ utc offset of the configured zone at utc_secs - from the timezone table if there is one """
+    if _offset_from <= utc_secs < _offset_until:
+        return _offset_minutes
+
+    if not _tz_tried:
+        load_tz_table()
+    if _tz_t is not None:
+        _tz_lookup(utc_secs)
+    else:
+        _rule_lookup(utc_secs)
+    return _offset_minutes
+
+
 def localtime(secs: int | None = None) -> tuple[int, int, int, int, int, int, int, int, int]:
-    """ last int: timeoffset """
+    """ last int: timeoffset in hours (see utc_offset_minutes() for zones with half hour offsets) """
     global CETTIMEOFFSETHOURS
 
-    utc_time_tuple = gmtime(secs)  # type: ignore
-    utc_secs = mktime(utc_time_tuple)  # type: ignore
+    utc_secs: int = int(secs) if secs is not None else time()  # type: ignore
 
-    mycettimeoffsethours = get_offsethours(utc_time_tuple[0], utc_secs)
+    offset_minutes: int = utc_offset_minutes(utc_secs)
+    mycettimeoffsethours: int = int(offset_minutes / 60)
 
     if not CETTIMEOFFSETHOURS or not HAD_PROPER_TIME_SET:
         CETTIMEOFFSETHOURS = mycettimeoffsethours
 
-    year, month, mday, hour, minute, second, weekday, yearday = gmtime(utc_secs + mycettimeoffsethours * 3600)  # type: ignore
+    year, month, mday, hour, minute, second, weekday, yearday = gmtime(utc_secs + offset_minutes * 60)  # type: ignore
 
     return year, month, mday, hour, minute, second, weekday, yearday, mycettimeoffsethours  # type: ignore
 
+
+# last formatted second (utc) and its iso string - and the "YYYY-MM-DDTHH:MM:" prefix of its minute, so within
+# the same minute only the seconds have to be formatted
+_iso_secs: int = -1
+_iso_str: str = ""
+_iso_minute: int = -1
+_iso_prefix: str = ""
+_iso_suffix: str = ""
+_iso_offset: int = 0
+
+
 def getisotime(timestamp_secs: float) -> str:
-    dd = localtime(timestamp_secs)  # type: ignore
-    offsethours: int = dd[-1]
-    return f"{dd[0]:02d}-{dd[1]:02d}-{dd[2]:02d}T{dd[3]:02d}:{dd[4]:02d}:{dd[5]:02d}+{offsethours:02d}:00"
+    global _iso_secs, _iso_str, _iso_minute, _iso_prefix, _iso_suffix, _iso_offset
+
+    secs: int = int(timestamp_secs)
+    if secs == _iso_secs:
+        return _iso_str
+
+    offset_minutes: int = utc_offset_minutes(secs)
+    local_secs: int = secs + offset_minutes * 60
+    minute: int = local_secs // 60
+    # (the same local minute comes twice when the clocks go back - with different offsets)
+    if minute != _iso_minute or offset_minutes != _iso_offset:
+        dd = gmtime(local_secs)  # type: ignore
+        _iso_prefix = f"{dd[0]:02d}-{dd[1]:02d}-{dd[2]:02d}T{dd[3]:02d}:{dd[4]:02d}:"
+        a: int = offset_minutes if offset_minutes >= 0 else -offset_minutes
+        _iso_suffix = f"{'+' if offset_minutes >= 0 else '-'}{a // 60:02d}:{a % 60:02d}"
+        _iso_minute = minute
+        _iso_offset = offset_minutes
+
+    _iso_str = _iso_prefix + "%02d" % (local_secs % 60) + _iso_suffix
+    _iso_secs = secs
+    return _iso_str
+
+
+# getisotimenow() reads the clock as ticks_ms() since an anchor (instead of mktime(gmtime())) - re-anchored
+# to the RTC every _ANCHOR_REFRESH_MS and whenever the time was set (set_had_proper_time_set)
+_ANCHOR_REFRESH_MS: int = 60_000
+_anchor_ticks: int = 0
+_anchor_ms: int = -1
+
+
+def _anchor() -> None:
+    global _anchor_ticks, _anchor_ms
+    _anchor_ticks = ticks_ms()  # type: ignore
+    try:
+        _anchor_ms = time_ns() // 1_000_000  # type: ignore
+    except NameError:
+        _anchor_ms = time() * 1000  # type: ignore
+
+
+def time_s() -> int:
+    """ time() from the ticks_ms anchor """
+    if _anchor_ms < 0:
+        _anchor()
+    elapsed: int = ticks_diff(ticks_ms(), _anchor_ticks)  # type: ignore
+    if elapsed > _ANCHOR_REFRESH_MS or elapsed < 0:
+        _anchor()
+        elapsed = 0
+    return (_anchor_ms + elapsed) // 1000
+
 
 def getisotimenow() -> str:
-    dd: float = mktime(gmtime())  # type: ignore
-    return getisotime(dd)
+    return getisotime(time_s())
 
 def set_had_proper_time_set(timesetproperly: bool = False) -> None:
     """ sets timesetproperly flag and also resets CETTIMEOFFSETHOURS
     in the next call to localtime() the CETTIMEOFFSETHOURS
     is re-calculated since it could be pre-calculated with wrong timeinfo...
     """
-    global HAD_PROPER_TIME_SET, CETTIMEOFFSETHOURS
+    global HAD_PROPER_TIME_SET, CETTIMEOFFSETHOURS, _anchor_ms
     HAD_PROPER_TIME_SET = timesetproperly
     CETTIMEOFFSETHOURS = None
+    _anchor_ms = -1
 
 def get_had_proper_time_set() -> bool:
     global HAD_PROPER_TIME_SET
@@ -0,0 +1,58 @@
+""" TLS for the mqtt connection - one SSLContext for all reconnects, handshake timing """
+
+import ssl
+
+try:
+    from time import ticks_ms, ticks_diff  # type: ignore
+except ImportError:
+    # "normal" python (scripts/bench_tls.py)
+    from time import perf_counter
+
+    def ticks_ms() -> int:
+        return int(perf_counter() * 1000)
+
+    def ticks_diff(a: int, b: int) -> int:
+        return a - b
+
+
+class TLSContext:
+    """ Passed as `ssl` to the umqtt client - which only calls wrap_socket(sock, server_hostname=...).
+
+        The SSLContext (CA bundle, optional client certificate) is created once - a reconnect does not parse
+        and load the certificates again. Every handshake is a full one: MicroPython's ssl (ESP32 port,
+        mbedtls) has no session resumption api.
+
+        Statistics: handshakes, last_handshake_ms.
+    """
+
+    def __init__(self, cafile: str | None = None, certfile: str | None = None, keyfile: str | None = None,
+                 server_hostname: str | None = None) -> None:
+        self.server_hostname: str | None = server_hostname
+
+        self._ctx: ssl.SSLContext = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        if cafile is not None:
+            self._ctx.load_verify_locations(cafile=cafile)
+            self._ctx.verify_mode = ssl.CERT_REQUIRED
+        else:
+            # encrypted, but the broker is not authenticated
+            if hasattr(self._ctx, "check_hostname"):
+                self._ctx.check_hostname = False
+            self._ctx.verify_mode = ssl.CERT_NONE
+        if certfile is not None:
+            self._ctx.load_cert_chain(certfile, keyfile)
+
+        self.handshakes: int = 0
+        self.last_handshake_ms: int = 0
+
+    def _wrap(self, sock, server_hostname: str | None):  # type: ignore
+        return self._ctx.wrap_socket(sock, server_hostname=server_hostname)
+
+    def wrap_socket(self, sock, server_hostname: str | None = None):  # type: ignore
+        if self.server_hostname is not None:
+            server_hostname = self.server_hostname
+
+        start: int = ticks_ms()
+        ssock = self._wrap(sock, server_hostname)
+        self.last_handshake_ms = ticks_diff(ticks_ms(), start)
+        self.handshakes += 1
+        return ssock
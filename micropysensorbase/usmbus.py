@@ -27,6 +27,13 @@ class SMBus():  # machine.I2C):
             bus = SMBus(id=0, scl=machine.Pin(15), sda=machine.Pin(10), freq=100000)
             bus.read_byte_data(addr, register)
             ... etc
+
+        byte/word access goes through per-bus preallocated scratch buffers and the debug output is
+        only formatted if debug logging is enabled, so register I/O does not allocate on the heap.
+        For blocks use the *_into variants with a buffer owned by the caller.
+
+        readfrom_mem_into() and writeto_mem() are passed through, so drivers written against
+        machine.I2C (ina219, veml7700) can be handed an SMBus as well.
     """
 
     __LOG_FORMAT = f"%(asctime)s - %(levelname)s -  %(name)-12s - %(message)s"
@@ -46,46 +53,73 @@ class SMBus():  # machine.I2C):
         self.logger: logging.Logger = logging.get_logger(__name__)
         self.logger.setLevel(log_level)
 
+        self._buf1: bytearray = bytearray(1)
+        self._buf2: bytearray = bytearray(2)
+
         #(0, scl=machine.Pin(22), sda = machine.Pin(21), freq = 400_000)
 
     def scan(self) -> list:
         return self.i2c.scan()
 
+    def readfrom_mem_into(self, addr: int, register: int, buf: bytearray | memoryview) -> None:
+        """ machine.I2C compatible passthrough """
+        self.i2c.readfrom_mem_into(addr, register, buf)
+
+
+    def writeto_mem(self, addr: int, register: int, buf: bytes | bytearray | memoryview) -> None:
+        """ machine.I2C compatible passthrough """
+        self.i2c.writeto_mem(addr, register, buf)
+
+
     def read_byte_data(self, addr: int, register: int) -> int:
         """ Read a single byte from register of device at addr
             Returns a single byte """
 
-        self.logger.debug(f"read_byte_data {addr=} {register=}")
+        if self.logger.is_enabled_for(logging.DEBUG):
+            self.logger.debug("read_byte_data addr=%d register=%d", addr, register)
 
-        return self.i2c.readfrom_mem(addr, register, 1)[0]
+        self.i2c.readfrom_mem_into(addr, register, self._buf1)
+        return self._buf1[0]
 
 
     def read_i2c_block_data(self, addr: int, register: int, length: int) -> bytes:
         """ Read a block of length from register of device at addr
             Returns a bytes object filled with whatever was read """
 
-        self.logger.debug(f"read_i2c_block_data {addr=} {register=} {length=}")
+        if self.logger.is_enabled_for(logging.DEBUG):
+            self.logger.debug("read_i2c_block_data addr=%d register=%d length=%d", addr, register, length)
 
         return self.i2c.readfrom_mem(addr, register, length)
 
 
+    def read_i2c_block_data_into(self, addr: int, register: int, buf: bytearray | memoryview) -> None:
+        """ Read len(buf) bytes from register of device at addr into buf
+            Returns None """
+
+        if self.logger.is_enabled_for(logging.DEBUG):
+            self.logger.debug("read_i2c_block_data_into addr=%d register=%d len(buf)=%d", addr, register, len(buf))
+
+        self.i2c.readfrom_mem_into(addr, register, buf)
+
+
     def write_byte_data(self, addr: int, register: int, data: int|bytes) -> None:
         """ Write a single byte from buffer `data` to register of device at addr
             Returns None """
 
         # writeto_mem() expects something it can treat as a buffer
         if isinstance(data, int):
-            data = bytes([data])
+            self._buf1[0] = data
+            data = self._buf1  # type: ignore
 
         return self.i2c.writeto_mem(addr, register, data)
 
 
-    def write_i2c_block_data(self, addr: int, register: int, data: bytes|list[int]) -> None:
+    def write_i2c_block_data(self, addr: int, register: int, data: bytes|bytearray|memoryview|list[int]) -> None:
         """ Write multiple bytes of data to register of device at addr
             Returns None """
 
         #writeto_mem() expects something it can treat as a buffer
-        if not isinstance(data, bytes):
+        if not isinstance(data, (bytes, bytearray, memoryview)):
             if not isinstance(data, list):
                 data = [data]
             data = bytes(data)
@@ -106,15 +140,25 @@ class SMBus():  # machine.I2C):
 
 
     def read_word_data(self, addr: int, register: int) -> int:
-        """ Not yet implemented """
+        """ Read a word (LSB first) from register of device at addr
+            Returns an int """
         # DEBUG:root:read_word_data args=(64, 2) kwargs={}
 
-        bs: bytes = self.i2c.readfrom_mem(addr, register, 2)
-        self.logger.debug(f"read_word_data::{addr=} {register=} {bs=}")
+        bs: bytearray = self._buf2
+        self.i2c.readfrom_mem_into(addr, register, bs)
 
-        return int.from_bytes(bs, 'little')
+        if self.logger.is_enabled_for(logging.DEBUG):
+            self.logger.debug("read_word_data::addr=%d register=%d bs=%r", addr, register, bs)
 
+        return bs[0] | (bs[1] << 8)
 
-    def write_word_data(self, *args: list[object]|None, **kwargs: dict[str, object]|None) -> None:
-        """ Not yet implemented """
-        raise RuntimeError("Not yet implemented")
+
+    def write_word_data(self, addr: int, register: int, value: int) -> None:
+        """ Write a word (LSB first) to register of device at addr
+            Returns None """
+
+        bs: bytearray = self._buf2
+        bs[0] = value & 0xFF
+        bs[1] = (value >> 8) & 0xFF
+
+        return self.i2c.writeto_mem(addr, register, bs)
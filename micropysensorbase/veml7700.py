@@ -65,6 +65,7 @@
 # THE SOFTWARE.
 
 from machine import I2C, SoftI2C
+from .usmbus import SMBus
 from . import time
 from micropython import const
 
@@ -120,12 +121,13 @@ class VEML7700:
 
     def __init__(self,
                  address: int =addr,
-                 i2c: I2C | SoftI2C | None = None,
+                 i2c: I2C | SoftI2C | SMBus | None = None,
                  it: int=25,
                  gain: float=1/8,
                  **kwargs: object):
 
         self.lux: float = 0.0
+        self._buf: bytearray = bytearray(2)
 
         self.address = address
         if i2c is None:
@@ -174,7 +176,7 @@ class VEML7700:
         # Reading at a faster frequency will not cause an error, but
         # will result in reading the previous data
 
-        mr: bytearray = bytearray(2)
+        mr: bytearray = self._buf
 
         time.sleep(.04)  # type: ignore[attr-defined] # 40ms
 
@@ -30,6 +30,10 @@ else:
 
 boot_ssd_enabled: bool = False
 
+# in-place reconnect (jittered exponential backoff) instead of reset - see backoff.py
+from .backoff import Backoff
+reconnect_backoff: Backoff | None = Backoff.from_config("wifi")
+
 if "boot_ssd" in config.data and config.get_config_data_bool(config.data, "boot_ssd"):
     try:
         import boot_ssd
@@ -160,16 +164,80 @@ def ensure_wifi(watchdog: machine.WDT|None = None) -> tuple|None:
                 else:
                     time.sleep(1)  # type: ignore[attr-defined]
             else:
-                logger.info("disonnecting WIFI")
+                logger.info("disconnecting WIFI")
                 wlan.disconnect()
 
     return ret
 
-def ensure_wifi_catch_reset(reset_if_wifi_fails: bool = True, watchdog: machine.WDT|None = None) -> tuple:
+# non-blocking (re)connect - see connect_step
+_connecting_idx: int = -1  # index in wlan_scanlist of the network being connected to - -1: no attempt in progress
+_connecting_ticks: int = 0
+
+def connect_step() -> tuple|None:
+    """ one non-blocking step of a (re)connect attempt: wlan.connect() to a configured network and return - the
+        following calls check wlan.isconnected() until its "retries" seconds passed, then the next configured
+        network is tried. no wlan.scan() (blocks for seconds) - the driver picks the bssid itself.
+        returns the ifconfig once connected, None while the attempt is in progress - raises if all configured
+        networks failed (the next call starts a new attempt) """
+    global _connecting_idx, _connecting_ticks
+
+    if wlan.isconnected():
+        if _connecting_idx >= 0:
+            _connecting_idx = -1
+            logger.info("network config: wlan.ifconfig()=%s", wlan.ifconfig())
+        return wlan.ifconfig()
+
+    if _connecting_idx >= 0:
+        w: str = wlan_scanlist[_connecting_idx]
+        retries: int = config.get_config_data_int(config.get_config_data_dict(config.data, w), "retries")
+        if time.ticks_diff(time.ticks_ms(), _connecting_ticks) < retries * 1000:  # type: ignore[attr-defined]
+            return None
+
+        logger.info("disconnecting WIFI")
+        wlan.disconnect()
+
+    # next configured network
+    _connecting_idx += 1
+    while _connecting_idx < len(wlan_scanlist) and wlan_scanlist[_connecting_idx] not in config.data:
+        _connecting_idx += 1
+
+    if _connecting_idx >= len(wlan_scanlist):
+        _connecting_idx = -1
+        raise Exception("WIFI FAILED")
+
+    wifi_config: dict = config.get_config_data_dict(config.data, wlan_scanlist[_connecting_idx])
+    apssid: str = config.get_config_data_str(wifi_config, "SSID")
+    logger.info("connecting to network %s (non-blocking)...", apssid)
+
+    wlan.connect(apssid, config.get_config_data_str(wifi_config, "password"))
+    _connecting_ticks = time.ticks_ms()  # type: ignore[attr-defined]
+
+    return None
+
+def ensure_wifi_catch_reset(reset_if_wifi_fails: bool = True, watchdog: machine.WDT|None = None, blocking: bool = True) -> tuple|None:
+    """ returns the ifconfig - None if not connected (yet).
+        blocking=False: never waits for the connection - see connect_step.
+        with in-place reconnect (see reconnect_backoff) reset_if_wifi_fails and blocking are ignored: the
+        reconnect is always non-blocking, a new attempt is only started once the backoff delay passed - the
+        device is only reset if the failure budget is exhausted """
+    if reconnect_backoff is not None:
+        if not wlan.isconnected() and _connecting_idx < 0 and not reconnect_backoff.ready():
+            return None
+        blocking = False
+
     try:
-        ret: tuple|None = ensure_wifi(watchdog=watchdog)
-        if ret is None:
-            raise Exception("WIFI FAILED")
+        ret: tuple|None
+        if not blocking:
+            ret = connect_step()
+            if ret is None:
+                return None
+        else:
+            ret = ensure_wifi(watchdog=watchdog)
+            if ret is None:
+                raise Exception("WIFI FAILED")
+        if reconnect_backoff is not None and reconnect_backoff.failures > 0:
+            logger.info("wifi: reconnected after %d failures", reconnect_backoff.failures)
+            reconnect_backoff.succeeded()
         return ret
     except Exception as ex:
         _timestring = time.getisotimenow()
@@ -180,14 +248,20 @@ def ensure_wifi_catch_reset(reset_if_wifi_fails: bool = True, watchdog: machine.
 
         logger.error(_out.getvalue())
 
-        if reset_if_wifi_fails:
+        if reconnect_backoff is not None:
+            if reconnect_backoff.failed():
+                logger.error("wifi: %d failures in a row - failure budget exhausted - RESETTING", reconnect_backoff.failures)
+                time.sleep(1)  # type: ignore[attr-defined]
+                machine.reset()
+            logger.info("wifi: next attempt in <= %.1fs", reconnect_backoff.delay_s())
+        elif reset_if_wifi_fails and blocking:
             logger.info("RESETTING... in 60s")
             if watchdog:
                 logger.info("\tor earlier if watchdog kicks in...")
             time.sleep(60)  # type: ignore[attr-defined]
             machine.reset()
 
-    return None, None, None, None, None
+    return None
 
 def start_web_repl() -> None:
     import webrepl
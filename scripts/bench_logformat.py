@@ -0,0 +1,108 @@
+# runs in "normal" python and on the device - e.g.
+#   python scripts/bench_logformat.py
+#   mpremote run scripts/bench_logformat.py
+#
+# compares the previous record formatting (strftime walking the format per call, %-dict per record) with the
+# compiled strftime plans and the precompiled Formatter template
+import io
+import sys
+
+try:
+    from micropysensorbase import logging, time
+except ImportError:
+    sys.path.insert(0, __file__.rsplit("/", 2)[0] if "/" in __file__ else "..")
+    from micropysensorbase import logging, time
+
+N: int = 20_000 if sys.implementation.name != "micropython" else 2_000
+
+DATEFMT: str = "%Y-%m-%d %H:%M:%S"
+TS: tuple = (2025, 11, 30, 12, 34, 56, 6, 334)
+
+
+def old_strftime(datefmt: str, ts: tuple) -> str:
+    fmtsp: bool = False
+    ftime: io.StringIO = io.StringIO()
+    for k in datefmt:
+        if fmtsp:
+            if k == "d":
+                ftime.write("%02d" % ts[2])
+            elif k == "H":
+                ftime.write("%02d" % ts[3])
+            elif k == "m":
+                ftime.write("%02d" % ts[1])
+            elif k == "M":
+                ftime.write("%02d" % ts[4])
+            elif k == "S":
+                ftime.write("%02d" % ts[5])
+            elif k == "Y":
+                ftime.write(str(ts[0]))
+            else:
+                ftime.write(k)
+            fmtsp = False
+        elif k == "%":
+            fmtsp = True
+        else:
+            ftime.write(k)
+    val = ftime.getvalue()
+    ftime.close()
+    return val
+
+
+class OldFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        if "asctime" in self.fmt:
+            record.asctime = old_strftime(self.datefmt, TS)
+        return self.fmt % {
+            "name": record.name,
+            "message": record.message,
+            "msecs": record.msecs,
+            "asctime": record.asctime,
+            "levelname": record.levelname,
+        }
+
+
+class NewFormatter(logging.Formatter):
+    def format_time(self, datefmt: str, record: logging.LogRecord) -> str:
+        # as Formatter.format_time - with a fixed time tuple (localtime() needs the device's mktime)
+        secs: int = int(record.ct)
+        if secs != self._asctime_secs:
+            self._asctime = time.strftime(datefmt, TS)
+            self._asctime_secs = secs
+        return self._asctime  # type: ignore
+
+
+def ticks_us() -> int:
+    if sys.implementation.name == "micropython":
+        import time as _time
+        return _time.ticks_us()  # type: ignore
+    import time as _time
+    return int(_time.perf_counter() * 1_000_000)
+
+
+def bench(fn, *args) -> float:  # type: ignore
+    fn(*args)
+    start: int = ticks_us()
+    for _ in range(N):
+        fn(*args)
+    return (ticks_us() - start) / N
+
+
+def main() -> None:
+    assert old_strftime(DATEFMT, TS) == time.strftime(DATEFMT, TS)
+    t_old: float = bench(old_strftime, DATEFMT, TS)
+    t_new: float = bench(time.strftime, DATEFMT, TS)
+    print(f"strftime   old {t_old:8.2f} us   compiled {t_new:8.2f} us   x{t_old / t_new:.1f}")
+
+    fmt: str = "%(asctime)s.%(msecs)03d %(levelname)-8s %(name)s: %(message)s"
+    record: logging.LogRecord = logging.LogRecord()
+    record.set("bench", logging.DEBUG, "read_word_data::addr=64 register=2")
+    old: OldFormatter = OldFormatter(fmt)
+    new: NewFormatter = NewFormatter(fmt)
+    assert old.format(record) == new.format(record), (old.format(record), new.format(record))
+    t_old = bench(old.format, record)
+    t_new = bench(new.format, record)
+    print(f"format     old {t_old:8.2f} us   compiled {t_new:8.2f} us   x{t_old / t_new:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# runs in "normal" python (tracemalloc) and on the device (gc.mem_alloc) - e.g.
+#   python scripts/bench_logging.py
+#   mpremote run scripts/bench_logging.py
+#
+# compares the bytes allocated per measurement cycle by the logging calls of the hot path with the level set to
+# INFO (so all debug calls are disabled): eager f-strings vs. deferred %-style args
+import gc
+import sys
+
+try:
+    from micropysensorbase import logging
+except ImportError:
+    sys.path.insert(0, __file__.rsplit("/", 2)[0] if "/" in __file__ else "..")
+    from micropysensorbase import logging
+
+CYCLES: int = 1000
+
+logging.get_logger().setLevel(logging.INFO)
+logging.get_logger().handlers = []  # nothing written - only the cost of the calls is measured
+logger = logging.get_logger(__name__)
+
+data: dict = {"current": 12.345, "busvoltage": 12.01, "sensor": "ina", "stats": {"min": 1, "max": 2}}
+name: str = "ina"
+addr: int = 0x40
+register: int = 2
+
+
+def cycle_eager() -> None:
+    logger.debug(f"read_word_data::{addr=} {register=}")
+    logger.debug(f"measurements.py::measure_masked_arg: {True=} {False=} ")
+    logger.debug(f"DummyLock::{name}.enter")
+    logger.debug(f"config.py::get_config_data_dict({name=}) from {data}")
+    logger.debug(f"publish_one {name=} {len(data)=} {0=}")
+
+
+def cycle_deferred() -> None:
+    logger.debug("read_word_data::addr=%d register=%d", addr, register)
+    logger.debug("measurements.py::measure_masked_arg: send_data_forced=%r send_data_enabled=%r", True, False)
+    logger.debug("DummyLock::%s.enter", name)
+    logger.debug("config.py::get_config_data_dict(name=%r) from %s", name, data)
+    logger.debug("publish_one topic=%r len(msg)=%d qos=%d", name, len(data), 0)
+
+
+def measure(fn) -> int:  # type: ignore
+    fn()  # warm up (caches, interned strings)
+    if sys.implementation.name == "micropython":
+        gc.collect()
+        before: int = gc.mem_alloc()  # type: ignore
+        gc.disable()
+        for _ in range(CYCLES):
+            fn()
+        after: int = gc.mem_alloc()  # type: ignore
+        gc.enable()
+        return (after - before) // CYCLES
+
+    # CPython frees the temporary strings right away - so the peak of a single cycle is what gets allocated
+    import tracemalloc
+    tracemalloc.start()
+    peak_max: int = 0
+    for _ in range(CYCLES):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_max = max(peak_max, peak - base)
+    tracemalloc.stop()
+    return peak_max
+
+
+def main() -> None:
+    for label, fn in (("eager f-string", cycle_eager), ("deferred args", cycle_deferred)):
+        print(f"{label:16s}: {measure(fn):6d} bytes/cycle (debug disabled, {CYCLES} cycles)")
+
+
+main()
@@ -0,0 +1,63 @@
+# runs in "normal" python and on the device - e.g.
+#   python scripts/bench_payload.py
+#   mpremote run scripts/bench_payload.py
+#
+# compares the old value_to_mqtt_string (dict copy + json.dumps per message) with payload.PayloadEncoder - without
+# and with a fixed float precision (the per-feed "payload_float_precision" of the mosquitto section)
+import json
+import sys
+
+try:
+    from micropysensorbase.payload import PayloadEncoder
+except ImportError:
+    sys.path.insert(0, __file__.rsplit("/", 2)[0] if "/" in __file__ else "..")
+    from micropysensorbase.payload import PayloadEncoder
+
+N: int = 20_000 if sys.implementation.name != "micropython" else 2_000
+
+base: dict = {"lat": 12.345168, "lon": 9.876543, "ele": 6.789}
+created_at: str = "2025-11-30T12:34:56+01:00"
+values: tuple = (
+    ("float", 123.45678901234),
+    ("dict", {"current": 12.345678, "busvoltage": 12.0123456, "shuntvoltage": 0.0123, "supplyvoltage": 12.0246, "power": 148.2}),
+)
+
+
+def old_style(value: object) -> str:
+    d: dict = base.copy()
+    d["created_at"] = created_at
+    d["value"] = value
+    return json.dumps(d)
+
+
+def ticks_us() -> int:
+    if sys.implementation.name == "micropython":
+        import time
+        return time.ticks_us()  # type: ignore
+    import time
+    return int(time.perf_counter() * 1_000_000)
+
+
+def bench(fn, value: object) -> float:  # type: ignore
+    start: int = ticks_us()
+    for _ in range(N):
+        fn(value, created_at) if fn is not old_style else fn(value)
+    return (ticks_us() - start) / N
+
+
+def main() -> None:
+    enc: PayloadEncoder = PayloadEncoder(base=base)
+
+    # old: the json str (published as is) - new: the view into the reused buffer (published as is)
+    for label, value in values:
+        t_old: float = bench(old_style, value)
+        for precision in (None, 3):
+            t_new: float = bench(lambda v, c: enc.encode(v, c, precision), value)
+            print(f"{label:6s} precision={precision!s:4s}: json.dumps {t_old:8.2f} us  PayloadEncoder {t_new:8.2f} us  "
+                  f"speedup {t_old / t_new:5.2f}x")
+        print(f"        {old_style(value)}")
+        print(f"        {enc.encode_str(value, created_at)}")
+        print(f"        {enc.encode_str(value, created_at, 3)}")
+
+
+main()
@@ -0,0 +1,119 @@
+# runs in "normal" python (needs the openssl cli for the throw-away certificate) - e.g.
+#   python scripts/bench_tls.py
+#
+# local TLS broker stand-in (answers CONNECT with CONNACK) - connects N times with a new SSLContext per
+# connect (as before tls.TLSContext), through tls.TLSContext (SSLContext reused) and - for comparison only -
+# with TLS session resumption on top, which CPython's ssl supports but the device's (MicroPython) does not
+import os
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+
+try:
+    from micropysensorbase.tls import TLSContext
+except ImportError:
+    sys.path.insert(0, __file__.rsplit("/", 2)[0] if "/" in __file__ else "..")
+    from micropysensorbase.tls import TLSContext
+
+N: int = 20
+
+# minimal MQTT 3.1.1 CONNECT (client id "bench", clean session)
+CONNECT: bytes = b"\x10\x11\x00\x04MQTT\x04\x02\x00\x3c\x00\x05bench"
+
+
+def make_cert(d: str) -> tuple[str, str]:
+    cert: str = os.path.join(d, "cert.pem")
+    key: str = os.path.join(d, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1", "-nodes",
+         "-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost"],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+def broker(srv: socket.socket, ctx: ssl.SSLContext) -> None:
+    while True:
+        conn, _ = srv.accept()
+        try:
+            with ctx.wrap_socket(conn, server_side=True) as s:
+                s.recv(len(CONNECT))
+                s.sendall(b"\x20\x02\x00\x00")  # CONNACK
+                s.recv(2)  # DISCONNECT / close
+        except (OSError, ssl.SSLError):
+            pass
+
+
+class NewContextEachTime(TLSContext):
+    """ a new SSLContext (CA loaded again) for every handshake """
+
+    def __init__(self, cafile: str) -> None:
+        super().__init__(cafile=cafile)
+        self._cafile: str = cafile
+
+    def _wrap(self, sock, server_hostname):  # type: ignore
+        ctx: ssl.SSLContext = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        ctx.load_verify_locations(cafile=self._cafile)
+        return ctx.wrap_socket(sock, server_hostname=server_hostname)
+
+
+class ResumingTLSContext(TLSContext):
+    """ CPython only - offers the session of the last connection on the next handshake """
+
+    def __init__(self, cafile: str) -> None:
+        super().__init__(cafile=cafile)
+        self._session: ssl.SSLSession | None = None
+        self.resumed: int = 0
+
+    def _wrap(self, sock, server_hostname):  # type: ignore
+        ssock = self._ctx.wrap_socket(sock, server_hostname=server_hostname, session=self._session)
+        if ssock.session_reused:
+            self.resumed += 1
+        return ssock
+
+    def remember_session(self, ssock: ssl.SSLSocket) -> None:
+        # with TLS 1.3 the ticket only arrives after the handshake - i.e. once something was read
+        self._session = ssock.session
+
+
+def connect_once(port: int, tls: TLSContext) -> int:
+    sock: socket.socket = socket.create_connection(("127.0.0.1", port))
+    ssock = tls.wrap_socket(sock, server_hostname="localhost")
+    ssock.sendall(CONNECT)
+    assert ssock.recv(4) == b"\x20\x02\x00\x00"
+    if isinstance(tls, ResumingTLSContext):
+        tls.remember_session(ssock)
+    ssock.sendall(b"\xe0\x00")  # DISCONNECT
+    ssock.close()
+    return tls.last_handshake_ms
+
+
+def run(port: int, label: str, tls: TLSContext) -> None:
+    times: list[int] = [connect_once(port, tls) for _ in range(N)]
+    extra: str = f"  resumed={tls.resumed}/{tls.handshakes}" if isinstance(tls, ResumingTLSContext) else ""
+    print(f"{label:28s} first={times[0]:3d} ms  avg(reconnects)={sum(times[1:]) / (N - 1):6.2f} ms{extra}")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as d:
+        cert, key = make_cert(d)
+        sctx: ssl.SSLContext = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        sctx.load_cert_chain(cert, key)
+
+        srv: socket.socket = socket.socket()
+        srv.bind(("127.0.0.1", 0))
+        srv.listen(4)
+        threading.Thread(target=broker, args=(srv, sctx), daemon=True).start()
+
+        port: int = srv.getsockname()[1]
+        run(port, "new SSLContext per connect", NewContextEachTime(cert))
+        run(port, "TLSContext", TLSContext(cafile=cert))
+        run(port, "TLSContext + resumption", ResumingTLSContext(cert))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# this is NOT to be run in micropython - generates the timezone table for time.load_tz_table() on the host, e.g.
+#   python scripts/gen_tztable.py Europe/Berlin -o tz.bin
+#   python scripts/gen_tztable.py Asia/Kolkata --from-year 2025 --years 30 -o tz.bin
+#   mpremote cp tz.bin :/tz.bin
+#
+# file format (little endian):
+#   4s      b"TZT1"
+#   H       n: number of transitions
+#   h       utc offset in minutes before the first transition
+#   I * n   transitions as unix epoch seconds (utc), ascending
+#   h * n   utc offset in minutes from the transition on
+import argparse
+import datetime
+import struct
+import sys
+import zoneinfo
+
+MAGIC: bytes = b"TZT1"
+
+
+def _offset_minutes(tz: zoneinfo.ZoneInfo, epoch: int) -> int:
+    off: datetime.timedelta | None = datetime.datetime.fromtimestamp(epoch, tz).utcoffset()
+    assert off is not None
+    return int(off.total_seconds()) // 60
+
+
+def transitions(zone: str, from_year: int, years: int) -> tuple[int, list[tuple[int, int]]]:
+    """ (offset before the first transition, [(utc epoch, offset from then on), ...]) """
+    tz: zoneinfo.ZoneInfo = zoneinfo.ZoneInfo(zone)
+    start: int = int(datetime.datetime(from_year, 1, 1, tzinfo=datetime.timezone.utc).timestamp())
+    end: int = int(datetime.datetime(from_year + years, 1, 1, tzinfo=datetime.timezone.utc).timestamp())
+
+    first: int = _offset_minutes(tz, start)
+    ret: list[tuple[int, int]] = []
+    prev: int = first
+    t: int = start
+    while t < end:
+        nxt: int = t + 3600
+        off: int = _offset_minutes(tz, nxt)
+        if off != prev:
+            # the transition is in (t, nxt] - find the exact second
+            lo, hi = t, nxt
+            while hi - lo > 1:
+                mid: int = (lo + hi) // 2
+                if _offset_minutes(tz, mid) == prev:
+                    lo = mid
+                else:
+                    hi = mid
+            ret.append((hi, off))
+            prev = off
+        t = nxt
+    return first, ret
+
+
+def encode(first: int, trans: list[tuple[int, int]]) -> bytes:
+    n: int = len(trans)
+    return (
+        struct.pack("<4sHh", MAGIC, n, first)
+        + struct.pack(f"<{n}I", *[t for t, _ in trans])
+        + struct.pack(f"<{n}h", *[o for _, o in trans])
+    )
+
+
+def main() -> None:
+    p: argparse.ArgumentParser = argparse.ArgumentParser(description="precomputed timezone transition table for the device")
+    p.add_argument("zone", help="IANA zone name, e.g. Europe/Berlin")
+    p.add_argument("--from-year", type=int, default=datetime.date.today().year)
+    p.add_argument("--years", type=int, default=20)
+    p.add_argument("-o", "--output", default="tz.bin")
+    args = p.parse_args()
+
+    first, trans = transitions(args.zone, args.from_year, args.years)
+    data: bytes = encode(first, trans)
+    with open(args.output, "wb") as f:
+        f.write(data)
+
+    print(f"{args.zone}: {len(trans)} transitions {args.from_year}..{args.from_year + args.years - 1}, "
+          f"offset before: {first:+d} min -> {args.output} ({len(data)} bytes)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
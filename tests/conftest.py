@@ -1,8 +1,20 @@
+import sys
+import types
+
 import pytest
 
 
 print("Conftest... initializing fixture...")
 
+# micropysensorbase.config needs the device on import (network, sys.print_exception, micropython's mktime) -
+# the modules under test only use config.data and its getters
+if "micropysensorbase.config" not in sys.modules:
+    config = types.ModuleType("micropysensorbase.config")
+    config.data = {}  # type: ignore[attr-defined]
+    for _getter in ("str", "int", "float", "bool", "dict"):
+        setattr(config, f"get_config_data_{_getter}", lambda _data, name: _data[name])
+    sys.modules["micropysensorbase.config"] = config
+
 # @pytest.fixture()
 # def client() -> TestClient:
 #     return TestClient(app)
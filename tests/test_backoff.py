@@ -0,0 +1,56 @@
+import pytest
+
+from micropysensorbase import time
+from micropysensorbase.backoff import Backoff
+
+
+@pytest.fixture()
+def ticks(monkeypatch) -> list[int]:
+    # the micropython ticks api on top of a settable clock
+    now: list[int] = [0]
+    monkeypatch.setattr(time, "ticks_ms", lambda: now[0], raising=False)
+    monkeypatch.setattr(time, "ticks_add", lambda a, b: a + b, raising=False)
+    monkeypatch.setattr(time, "ticks_diff", lambda a, b: a - b, raising=False)
+    return now
+
+
+def test_exponential_delay_capped() -> None:
+    b: Backoff = Backoff("test", base_s=1.0, max_s=5.0)
+    assert b.delay_s() == 0.0
+    delays: list[float] = []
+    for _ in range(5):
+        b.failures += 1
+        delays.append(b.delay_s())
+    assert delays == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+
+def test_ready_after_delay(ticks: list[int]) -> None:
+    b: Backoff = Backoff("test", base_s=2.0, jitter=0.0)
+    assert b.ready()
+
+    assert not b.failed()
+    assert not b.ready()
+    ticks[0] = 1_999
+    assert not b.ready()
+    ticks[0] = 2_000
+    assert b.ready()
+
+    b.succeeded()
+    assert b.failures == 0 and b.ready()
+
+
+def test_jitter_only_shortens(ticks: list[int]) -> None:
+    b: Backoff = Backoff("test", base_s=10.0, jitter=0.5)
+    b.failed()
+    ticks[0] = 4_999
+    assert not b.ready()
+    ticks[0] = 10_000
+    assert b.ready()
+
+
+def test_failure_budget(ticks: list[int]) -> None:
+    b: Backoff = Backoff("test", failure_budget=3)
+    assert [b.failed() for _ in range(4)] == [False, False, False, True]
+
+    unlimited: Backoff = Backoff("test", failure_budget=0)
+    assert not any(unlimited.failed() for _ in range(50))
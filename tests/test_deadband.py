@@ -0,0 +1,58 @@
+from micropysensorbase.deadband import Deadband
+
+
+def test_first_value_is_sent() -> None:
+    db: Deadband = Deadband("mafeed", abs_threshold=1.0)
+    assert db.check(10.0, now=0)
+    assert not db.check(10.0, now=0, silence_enabled=False)
+
+
+def test_abs_threshold() -> None:
+    db: Deadband = Deadband("mafeed", abs_threshold=1.0)
+    db.commit(10.0, now=0)
+
+    assert not db.check(10.9, now=1)
+    assert db.check(11.1, now=1)
+    assert db.triggered
+
+
+def test_rel_threshold_capped() -> None:
+    db: Deadband = Deadband("mafeed", rel_threshold=0.1, rel_cap=2.0)
+    db.commit(100.0, now=0)
+
+    # 10% of 100 would be 10 - capped to 2
+    assert db.threshold(100.0, 0) == 2.0
+    assert db.check(102.5, now=1)
+
+    db.commit(10.0, now=1)
+    assert not db.check(10.9, now=2)
+    assert db.check(11.1, now=2)
+
+
+def test_hysteresis_on_direction_change() -> None:
+    db: Deadband = Deadband("mafeed", abs_threshold=1.0, hysteresis=0.5)
+    db.commit(10.0, now=0)
+    db.commit(12.0, now=1)  # last change: up
+
+    # going on up: plain threshold
+    assert db.check(13.2, now=2)
+    # turning back down: threshold + hysteresis
+    assert not db.check(10.7, now=2)
+    assert db.check(10.4, now=2)
+
+
+def test_min_interval() -> None:
+    db: Deadband = Deadband("mafeed", abs_threshold=1.0, min_interval_s=10)
+    db.commit(10.0, now=0)
+
+    assert not db.check(50.0, now=5)
+    assert db.check(50.0, now=10)
+
+
+def test_max_silence() -> None:
+    db: Deadband = Deadband("mafeed", abs_threshold=1.0, max_silence_s=60)
+    db.commit(10.0, now=0)
+
+    assert not db.check(10.0, now=60)
+    assert db.check(10.0, now=61)
+    assert not db.check(10.0, now=61, silence_enabled=False)
@@ -0,0 +1,101 @@
+import os
+
+from micropysensorbase.outqueue import OutQueue
+
+
+def _drain(q: OutQueue) -> list:
+    ret: list = []
+    while True:
+        entry = q.peek()
+        if entry is None:
+            return ret
+        ret.append(entry)
+        q.pop()
+
+
+def test_ram_fifo(tmp_path) -> None:
+    q: OutQueue = OutQueue(ram_entries=4, path=str(tmp_path / "oq.seg"))
+    for i in range(3):
+        q.put("t", f"m{i}", 1, True)
+
+    assert len(q) == 3
+    assert [e[1] for e in _drain(q)] == ["m0", "m1", "m2"]
+    assert not os.path.exists(tmp_path / "oq.seg")
+
+
+def test_spill_keeps_order(tmp_path) -> None:
+    q: OutQueue = OutQueue(ram_entries=2, path=str(tmp_path / "oq.seg"))
+    for i in range(5):
+        q.put("t", f"m{i}", 1, True)
+
+    assert len(q) == 5
+    assert os.path.exists(tmp_path / "oq.seg")
+    assert [e[1] for e in _drain(q)] == ["m0", "m1", "m2", "m3", "m4"]
+
+    q.commit()
+    assert not os.path.exists(tmp_path / "oq.seg")
+
+
+def test_restore_after_reboot(tmp_path) -> None:
+    path: str = str(tmp_path / "oq.seg")
+    q: OutQueue = OutQueue(ram_entries=1, path=path)
+    for i in range(4):
+        q.put(b"t", f"m{i}", 1, False)
+
+    # m0..m2 on flash - send one and commit the read position
+    q.pop()
+    q.commit()
+
+    restored: OutQueue = OutQueue(ram_entries=1, path=path)
+    assert len(restored) == 2
+    assert _drain(restored) == [("t", "m1", 1, False), ("t", "m2", 1, False)]
+
+
+def test_uncommitted_pops_are_sent_again(tmp_path) -> None:
+    path: str = str(tmp_path / "oq.seg")
+    q: OutQueue = OutQueue(ram_entries=1, path=path)
+    for i in range(3):
+        q.put("t", f"m{i}", 1, True)
+
+    # all spilled entries popped (published) - but not acknowledged/committed before the reset
+    q.pop()
+    q.pop()
+
+    restored: OutQueue = OutQueue(ram_entries=1, path=path)
+    assert [e[1] for e in _drain(restored)] == ["m0", "m1"]
+
+
+def test_binary_message_base64_roundtrip(tmp_path) -> None:
+    path: str = str(tmp_path / "oq.seg")
+    msg: bytes = bytes(range(256))
+    q: OutQueue = OutQueue(ram_entries=1, path=path)
+    q.put("t", msg, 1, True)
+    q.put("t", "json", 1, True)
+
+    restored: OutQueue = OutQueue(ram_entries=1, path=path)
+    assert restored.peek() == ("t", msg, 1, True)
+
+
+def test_offset_points_into_the_file(tmp_path) -> None:
+    path: str = str(tmp_path / "oq.seg")
+    q: OutQueue = OutQueue(ram_entries=1, path=path)
+    for i in range(4):
+        q.put("t", f"m{i}", 1, True)
+    q.pop()
+    q.pop()
+    q.commit()
+
+    with open(path + ".off") as f:
+        offset: int = int(f.read())
+    with open(path, "rb") as f:
+        f.seek(offset)
+        assert b'"m2"' in f.readline()
+
+
+def test_full_file_drops(tmp_path) -> None:
+    q: OutQueue = OutQueue(ram_entries=1, path=str(tmp_path / "oq.seg"), max_file_bytes=40)
+    for i in range(4):
+        q.put("t", f"m{i}", 1, True)
+
+    assert q.dropped > 0
+    assert len(q) == 4 - q.dropped
@@ -0,0 +1,106 @@
+import json
+import math
+
+from micropysensorbase import payload, payload_decode
+from micropysensorbase.batch import Batch
+from micropysensorbase.payload import PayloadEncoder
+
+BASE: dict = {"lat": 12.345168, "lon": 9.876543, "ele": 6.789}
+CREATED_AT: str = "2025-11-30T12:34:56+01:00"
+INADATA: dict = {"current": 12.345678, "busvoltage": 12.0123456, "shuntvoltage": 0.0123, "supplyvoltage": 12.0246, "power": 148.2}
+
+
+def _old_style(value: object) -> str:
+    d: dict = BASE.copy()
+    d["created_at"] = CREATED_AT
+    d["value"] = value
+    return json.dumps(d)
+
+
+def test_default_is_json_dumps() -> None:
+    enc: PayloadEncoder = PayloadEncoder(base=BASE)
+    for value in (123.45678901234, 7, "text", INADATA):
+        assert bytes(enc.encode(value, CREATED_AT)) == _old_style(value).encode()
+        assert enc.encode_str(value, CREATED_AT) == _old_style(value)
+
+
+def test_precision() -> None:
+    enc: PayloadEncoder = PayloadEncoder(base=BASE)
+    msg: dict = json.loads(bytes(enc.encode({"a": 1.23456, "b": [0.0001, 2], "c": "x"}, CREATED_AT, 3)))
+    assert msg["value"] == {"a": 1.235, "b": [0.0, 2], "c": "x"}
+    assert msg["created_at"] == CREATED_AT
+    assert msg["lat"] == BASE["lat"]
+
+    assert json.loads(enc.encode_str(12.3456, CREATED_AT, 1))["value"] == 12.3
+
+
+def test_precision_nan_inf_as_null() -> None:
+    enc: PayloadEncoder = PayloadEncoder(base=BASE)
+    msg: dict = json.loads(enc.encode_str({"a": math.nan, "b": math.inf, "c": -math.inf}, CREATED_AT, 2))
+    assert msg["value"] == {"a": None, "b": None, "c": None}
+
+
+def test_buffer_is_reused_and_grows() -> None:
+    enc: PayloadEncoder = PayloadEncoder(base=BASE, size=16)
+    first: memoryview = enc.encode(1.5, CREATED_AT)
+    assert bytes(first) == _old_style(1.5).encode()
+
+    big: list = list(range(200))
+    assert bytes(enc.encode(big, CREATED_AT)) == _old_style(big).encode()
+    # a view is only valid until the next encode()
+    assert bytes(enc.encode(2.5, CREATED_AT)) == _old_style(2.5).encode()
+
+
+def test_pack_roundtrip() -> None:
+    for value in (12.5, INADATA, {"temperature": 21.5, "humidity": 40.25, "measure_device_name": "dht22"}):
+        packed: bytes | None = payload.pack(value, 1_000_000, 60, BASE)
+        assert packed is not None
+        assert payload_decode.is_packed(packed)
+
+        decoded: dict = payload_decode.decode(packed)
+        assert decoded["created_at"].endswith("+01:00")
+        assert math.isclose(decoded["lat"], BASE["lat"], rel_tol=1e-6)
+        if isinstance(value, dict):
+            for k in value:
+                if isinstance(value[k], float):
+                    assert math.isclose(decoded["value"][k], value[k], rel_tol=1e-6)
+                else:
+                    assert decoded["value"][k] == value[k]
+        else:
+            assert decoded["value"] == value
+
+
+def test_pack_without_schema() -> None:
+    assert payload.find_schema({"unknown": 1.0}) == 0
+    assert payload.pack({"unknown": 1.0}, 0, 0, BASE) is None
+    assert payload_decode.decode_to_json(b'{"value": 1}') == '{"value": 1}'
+
+
+class _Reading:
+    def __init__(self, current: float, busvoltage: float) -> None:
+        self.current: float = current
+        self.busvoltage: float = busvoltage
+
+
+def _batch_payload(compress: bool) -> bytes:
+    batch: Batch = Batch(["current", "busvoltage"], max_readings=3, compress=compress)
+    for i in range(3):
+        batch.add(1_000 + 10 * i, _Reading(current=0.5 * i, busvoltage=12.25))
+    assert batch.is_due(1_020)
+
+    value: dict = batch.to_value()
+    value["sensor"] = "ina226"
+    msg: bytes = bytes(PayloadEncoder(base=BASE).encode(value, CREATED_AT))
+    if compress:
+        compressed: bytes | None = payload.deflate_compress(msg)
+        assert compressed is not None
+        return compressed
+    return msg
+
+
+def test_batch_roundtrip() -> None:
+    for compress in (False, True):
+        readings: list[dict] = payload_decode.decode_batch(_batch_payload(compress))
+        assert [r["value"]["current"] for r in readings] == [0.0, 0.5, 1.0]
+        assert all(r["value"]["busvoltage"] == 12.25 and r["value"]["sensor"] == "ina226" for r in readings)
+        assert readings[1]["lat"] == BASE["lat"]
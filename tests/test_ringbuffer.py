@@ -0,0 +1,32 @@
+from micropysensorbase.ringbuffer import RingBuffer
+
+
+def test_empty() -> None:
+    assert RingBuffer(size=4).stats() is None
+
+
+def test_stats_over_the_held_samples() -> None:
+    rb: RingBuffer = RingBuffer(size=4)
+    for v in (100, -5, 1, 2, 3, 4):
+        rb.append(v)
+
+    stats = rb.stats(scale=0.5)
+    assert stats is not None
+    # mean/stddev: the last 4 samples - min/max/count: everything since the reset
+    assert stats["mean"] == 1.25
+    assert abs(stats["stddev"] - 0.5590169943749475) < 1e-12
+    assert stats["min"] == -2.5
+    assert stats["max"] == 50.0
+    assert stats["count"] == 6
+    assert len(rb) == 4
+
+
+def test_reset() -> None:
+    rb: RingBuffer = RingBuffer(size=4)
+    rb.append(7)
+    rb.reset()
+    assert rb.stats() is None
+
+    rb.append(3)
+    stats = rb.stats()
+    assert stats is not None and stats["min"] == stats["max"] == 3
@@ -0,0 +1,63 @@
+import struct
+import time as pytime
+
+import pytest
+
+from micropysensorbase import time
+
+
+def test_strftime_plan() -> None:
+    assert time.compile_strftime("%Y-%m-%d %H:%M") == ("%d-%02d-%02d %02d:%02d", (0, 1, 2, 3, 4))
+    # unknown directives are written as the directive character, %% as %
+    assert time.strftime("%Q %%", (2025, 1, 1, 0, 0, 0, 2, 1, 0)) == "Q %"
+
+
+def test_strftime_matches_the_c_library() -> None:
+    ts = pytime.struct_time((2025, 3, 9, 7, 5, 3, 6, 68, 0))
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%a %A %b %B", "%d.%m.%y", "%j %w"):
+        # tm_wday: 0 = monday (both), %w: the c library counts from sunday
+        expected: str = pytime.strftime(fmt, ts) if fmt != "%j %w" else "068 6"
+        assert time.strftime(fmt, tuple(ts)) == expected
+    # the plan is compiled once
+    assert "%Y-%m-%d %H:%M:%S" in time._STRFTIME_PLANS
+
+
+@pytest.fixture()
+def tz_table(tmp_path, monkeypatch) -> str:
+    # the module state load_tz_table() changes - restored after the test
+    for name in ("_tz_tried", "_tz_t", "_tz_off", "_tz_before", "_offset_minutes", "_offset_from", "_offset_until"):
+        monkeypatch.setattr(time, name, getattr(time, name))
+
+    # Europe/Berlin 2025: CEST from 2025-03-30 01:00 UTC, CET from 2025-10-26 01:00 UTC
+    transitions: list[tuple[int, int]] = [(1743296400, 120), (1761440400, 60)]
+    path: str = str(tmp_path / "tz.bin")
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sHh", b"TZT1", len(transitions), 60))
+        f.write(struct.pack("<2I", *[t for t, _ in transitions]))
+        f.write(struct.pack("<2h", *[o for _, o in transitions]))
+    return path
+
+
+def test_tz_table_lookup(tz_table: str) -> None:
+    assert time.load_tz_table(tz_table)
+
+    assert time.utc_offset_minutes(1743296400 - 1) == 60
+    assert time.utc_offset_minutes(1743296400) == 120
+    assert time.utc_offset_minutes(1761440400 - 1) == 120
+    assert time.utc_offset_minutes(1761440400) == 60
+    assert time.utc_offset_minutes(1800000000) == 60
+
+
+def test_tz_table_offset_is_cached(tz_table: str) -> None:
+    assert time.load_tz_table(tz_table)
+
+    time.utc_offset_minutes(1750000000)
+    assert (time._offset_from, time._offset_until) == (1743296400, 1761440400)
+
+
+def test_tz_table_broken(tmp_path, tz_table: str) -> None:
+    broken: str = str(tmp_path / "broken.bin")
+    with open(broken, "wb") as f:
+        f.write(b"XXXX\x01\x00\x3c\x00")
+    assert not time.load_tz_table(broken)
+    assert not time.load_tz_table(str(tmp_path / "missing.bin"))